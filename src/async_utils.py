@@ -0,0 +1,23 @@
+"""Async helpers shared across pipeline stages"""
+
+from typing import Any, Awaitable, Iterable, List
+import asyncio
+
+
+async def gather_bounded(
+    coros: Iterable[Awaitable[Any]], limit: int = 10, return_exceptions: bool = False
+) -> List[Any]:
+    """
+    asyncio.gather with at most `limit` awaitables in flight at once.
+
+    Results are returned in input order, same as asyncio.gather.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(coro: Awaitable[Any]) -> Any:
+        async with semaphore:
+            return await coro
+
+    return await asyncio.gather(
+        *(run(coro) for coro in coros), return_exceptions=return_exceptions
+    )
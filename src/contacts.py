@@ -1,7 +1,83 @@
 """Contact Enricher - Decision-maker lookup + 30-day cache"""
 
-from typing import Dict, List, Optional
-from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from collections import OrderedDict
+import asyncio
+import logging
+import re
+import time
+from decouple import config
+from redis import asyncio as aioredis
+
+from .async_utils import gather_bounded
+from .jobs_scraper import find_decision_makers, get_company_by_linkedin_url
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ACCEPTED_TITLES = [
+    "CEO",
+    "Founder",
+    "Co Founder",
+    "CFO",
+    "Managing Director",
+    "Director",
+    "Practice Manager",
+    "General Manager",
+]
+
+# Decision-maker lookups in flight at once during a batch enrichment
+ENRICH_CONCURRENCY = config("ENRICH_CONCURRENCY", default=20, cast=int)
+
+# When set, all workers share one RapidAPI budget through Redis
+REDIS_URL = config("REDIS_URL", default="")
+
+CACHE_TTL = timedelta(days=30)
+
+# Process-local L1 in front of the decision_makers table:
+# company_id -> (data, time.monotonic() deadline)
+L1_CACHE_MAX_ENTRIES = 10_000
+_mem: "OrderedDict[str, Tuple[Dict, float]]" = OrderedDict()
+
+DECISION_MAKER_FIELDS = (
+    "decision_maker_name",
+    "linkedin_url",
+    "title",
+    "profile_picture",
+    "location",
+    "experience_summary",
+)
+
+CHECK_CACHE_SQL = (
+    f"SELECT {', '.join(DECISION_MAKER_FIELDS)}, cached_at, expires_at "
+    "FROM decision_makers "
+    "WHERE company_id = $1 AND expires_at > NOW() AND is_valid = TRUE "
+    "ORDER BY cached_at DESC LIMIT 1"
+)
+
+BULK_CHECK_CACHE_SQL = (
+    f"SELECT DISTINCT ON (company_id) company_id, {', '.join(DECISION_MAKER_FIELDS)}, "
+    "cached_at, expires_at "
+    "FROM decision_makers "
+    "WHERE company_id = ANY($1::text[]) AND expires_at > NOW() AND is_valid = TRUE "
+    "ORDER BY company_id, cached_at DESC"
+)
+
+# The company's LinkedIn page, taken from its most recent posting
+COMPANY_URL_SQL = (
+    "SELECT company_url FROM job_postings "
+    "WHERE company_id = $1 AND company_url <> '' "
+    "ORDER BY id DESC LIMIT 1"
+)
+
+# Numeric company pages (linkedin.com/company/892970) carry the id themselves
+_LINKEDIN_COMPANY_ID = re.compile(r"linkedin\.com/company/(\d+)(?:[/?#]|$)")
+
+INSERT_CACHE_SQL = (
+    f"INSERT INTO decision_makers (company_id, {', '.join(DECISION_MAKER_FIELDS)}, "
+    "cached_at, expires_at, is_valid, created_at, updated_at) "
+    "VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, TRUE, NOW(), NOW())"
+)
 
 
 async def search_decision_maker(
@@ -20,30 +96,384 @@ async def search_decision_maker(
     Returns:
         Dict with decision_maker_name, linkedin_url, title, etc.
     """
-    pass
+    cached = await check_cache(company_id)
+    if cached is not None:
+        return cached
+
+    return await _request_decision_maker(
+        company_id, company_name, accepted_titles or DEFAULT_ACCEPTED_TITLES
+    )
+
+
+def _normalise_title(title: str) -> str:
+    return title.lower().replace("-", " ")
+
+
+def _pick_decision_maker(
+    profiles: List[Dict], accepted_titles: List[str]
+) -> Optional[Dict]:
+    """Map the first profile with an accepted title to decision_makers fields"""
+    accepted = [_normalise_title(title) for title in accepted_titles]
+    for profile in profiles:
+        title = profile.get("title") or profile.get("job_title") or ""
+        if not any(keyword in _normalise_title(title) for keyword in accepted):
+            continue
+        return {
+            "decision_maker_name": profile.get("full_name") or profile.get("name", ""),
+            "linkedin_url": profile.get("linkedin_url")
+            or profile.get("profile_url", ""),
+            "title": title,
+            "profile_picture": profile.get("profile_image_url"),
+            "location": profile.get("location"),
+            "experience_summary": profile.get("headline"),
+        }
+    return None
+
+
+# company_id -> lookup already on its way to RapidAPI; later callers share it
+_inflight: Dict[str, "asyncio.Future[Optional[Dict]]"] = {}
+
+
+async def _request_decision_maker(
+    company_id: str, company_name: str, accepted_titles: List[str]
+) -> Optional[Dict]:
+    """Coalesce concurrent lookups for one company into a single API search"""
+    future = _inflight.get(company_id)
+    if future is not None:
+        return await asyncio.shield(future)
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[company_id] = future
+    try:
+        result = await _fetch_decision_maker(company_id, company_name, accepted_titles)
+    except BaseException:
+        # Waiters see a miss rather than inheriting this caller's cancellation
+        future.set_result(None)
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        del _inflight[company_id]
+
+
+async def resolve_linkedin_company_ids(company_id: str, company_name: str) -> List[int]:
+    """
+    LinkedIn numeric company ids for one of our companies.
+
+    The company's LinkedIn page comes from its latest job posting. A numeric
+    /company/<id> URL is read directly; a vanity URL is resolved through
+    RapidAPI's get-company-by-linkedinurl. Returns [] with a warning when the
+    company cannot be resolved, since the decision-maker search is only
+    scoped to a company when it is given these ids.
+    """
+    pool = await _get_pool()
+    async with pool.acquire() as conn:
+        statement = await conn.prepared(COMPANY_URL_SQL)
+        company_url = await statement.fetchval(company_id)
+
+    if not company_url:
+        logger.warning(f"No LinkedIn company page recorded for {company_name}")
+        return []
+
+    match = _LINKEDIN_COMPANY_ID.search(company_url)
+    if match:
+        return [int(match.group(1))]
+
+    company = await get_company_by_linkedin_url(company_url)
+    linkedin_id = str((company or {}).get("company_id") or "")
+    if not linkedin_id.isdigit():
+        logger.warning(
+            f"Could not resolve a LinkedIn company id for {company_name} ({company_url})"
+        )
+        return []
+    return [int(linkedin_id)]
+
+
+async def _fetch_decision_maker(
+    company_id: str, company_name: str, accepted_titles: List[str]
+) -> Optional[Dict]:
+    """Run a decision-maker search scoped to the company and cache the result"""
+    linkedin_ids = await resolve_linkedin_company_ids(company_id, company_name)
+    if not linkedin_ids:
+        # An unscoped search returns people from arbitrary companies; never
+        # attribute (or cache) one of them as this company's contact
+        return None
+
+    # Searches draw on the shared 50 req/min budget (Redis-backed when
+    # REDIS_URL is set), so every worker together stays under it
+    await rate_limiter.acquire()
+    profiles = await find_decision_makers(
+        company_name, company_ids=linkedin_ids, title_keywords=accepted_titles
+    )
+    if not profiles:
+        return None
+
+    decision_maker = _pick_decision_maker(profiles, accepted_titles)
+    if decision_maker is not None:
+        await cache_decision_maker(company_id, decision_maker)
+    return decision_maker
+
+
+async def _get_pool():
+    """Shared asyncpg pool (imported lazily; database builds clients at import)"""
+    from .database import get_db_pool
+
+    return await get_db_pool()
+
+
+def _seconds_until(expires_at: datetime) -> float:
+    """Convert a stored expires_at into a TTL once, so L1 reads compare floats"""
+    return (expires_at - datetime.now(timezone.utc)).total_seconds()
+
+
+def _mem_get(company_id: str) -> Optional[Dict]:
+    entry = _mem.get(company_id)
+    if entry is None:
+        return None
+    data, deadline = entry
+    if deadline <= time.monotonic():
+        del _mem[company_id]
+        return None
+    _mem.move_to_end(company_id)
+    return data
+
+
+def _mem_put(company_id: str, data: Dict, ttl_seconds: float) -> None:
+    _mem[company_id] = (data, time.monotonic() + ttl_seconds)
+    _mem.move_to_end(company_id)
+    while len(_mem) > L1_CACHE_MAX_ENTRIES:
+        _mem.popitem(last=False)
 
 
 async def check_cache(company_id: str) -> Optional[Dict]:
     """Check if decision maker info exists in cache and is < 30 days old"""
-    pass
+    cached = _mem_get(company_id)
+    if cached is not None:
+        return cached
+
+    try:
+        pool = await _get_pool()
+        async with pool.acquire() as conn:
+            statement = await conn.prepared(CHECK_CACHE_SQL)
+            row = await statement.fetchrow(company_id)
+    except Exception as e:
+        logger.error(f"Error reading decision maker cache for {company_id}: {str(e)}")
+        return None
+
+    if row is None:
+        return None
+
+    data = dict(row)
+    expires_at = data.pop("expires_at")
+    _mem_put(company_id, data, _seconds_until(expires_at))
+    return data
 
 
 async def cache_decision_maker(company_id: str, decision_maker_data: Dict) -> bool:
     """Store decision maker data in Postgres cache with timestamp"""
-    pass
+    # expires_at is fixed at write time so reads never recompute cached_at + 30d
+    cached_at = datetime.now(timezone.utc)
+    expires_at = cached_at + CACHE_TTL
+    values = [decision_maker_data.get(field) for field in DECISION_MAKER_FIELDS]
+
+    try:
+        pool = await _get_pool()
+        async with pool.acquire() as conn:
+            await conn.execute(
+                INSERT_CACHE_SQL, company_id, *values, cached_at, expires_at
+            )
+    except Exception as e:
+        logger.error(f"Error caching decision maker for {company_id}: {str(e)}")
+        return False
+
+    # Only mirror into L1 once Postgres has accepted the row
+    data = dict(zip(DECISION_MAKER_FIELDS, values), cached_at=cached_at)
+    _mem_put(company_id, data, CACHE_TTL.total_seconds())
+    return True
+
+
+async def _check_cache_many(company_ids: List[str]) -> Dict[str, Dict]:
+    """Read cached decision makers for many companies in one round-trip"""
+    try:
+        pool = await _get_pool()
+        async with pool.acquire() as conn:
+            statement = await conn.prepared(BULK_CHECK_CACHE_SQL)
+            rows = await statement.fetch(company_ids)
+    except Exception as e:
+        logger.error(f"Error reading decision maker cache in bulk: {str(e)}")
+        return {}
 
+    hits = {}
+    for row in rows:
+        data = dict(row)
+        company_id = data.pop("company_id")
+        expires_at = data.pop("expires_at")
+        _mem_put(company_id, data, _seconds_until(expires_at))
+        hits[company_id] = data
+    return hits
+
+
+async def _lookup_misses(
+    company_ids: List[str], company_names: Dict[str, str]
+) -> Dict[str, Dict]:
+    """
+    Look up companies that had no cached decision maker.
+
+    Up to ENRICH_CONCURRENCY lookups run at once; rate_limiter paces how
+    fast searches actually start, so wall-clock is bounded by the budget
+    rather than by per-call latency. A lookup that raises is
+    logged and skipped without failing the rest.
+    """
+    results = await gather_bounded(
+        (
+            _request_decision_maker(
+                company_id,
+                company_names.get(company_id, company_id),
+                DEFAULT_ACCEPTED_TITLES,
+            )
+            for company_id in company_ids
+        ),
+        limit=ENRICH_CONCURRENCY,
+        return_exceptions=True,
+    )
 
-async def batch_lookup_companies(company_ids: List[str]) -> Dict[str, Dict]:
+    found = {}
+    for company_id, result in zip(company_ids, results):
+        if isinstance(result, BaseException):
+            logger.error(
+                f"Decision maker lookup failed for {company_id}", exc_info=result
+            )
+        elif result:
+            found[company_id] = result
+    return found
+
+
+async def batch_lookup_companies(
+    company_ids: List[str], company_names: Optional[Dict[str, str]] = None
+) -> Dict[str, Dict]:
     """Batch company lookups when endpoint supports arrays. Throttle to 50 req/min."""
-    pass
+    company_ids = list(dict.fromkeys(company_ids))
+
+    hits = {}
+    uncached = []
+    for company_id in company_ids:
+        cached = _mem_get(company_id)
+        if cached is not None:
+            hits[company_id] = cached
+        else:
+            uncached.append(company_id)
+
+    if uncached:
+        hits.update(await _check_cache_many(uncached))
+
+    misses = [company_id for company_id in company_ids if company_id not in hits]
+    if misses:
+        hits.update(await _lookup_misses(misses, company_names or {}))
+    return hits
+
+
+# Token bucket state lives in a hash {tokens, last}; Redis TIME gives every
+# worker the same clock. Returns 0 when a token was taken, else ms to wait.
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'last')
+local tokens = tonumber(state[1]) or capacity
+local last = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - last) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = math.ceil((1 - tokens) / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'last', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate) * 2)
+return wait
+"""
+
+
+class RedisTokenBucket:
+    """Token bucket shared by every worker, updated atomically in a Lua script"""
+
+    def __init__(
+        self,
+        redis_client: "aioredis.Redis",
+        key: str = "tb:rapidapi:searchDM",
+        max_requests: int = 50,
+        time_window: int = 60,
+    ):
+        self.key = key
+        self.capacity = max_requests
+        self.rate = max_requests / (time_window * 1000)  # tokens per ms
+        self._script = redis_client.register_script(TOKEN_BUCKET_LUA)
+
+    async def acquire(self) -> None:
+        """Wait until the shared bucket grants a token"""
+        while True:
+            wait_ms = await self._script(
+                keys=[self.key], args=[self.capacity, self.rate]
+            )
+            if not wait_ms:
+                return
+            await asyncio.sleep(int(wait_ms) / 1000)
 
 
 class RateLimiter:
-    """Throttle to 50 req/min wrapper util"""
+    """Throttle to 50 req/min wrapper util (token bucket on monotonic time)"""
+
+    def __init__(
+        self,
+        max_requests: int = 50,
+        time_window: int = 60,
+        backend: Optional[RedisTokenBucket] = None,
+    ):
+        self.backend = backend
+        self.capacity = max_requests
+        self.rate = max_requests / time_window  # tokens per second
+        self.tokens = float(max_requests)
+        self.last = time.monotonic()
+        self._lock = asyncio.Lock()
 
-    def __init__(self, max_requests: int = 50, time_window: int = 60):
-        pass
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+
+    def try_acquire(self) -> bool:
+        """Take a local token without waiting; return False if the bucket is empty"""
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
 
     async def acquire(self) -> None:
         """Wait if necessary to respect rate limits"""
-        pass
+        if self.backend is not None:
+            await self.backend.acquire()
+            return
+
+        async with self._lock:
+            self._refill()
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                # The token that accrued while sleeping is consumed by this call
+                self.last = time.monotonic()
+                self.tokens = 0.0
+            else:
+                self.tokens -= 1
+
+
+def _build_rate_limiter() -> RateLimiter:
+    """Use the shared Redis bucket when REDIS_URL is configured, else a local one"""
+    if REDIS_URL:
+        return RateLimiter(backend=RedisTokenBucket(aioredis.from_url(REDIS_URL)))
+    return RateLimiter()
+
+
+# Global rate limiter for RapidAPI decision-maker lookups
+rate_limiter = _build_rate_limiter()
@@ -1,16 +1,34 @@
 """Database models and schema for recruiting automation system"""
 
-from typing import List, Optional, Dict, Any
-from datetime import datetime
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import islice
 from sqlmodel import SQLModel, Field, create_engine, Session, select, Column, JSON
+from sqlalchemy import DateTime
 from supabase import create_client, Client
 from decouple import config
 import asyncio
 import asyncpg
+import numpy as np
+import orjson
+from asyncpg.prepared_stmt import PreparedStatement
 from pgvector.asyncpg import register_vector
 
 
 # Environment configuration
+EMBEDDING_DIM = config("EMBEDDING_DIM", default=1536, cast=int)
 SUPABASE_URL = config("SUPABASE_URL", default="")
 SUPABASE_SERVICE_ROLE_KEY = config("SUPABASE_SERVICE_ROLE_KEY", default="")
 
@@ -58,8 +76,14 @@ class DecisionMaker(SQLModel, table=True):
     profile_picture: Optional[str] = None
     location: Optional[str] = None
     experience_summary: Optional[str] = None
-    cached_at: datetime = Field(default_factory=datetime.now)
-    expires_at: datetime  # cached_at + 30 days
+    cached_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column=Column(DateTime(timezone=True), nullable=False),
+    )
+    # cached_at + 30 days, fixed at write time
+    expires_at: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=False)
+    )
     is_valid: bool = Field(default=True)
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
@@ -90,36 +114,508 @@ class Resume(SQLModel, table=True):
 
 
 # Database connection and session management
-async def get_database_connection():
-    """Get async database connection for pgvector operations"""
-    connection = await asyncpg.connect(
-        host=config("DB_HOST", default="localhost"),
-        port=config("DB_PORT", default=5432),
-        user=config("DB_USER", default="postgres"),
-        password=config("DB_PASSWORD", default=""),
-        database=config("DB_NAME", default="postgres"),
-    )
+class RecruiterConnection(asyncpg.Connection):
+    """asyncpg connection that keeps hot statements prepared for its lifetime"""
+
+    __slots__ = ("_prepared",)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._prepared: Dict[str, PreparedStatement] = {}
+
+    async def prepared(self, query: str) -> PreparedStatement:
+        """Return a prepared statement for query, parsing it once per connection"""
+        statement = self._prepared.get(query)
+        if statement is None:
+            statement = await self.prepare(query)
+            self._prepared[query] = statement
+        return statement
+
+
+_pool: Optional[asyncpg.Pool] = None
+
+# Embeddings are stored as fp16 halfvec: half the bytes of vector on the wire,
+# on disk and in the HNSW index, with negligible loss in cosine ranking
+RESUME_EMBEDDINGS_DDL = f"""
+CREATE EXTENSION IF NOT EXISTS vector;
+CREATE TABLE IF NOT EXISTS resume_embeddings (
+    resume_id TEXT PRIMARY KEY,
+    embedding HALFVEC({EMBEDDING_DIM}) NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS resume_embeddings_embedding_idx
+    ON resume_embeddings USING hnsw (embedding halfvec_cosine_ops);
+"""
+
+# Matcher output, carried through the later stages: the message builder fills
+# outreach_message and the sheet writer stamps sheet_written_at
+JOB_MATCHES_DDL = """
+CREATE TABLE IF NOT EXISTS job_matches (
+    id BIGSERIAL PRIMARY KEY,
+    job_link TEXT NOT NULL,
+    resume_id TEXT NOT NULL,
+    match_score INTEGER NOT NULL,
+    matching_reasons JSONB NOT NULL DEFAULT '[]',
+    outreach_message TEXT,
+    sheet_written_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    UNIQUE (job_link, resume_id)
+);
+"""
+
+# Serves the check_cache lookups (company_id = ... AND expires_at > NOW());
+# NOW() is not immutable so it cannot go in the partial-index predicate itself
+DECISION_MAKERS_INDEX_DDL = """
+CREATE INDEX IF NOT EXISTS decision_makers_valid_cache_idx
+    ON decision_makers (company_id, expires_at DESC) WHERE is_valid;
+"""
+
+
+def _encode_jsonb(value: Any) -> bytes:
+    # jsonb binary format is a version byte followed by the JSON text
+    return b"\x01" + orjson.dumps(value)
+
+
+def _decode_jsonb(data: bytes) -> Any:
+    return orjson.loads(data[1:])
+
+
+async def _init_connection(connection: asyncpg.Connection) -> None:
+    """Per-connection codecs: pgvector types plus orjson for json/jsonb columns"""
     await register_vector(connection)
-    return connection
+    # Binary format, because binary COPY (copy_records_to_table) refuses
+    # columns whose codec is text-only
+    await connection.set_type_codec(
+        "json",
+        encoder=orjson.dumps,
+        decoder=orjson.loads,
+        schema="pg_catalog",
+        format="binary",
+    )
+    await connection.set_type_codec(
+        "jsonb",
+        encoder=_encode_jsonb,
+        decoder=_decode_jsonb,
+        schema="pg_catalog",
+        format="binary",
+    )
+
+
+async def init_db_pool() -> asyncpg.Pool:
+    """Create the shared asyncpg pool for pgvector operations (idempotent)"""
+    global _pool
+    if _pool is None:
+        _pool = await asyncpg.create_pool(
+            host=config("DB_HOST", default="localhost"),
+            port=config("DB_PORT", default=5432, cast=int),
+            user=config("DB_USER", default="postgres"),
+            password=config("DB_PASSWORD", default=""),
+            database=config("DB_NAME", default="postgres"),
+            min_size=5,
+            max_size=20,
+            max_inactive_connection_lifetime=600,
+            command_timeout=30,
+            # init runs once per new connection, so codecs are registered once
+            # rather than on every acquire
+            init=_init_connection,
+            connection_class=RecruiterConnection,
+        )
+    return _pool
 
 
-async def store_resume_embedding(resume_id: str, embedding: List[float]):
+async def close_db_pool() -> None:
+    """Close the shared asyncpg pool"""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+async def get_db_pool() -> asyncpg.Pool:
+    """Return the shared pool, creating it lazily outside the app lifespan"""
+    if _pool is None:
+        return await init_db_pool()
+    return _pool
+
+
+async def ensure_schema() -> None:
+    """Create the pgvector tables and hot-path indexes if they do not exist yet"""
+    pool = await get_db_pool()
+    async with pool.acquire() as connection:
+        await connection.execute(RESUME_EMBEDDINGS_DDL)
+        await connection.execute(JOB_MATCHES_DDL)
+        await connection.execute(DECISION_MAKERS_INDEX_DDL)
+
+
+async def store_resume_embedding(
+    resume_id: str, embedding: Union[np.ndarray, List[float]]
+):
     """Store resume embedding in pgvector table"""
-    connection = await get_database_connection()
-    try:
+    pool = await get_db_pool()
+    async with pool.acquire() as connection:
         await connection.execute(
-            "INSERT INTO resume_embeddings (resume_id, embedding) VALUES ($1, $2) "
-            "ON CONFLICT (resume_id) DO UPDATE SET embedding = $2, updated_at = NOW()",
+            "INSERT INTO resume_embeddings (resume_id, embedding) VALUES ($1, $2::halfvec) "
+            "ON CONFLICT (resume_id) DO UPDATE "
+            "SET embedding = EXCLUDED.embedding, updated_at = NOW()",
             resume_id,
             embedding,
         )
-    finally:
-        await connection.close()
+
+
+async def _copy_upsert(
+    table: str,
+    columns: Sequence[str],
+    key: str,
+    records: Iterable[tuple],
+    on_conflict: str,
+    page_size: int,
+) -> int:
+    """
+    COPY records into a transaction-scoped staging table, then merge them
+    into `table` with a single INSERT ... SELECT ... `on_conflict` per page.
+
+    Records repeating a `key` within a page are collapsed to the last one,
+    since ON CONFLICT cannot touch the same row twice in one statement.
+    """
+    column_list = ", ".join(columns)
+    key_index = columns.index(key)
+    stage = f"{table}_stage"
+    written = 0
+
+    pool = await get_db_pool()
+    async with pool.acquire() as connection:
+        iterator = iter(records)
+        while page := list(islice(iterator, page_size)):
+            batch = list({record[key_index]: record for record in page}.values())
+            async with connection.transaction():
+                # CTAS keeps the column types but not the NOT NULL/PK constraints
+                await connection.execute(
+                    f"CREATE TEMP TABLE IF NOT EXISTS {stage} ON COMMIT DROP AS "
+                    f"SELECT {column_list} FROM {table} WITH NO DATA"
+                )
+                await connection.copy_records_to_table(
+                    stage, records=batch, columns=list(columns)
+                )
+                await connection.execute(
+                    f"INSERT INTO {table} ({column_list}) "
+                    f"SELECT {column_list} FROM {stage} "
+                    f"{on_conflict}"
+                )
+            written += len(batch)
+    return written
+
+
+async def store_resume_embeddings_bulk(
+    rows: List[Tuple[str, Union[np.ndarray, List[float]]]], batch_size: int = 500
+) -> int:
+    """
+    Upsert many resume embeddings using COPY instead of one INSERT per row.
+
+    Rows are COPY'd into a transaction-scoped staging table and merged into
+    resume_embeddings with the same ON CONFLICT semantics as
+    store_resume_embedding.
+
+    Args:
+        rows: (resume_id, embedding) pairs
+        batch_size: Rows per COPY/merge transaction
+
+    Returns:
+        Number of rows written
+    """
+    return await _copy_upsert(
+        "resume_embeddings",
+        ("resume_id", "embedding"),
+        "resume_id",
+        rows,
+        "ON CONFLICT (resume_id) DO UPDATE "
+        "SET embedding = EXCLUDED.embedding, updated_at = NOW()",
+        batch_size,
+    )
+
+
+JOB_POSTING_COLUMNS = (
+    "company_id",
+    "company_name",
+    "job_title",
+    "job_link",
+    "location",
+    "posted_hours_ago",
+    "posted_time",
+    "scraped_at",
+    "job_type",
+    "company_logo",
+    "company_url",
+    "full_description",
+    "requirements",
+    "salary_range",
+    "experience_level",
+    "job_function",
+    "processed",
+    "created_at",
+    "updated_at",
+)
+
+RESUME_COLUMNS = (
+    "resume_id",
+    "candidate_name",
+    "file_name",
+    "file_type",
+    "text_content",
+    "google_drive_file_id",
+    "skills",
+    "experience_years",
+    "certifications",
+    "education",
+    "location",
+    "contact_email",
+    "contact_phone",
+    "processed",
+    "created_at",
+    "updated_at",
+)
+
+
+def _to_records(
+    rows: Iterable[Dict[str, Any]], columns: Sequence[str]
+) -> Iterator[tuple]:
+    """Turn row dicts into tuples in column order, filling bookkeeping defaults"""
+    now = datetime.now()
+    defaults = {
+        "processed": False,
+        "scraped_at": now,
+        "created_at": now,
+        "updated_at": now,
+    }
+    for row in rows:
+        record = []
+        for column in columns:
+            value = row.get(column)
+            if value is None:
+                value = defaults.get(column)
+            elif column == "scraped_at" and isinstance(value, str):
+                value = datetime.fromisoformat(value)
+            record.append(value)
+        yield tuple(record)
+
+
+async def bulk_insert_job_postings(
+    rows: Iterable[Dict[str, Any]], page_size: int = 500
+) -> int:
+    """
+    Insert scraped job postings with COPY, one round-trip per page.
+
+    Postings whose job_link already exists are left untouched so their
+    processed flag survives a re-scrape.
+    """
+    return await _copy_upsert(
+        "job_postings",
+        JOB_POSTING_COLUMNS,
+        "job_link",
+        _to_records(rows, JOB_POSTING_COLUMNS),
+        "ON CONFLICT (job_link) DO NOTHING",
+        page_size,
+    )
+
+
+async def bulk_insert_resumes(
+    rows: Iterable[Dict[str, Any]], page_size: int = 500
+) -> int:
+    """
+    Upsert résumé rows with COPY, refreshing content for existing resume_ids.
+
+    Columns a row leaves empty keep their stored value, so re-ingesting a
+    file does not wipe fields parsed out of it earlier.
+    """
+    refreshed = [
+        column
+        for column in RESUME_COLUMNS
+        if column not in ("resume_id", "processed", "created_at", "updated_at")
+    ]
+    return await _copy_upsert(
+        "resumes",
+        RESUME_COLUMNS,
+        "resume_id",
+        _to_records(rows, RESUME_COLUMNS),
+        "ON CONFLICT (resume_id) DO UPDATE SET "
+        + ", ".join(
+            f"{column} = COALESCE(EXCLUDED.{column}, resumes.{column})"
+            for column in refreshed
+        )
+        + ", updated_at = NOW()",
+        page_size,
+    )
+
+
+async def _iter_rows(query: str, batch: int) -> AsyncIterator[asyncpg.Record]:
+    """Stream rows through a server-side cursor on a dedicated pool connection"""
+    pool = await get_db_pool()
+    async with pool.acquire() as connection:
+        # Cursors only live inside a transaction
+        async with connection.transaction():
+            async for record in connection.cursor(query, prefetch=batch):
+                yield record
+
+
+def iter_job_postings(
+    batch: int = 500, unprocessed: bool = False
+) -> AsyncIterator[asyncpg.Record]:
+    """
+    Iterate over job postings, oldest first, without materialising the table
+    in memory; with `unprocessed`, only those the matcher has not handled.
+    """
+    where = " WHERE NOT processed" if unprocessed else ""
+    return _iter_rows(f"SELECT * FROM job_postings{where} ORDER BY id", batch)
+
+
+UNPROCESSED_COMPANIES_SQL = """
+SELECT DISTINCT ON (company_id) company_id, company_name
+FROM job_postings
+WHERE NOT processed AND company_id <> ''
+ORDER BY company_id, id
+"""
+
+
+async def fetch_unprocessed_companies() -> Dict[str, str]:
+    """company_id -> company_name for every company with unprocessed postings"""
+    pool = await get_db_pool()
+    async with pool.acquire() as connection:
+        rows = await connection.fetch(UNPROCESSED_COMPANIES_SQL)
+    return {row["company_id"]: row["company_name"] for row in rows}
+
+
+RESUMES_BY_ID_SQL = """
+SELECT resume_id, candidate_name, text_content
+FROM resumes
+WHERE resume_id = ANY($1::text[])
+"""
+
+UPSERT_JOB_MATCH_SQL = """
+INSERT INTO job_matches (job_link, resume_id, match_score, matching_reasons)
+VALUES ($1, $2, $3, $4)
+ON CONFLICT (job_link, resume_id) DO UPDATE
+SET match_score = EXCLUDED.match_score,
+    matching_reasons = EXCLUDED.matching_reasons,
+    updated_at = NOW()
+"""
+
+# The newest valid cached decision maker for each match's company
+_MATCH_CONTACT_JOIN = """
+FROM job_matches m
+JOIN job_postings j ON j.job_link = m.job_link
+JOIN LATERAL (
+    SELECT decision_maker_name, linkedin_url
+    FROM decision_makers d
+    WHERE d.company_id = j.company_id AND d.is_valid AND d.expires_at > NOW()
+    ORDER BY d.cached_at DESC
+    LIMIT 1
+) d ON TRUE
+"""
+
+MATCHES_AWAITING_MESSAGE_SQL = f"""
+SELECT m.id AS match_id, m.match_score, m.matching_reasons,
+       j.company_name, j.job_title, j.job_link, j.location,
+       j.full_description, j.requirements,
+       r.candidate_name, d.decision_maker_name, d.linkedin_url
+{_MATCH_CONTACT_JOIN}
+JOIN resumes r ON r.resume_id = m.resume_id
+WHERE m.outreach_message IS NULL
+ORDER BY m.job_link, m.match_score DESC
+"""
+
+OUTREACH_ROWS_SQL = f"""
+SELECT m.id AS match_id, j.company_name AS company, j.job_title, j.job_link,
+       d.decision_maker_name, d.linkedin_url, m.match_score, m.outreach_message
+{_MATCH_CONTACT_JOIN}
+WHERE m.outreach_message IS NOT NULL AND m.sheet_written_at IS NULL
+ORDER BY m.match_score DESC, m.id
+"""
+
+
+async def fetch_resumes(resume_ids: Iterable[str]) -> Dict[str, asyncpg.Record]:
+    """resume_id -> (resume_id, candidate_name, text_content) in one round-trip"""
+    pool = await get_db_pool()
+    async with pool.acquire() as connection:
+        rows = await connection.fetch(RESUMES_BY_ID_SQL, list(resume_ids))
+    return {row["resume_id"]: row for row in rows}
+
+
+async def store_job_matches(
+    job_links: Sequence[str], matches: Sequence[Tuple[str, str, int, List[str]]]
+) -> int:
+    """
+    Upsert (job_link, resume_id, match_score, matching_reasons) rows and mark
+    the matched postings processed, in one transaction.
+    """
+    pool = await get_db_pool()
+    async with pool.acquire() as connection:
+        async with connection.transaction():
+            if matches:
+                await connection.executemany(UPSERT_JOB_MATCH_SQL, matches)
+            await connection.execute(
+                "UPDATE job_postings SET processed = TRUE, updated_at = NOW() "
+                "WHERE job_link = ANY($1::text[])",
+                list(job_links),
+            )
+    return len(matches)
+
+
+async def fetch_matches_awaiting_message() -> List[asyncpg.Record]:
+    """Matches with a known decision maker and no outreach message yet, by job"""
+    pool = await get_db_pool()
+    async with pool.acquire() as connection:
+        return await connection.fetch(MATCHES_AWAITING_MESSAGE_SQL)
+
+
+async def store_outreach_messages(messages: Dict[int, str]) -> int:
+    """Save generated outreach messages keyed by job_matches.id"""
+    if not messages:
+        return 0
+    pool = await get_db_pool()
+    async with pool.acquire() as connection:
+        await connection.executemany(
+            "UPDATE job_matches SET outreach_message = $2, updated_at = NOW() "
+            "WHERE id = $1",
+            list(messages.items()),
+        )
+    return len(messages)
+
+
+async def fetch_outreach_rows() -> List[asyncpg.Record]:
+    """Matches with a message that have not been written to a sheet yet"""
+    pool = await get_db_pool()
+    async with pool.acquire() as connection:
+        return await connection.fetch(OUTREACH_ROWS_SQL)
+
+
+async def mark_outreach_written(match_ids: Sequence[int]) -> None:
+    """Stamp matches as written so the next daily sheet does not repeat them"""
+    pool = await get_db_pool()
+    async with pool.acquire() as connection:
+        await connection.execute(
+            "UPDATE job_matches SET sheet_written_at = NOW(), updated_at = NOW() "
+            "WHERE id = ANY($1::bigint[])",
+            list(match_ids),
+        )
+
+
+@lru_cache(maxsize=1)
+def _sync_engine():
+    """Process-wide SQLAlchemy engine so sync sessions share one connection pool"""
+    database_url = (
+        f"postgresql://{config('DB_USER')}:{config('DB_PASSWORD')}"
+        f"@{config('DB_HOST')}:{config('DB_PORT')}/{config('DB_NAME')}"
+    )
+    return create_engine(
+        database_url,
+        pool_size=10,
+        max_overflow=10,
+        pool_pre_ping=True,
+        pool_recycle=1800,
+    )
 
 
 def get_sync_session():
     """Get synchronous database session for SQLModel operations"""
-    engine = create_engine(
-        f"postgresql://{config('DB_USER')}:{config('DB_PASSWORD')}@{config('DB_HOST')}:{config('DB_PORT')}/{config('DB_NAME')}"
-    )
-    return Session(engine)
+    return Session(_sync_engine())
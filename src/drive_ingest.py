@@ -1,32 +1,194 @@
 """Drive Ingest - Résumé text-extract + embeddings"""
 
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple, Union
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 import asyncio
+import io
+import os
+import threading
 
+import numpy as np
+from decouple import config
+from docx import Document
+from google.oauth2 import service_account
+from googleapiclient.discovery import build
+from googleapiclient.http import MediaIoBaseDownload
+from openai import AsyncOpenAI
+from PyPDF2 import PdfReader
 
-async def extract_text_from_pdf(file_path: str) -> str:
-    """Extract text content from PDF résumé"""
-    pass
+from .async_utils import gather_bounded
 
 
-async def extract_text_from_docx(file_path: str) -> str:
-    """Extract text content from DOCX résumé"""
-    pass
+EMBEDDING_MODEL = config("EMBEDDING_MODEL", default="text-embedding-3-small")
+GOOGLE_SERVICE_ACCOUNT_FILE = config("GOOGLE_SERVICE_ACCOUNT_FILE", default="")
+DRIVE_SCOPES = ["https://www.googleapis.com/auth/drive.readonly"]
+
+PDF_MIME_TYPE = "application/pdf"
+DOCX_MIME_TYPE = (
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+)
+
+# Files processed concurrently per folder sync; keep within the embedding API budget
+INGEST_CONCURRENCY = 10
+
+
+# Parsing is CPU-bound, so it runs in worker processes instead of on the event loop
+_extract_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _get_extract_executor() -> ProcessPoolExecutor:
+    global _extract_executor
+    if _extract_executor is None:
+        _extract_executor = ProcessPoolExecutor(max_workers=os.cpu_count())
+    return _extract_executor
+
+
+def shutdown_extract_executor() -> None:
+    """Stop the text-extraction worker processes"""
+    global _extract_executor
+    if _extract_executor is not None:
+        _extract_executor.shutdown(wait=False, cancel_futures=True)
+        _extract_executor = None
+
+
+def _as_source(source: Union[bytes, str]) -> Union[io.BytesIO, str]:
+    """Downloaded bytes are parsed from memory; str is still treated as a path"""
+    return io.BytesIO(source) if isinstance(source, bytes) else source
+
+
+def _sync_extract_pdf(source: Union[bytes, str]) -> str:
+    reader = PdfReader(_as_source(source))
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def _sync_extract_docx(source: Union[bytes, str]) -> str:
+    document = Document(_as_source(source))
+    return "\n".join(paragraph.text for paragraph in document.paragraphs)
 
 
-async def generate_embeddings(text: str) -> List[float]:
+async def extract_text_from_pdf(source: Union[bytes, str]) -> str:
+    """Extract text content from PDF résumé (file bytes or a local path)"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_extract_executor(), _sync_extract_pdf, source
+    )
+
+
+async def extract_text_from_docx(source: Union[bytes, str]) -> str:
+    """Extract text content from DOCX résumé (file bytes or a local path)"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_extract_executor(), _sync_extract_docx, source
+    )
+
+
+_openai_client: Optional[AsyncOpenAI] = None
+
+
+def _get_openai_client() -> AsyncOpenAI:
+    global _openai_client
+    if _openai_client is None:
+        _openai_client = AsyncOpenAI(api_key=config("OPENAI_API_KEY", default=""))
+    return _openai_client
+
+
+def normalise_embedding(raw: List[float]) -> np.ndarray:
+    """L2-normalise an embedding as a float32 array"""
+    embedding = np.asarray(raw, dtype=np.float32)
+    embedding /= np.linalg.norm(embedding) + 1e-12
+    return embedding
+
+
+async def generate_embeddings(text: str) -> np.ndarray:
     """Generate vector embeddings for résumé text"""
-    pass
+    response = await _get_openai_client().embeddings.create(
+        model=EMBEDDING_MODEL, input=text
+    )
+    return normalise_embedding(response.data[0].embedding)
+
+
+def _resume_record(
+    file_name: str, text_content: str, metadata: Dict[str, Any] = None
+) -> Dict[str, Any]:
+    """resumes row for an extracted résumé, keyed by its Drive file id when known"""
+    metadata = metadata or {}
+    stem = os.path.splitext(file_name)[0]
+    return {
+        "resume_id": (
+            metadata.get("resume_id") or metadata.get("google_drive_file_id") or stem
+        ),
+        "candidate_name": (
+            metadata.get("candidate_name") or stem.replace("_", " ").title()
+        ),
+        "file_name": file_name,
+        "file_type": metadata.get("file_type", ""),
+        "text_content": text_content,
+        "google_drive_file_id": metadata.get("google_drive_file_id"),
+    }
+
+
+async def _upsert_resume_row(record: Dict[str, Any]) -> None:
+    from .database import get_db_pool
+
+    pool = await get_db_pool()
+    async with pool.acquire() as connection:
+        await connection.execute(
+            "INSERT INTO resumes (resume_id, candidate_name, file_name, file_type, "
+            "text_content, google_drive_file_id, processed, created_at, updated_at) "
+            "VALUES ($1, $2, $3, $4, $5, $6, FALSE, NOW(), NOW()) "
+            "ON CONFLICT (resume_id) DO UPDATE SET file_name = EXCLUDED.file_name, "
+            "text_content = EXCLUDED.text_content, updated_at = NOW()",
+            record["resume_id"],
+            record["candidate_name"],
+            record["file_name"],
+            record["file_type"],
+            record["text_content"],
+            record["google_drive_file_id"],
+        )
 
 
 async def store_resume_in_postgres(
     file_name: str,
     text_content: str,
-    embeddings: List[float],
+    embeddings: np.ndarray,
     metadata: Dict[str, Any] = None,
 ) -> str:
     """Store résumé text and embeddings in Postgres with pgvector"""
-    pass
+    from .database import store_resume_embedding
+
+    record = _resume_record(file_name, text_content, metadata)
+    await _upsert_resume_row(record)
+    await store_resume_embedding(record["resume_id"], embeddings)
+    return record["resume_id"]
+
+
+# Supported upload MIME types -> resumes.file_type
+RESUME_FILE_TYPES = {PDF_MIME_TYPE: "PDF", DOCX_MIME_TYPE: "DOCX"}
+
+
+def _unsupported(file_type: str) -> Dict:
+    return {"status": "skipped", "message": f"Unsupported file type {file_type}"}
+
+
+async def _extract_and_embed(
+    file_id: str, file_name: str, file_type: str
+) -> Tuple[Dict[str, Any], np.ndarray]:
+    """Download, extract and embed one supported Drive upload"""
+    if file_type == PDF_MIME_TYPE:
+        extract = extract_text_from_pdf
+    else:
+        extract = extract_text_from_docx
+
+    content = await download_to_buffer(file_id)
+    text_content = await extract(content)
+    embeddings = await generate_embeddings(text_content)
+    record = _resume_record(
+        file_name,
+        text_content,
+        {"google_drive_file_id": file_id, "file_type": RESUME_FILE_TYPES[file_type]},
+    )
+    return record, embeddings
 
 
 async def handle_drive_webhook(file_id: str, file_name: str, file_type: str) -> Dict:
@@ -41,12 +203,119 @@ async def handle_drive_webhook(file_id: str, file_name: str, file_type: str) ->
     Returns:
         Processing result with status and resume_id
     """
-    pass
+    if file_type not in RESUME_FILE_TYPES:
+        return _unsupported(file_type)
 
+    try:
+        record, embeddings = await _extract_and_embed(file_id, file_name, file_type)
+        resume_id = await store_resume_in_postgres(
+            file_name,
+            record["text_content"],
+            embeddings,
+            {
+                "google_drive_file_id": file_id,
+                "file_type": record["file_type"],
+            },
+        )
+    except Exception as e:
+        return {"status": "error", "message": f"Error processing {file_name}: {str(e)}"}
 
-async def download_file_from_drive(file_id: str, local_path: str) -> bool:
-    """Download file from Google Drive to local storage"""
-    pass
+    return {
+        "status": "success",
+        "resume_id": resume_id,
+        "message": "Resume processed successfully",
+    }
+
+
+async def handle_drive_folder(
+    files: List[Dict[str, str]], limit: int = INGEST_CONCURRENCY
+) -> List[Dict]:
+    """
+    Ingest several Drive uploads concurrently (bounded by `limit`).
+
+    Files are downloaded, extracted and embedded concurrently; their résumé
+    rows and embeddings are then written with one bulk_insert_resumes and
+    one store_resume_embeddings_bulk call instead of one INSERT per file.
+
+    Args:
+        files: Drive file entries with id, name and mimeType keys
+        limit: Maximum number of files processed at once
+
+    Returns:
+        One processing result per file, in input order
+    """
+    from .database import bulk_insert_resumes, store_resume_embeddings_bulk
+
+    async def ingest(file: Dict[str, str]) -> Tuple[Dict, Optional[Tuple]]:
+        if file["mimeType"] not in RESUME_FILE_TYPES:
+            return _unsupported(file["mimeType"]), None
+        try:
+            record, embeddings = await _extract_and_embed(
+                file["id"], file["name"], file["mimeType"]
+            )
+        except Exception as e:
+            message = f"Error processing {file['name']}: {str(e)}"
+            return {"status": "error", "message": message}, None
+        result = {
+            "status": "success",
+            "resume_id": record["resume_id"],
+            "message": "Resume processed successfully",
+        }
+        return result, (record, embeddings)
+
+    outcomes = await gather_bounded((ingest(file) for file in files), limit=limit)
+    results = [result for result, _ in outcomes]
+    extracted = [pair for _, pair in outcomes if pair is not None]
+    if extracted:
+        try:
+            # Rows first, so no embedding points at a missing résumé
+            await bulk_insert_resumes([record for record, _ in extracted])
+            await store_resume_embeddings_bulk(
+                [(record["resume_id"], embeddings) for record, embeddings in extracted]
+            )
+        except Exception as e:
+            for result in results:
+                if result["status"] == "success":
+                    result.update(
+                        status="error", message=f"Error storing résumés: {str(e)}"
+                    )
+    return results
+
+
+# httplib2 connections are not thread-safe, so each download thread builds its own service
+_drive_local = threading.local()
+
+
+@lru_cache(maxsize=1)
+def _get_drive_credentials():
+    return service_account.Credentials.from_service_account_file(
+        GOOGLE_SERVICE_ACCOUNT_FILE, scopes=DRIVE_SCOPES
+    )
+
+
+def _get_drive_service():
+    service = getattr(_drive_local, "service", None)
+    if service is None:
+        service = build(
+            "drive", "v3", credentials=_get_drive_credentials(), cache_discovery=False
+        )
+        _drive_local.service = service
+    return service
+
+
+def _sync_download(file_id: str) -> bytes:
+    buffer = io.BytesIO()
+    request = _get_drive_service().files().get_media(fileId=file_id)
+    downloader = MediaIoBaseDownload(buffer, request)
+    done = False
+    while not done:
+        _, done = downloader.next_chunk()
+    return buffer.getvalue()
+
+
+async def download_to_buffer(file_id: str) -> bytes:
+    """Download a Google Drive file into memory (no temp file on disk)"""
+    return await asyncio.to_thread(_sync_download, file_id)
 
 
 def setup_drive_webhook() -> str:
@@ -24,16 +24,22 @@ The current implementation provides a framework that can be adapted
 when a working job search API is available.
 """
 
-from typing import List, Dict, Optional
-from datetime import datetime, timedelta
+from typing import List, Dict, Optional, Set, Tuple
+from datetime import datetime, timezone
 from dataclasses import dataclass
+from functools import lru_cache
+from collections import OrderedDict, deque
 import asyncio
 import httpx
 import time
+import random
 import re
+import sys
 from decouple import config
 import logging
-import hashlib
+import orjson
+
+from .async_utils import gather_bounded
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -44,6 +50,36 @@ RAPIDAPI_KEY = config("RAPIDAPI_KEY", default="")
 RAPIDAPI_HOST = "fresh-linkedin-profile-data.p.rapidapi.com"
 RAPIDAPI_URL = f"https://{RAPIDAPI_HOST}"
 
+# (location, term) searches in flight at once in scrape_linkedin_jobs
+SCRAPE_CONCURRENCY = config("SCRAPE_CONCURRENCY", default=8, cast=int)
+
+# Connection pool sizing for the shared RapidAPI client (backpressure tuning)
+HTTPX_MAX_CONNECTIONS = config("HTTPX_MAX_CONNECTIONS", default=50, cast=int)
+HTTPX_MAX_KEEPALIVE_CONNECTIONS = config(
+    "HTTPX_MAX_KEEPALIVE_CONNECTIONS", default=25, cast=int
+)
+
+# Job details are stable for hours; keep recent ones in memory (LRU + TTL)
+JOB_DETAILS_CACHE_TTL = config("JOB_DETAILS_CACHE_TTL", default=3600, cast=int)
+JOB_DETAILS_CACHE_MAX_ENTRIES = 10_000
+
+# Batches larger than this are filtered on a worker thread, off the event loop
+FILTER_OFFLOAD_THRESHOLD = 1000
+
+# Retries for transient RapidAPI failures (connection errors, timeouts, 5xx)
+REQUEST_MAX_ATTEMPTS = 4
+REQUEST_RETRY_INITIAL_DELAY = 1.0
+REQUEST_RETRY_MAX_DELAY = 30.0
+TRANSIENT_STATUS_CODES = frozenset({500, 502, 503, 504})
+
+# Failures a RapidAPI call reports as "no result": HTTP/transport errors and
+# undecodable bodies
+_REQUEST_ERRORS = (httpx.HTTPError, ValueError)
+
+# Decision maker search polling: first wait, then doubled up to the cap
+POLL_INITIAL_DELAY = 1.0
+POLL_MAX_DELAY = 10.0
+
 # Location and role filtering rules
 MELBOURNE_KEYWORDS = ["melbourne", "vic", "victoria"]
 OTHER_CITIES = [
@@ -66,7 +102,46 @@ FINANCIAL_ROLES = [
 ]
 
 
-@dataclass
+@lru_cache(maxsize=32)
+def _keyword_pattern(
+    keywords: Tuple[str, ...], whole_words: bool = False
+) -> "re.Pattern[str]":
+    """Compile keywords into one case-insensitive alternation, longest first.
+
+    Matches substrings by default; whole_words anchors each keyword at word
+    boundaries so short codes like "sa" or "wa" don't fire inside words.
+    Matching ignores case, so callers search the raw text without lower().
+    """
+    escaped = sorted(
+        {re.escape(keyword.lower()) for keyword in keywords}, key=len, reverse=True
+    )
+    pattern = "|".join(escaped)
+    return re.compile(rf"\b(?:{pattern})\b" if whole_words else pattern, re.IGNORECASE)
+
+
+_MELBOURNE_PATTERN = _keyword_pattern(tuple(MELBOURNE_KEYWORDS), whole_words=True)
+_OTHER_CITIES_PATTERN = _keyword_pattern(tuple(OTHER_CITIES), whole_words=True)
+
+# Common financial services requirements: trigger substring -> requirement label
+REQUIREMENT_TRIGGERS = {
+    "cfa": "CFA certification",
+    "cfp": "CFP certification",
+    "years experience": "Relevant experience required",
+    "years of experience": "Relevant experience required",
+    "degree": "Bachelor's degree",
+    "bachelor": "Bachelor's degree",
+    "license": "Relevant licensing",
+}
+_REQUIREMENT_LABELS = list(dict.fromkeys(REQUIREMENT_TRIGGERS.values()))
+# ASCII-only case folding: Unicode folding would also match "ſ" or "İ", whose
+# lower() is not a REQUIREMENT_TRIGGERS key
+_REQUIREMENT_PATTERN = re.compile(
+    "|".join(sorted(map(re.escape, REQUIREMENT_TRIGGERS), key=len, reverse=True)),
+    re.ASCII | re.IGNORECASE,
+)
+
+
+@dataclass(slots=True, frozen=True)
 class Job:
     """Job dataclass representing a scraped LinkedIn job posting"""
 
@@ -87,38 +162,151 @@ class Job:
     experience_level: Optional[str] = None
 
 
+class RateLimited(Exception):
+    """RapidAPI answered 429; retry after ``wait`` seconds"""
+
+    def __init__(self, wait: float):
+        super().__init__(f"Rate limited by RapidAPI, retry in {wait:.0f}s")
+        self.wait = wait
+
+
 class RateLimiter:
-    """Rate limiter for API calls - 50 req/min"""
+    """
+    Rate limiter for API calls - 50 req/min.
+
+    Sliding window: a request counts against the limit for time_window
+    seconds after it was made, then expires. Timestamps come from
+    time.monotonic() so wall-clock adjustments cannot stretch or shrink the
+    window, and the check-and-record step runs under a lock so concurrent
+    callers cannot overshoot.
+    """
 
     def __init__(self, max_requests: int = 50, time_window: int = 60):
         self.max_requests = max_requests
         self.time_window = time_window
-        self.requests = []
+        self.requests = deque()
+        self._lock = asyncio.Lock()
 
     async def acquire(self) -> None:
         """Wait if necessary to respect rate limits"""
-        now = time.time()
+        async with self._lock:
+            now = time.monotonic()
 
-        # Remove old requests outside the time window
-        self.requests = [
-            req_time for req_time in self.requests if now - req_time < self.time_window
-        ]
+            # Drop requests that have left the window (oldest first)
+            while self.requests and now - self.requests[0] >= self.time_window:
+                self.requests.popleft()
 
-        # If we're at the limit, wait
-        if len(self.requests) >= self.max_requests:
-            oldest_request = min(self.requests)
-            wait_time = self.time_window - (now - oldest_request) + 1
-            if wait_time > 0:
-                print(f"Rate limit reached, waiting {wait_time:.1f} seconds")
-                await asyncio.sleep(wait_time)
+            # If we're at the limit, sleep until the oldest request expires
+            if len(self.requests) >= self.max_requests:
+                wait_time = self.time_window - (now - self.requests[0])
+                if wait_time > 0:
+                    print(f"Rate limit reached, waiting {wait_time:.1f} seconds")
+                    await asyncio.sleep(wait_time)
+                self.requests.popleft()
+                now = time.monotonic()
 
-        # Record this request
-        self.requests.append(now)
+            # Record this request
+            self.requests.append(now)
 
 
 # Global rate limiter instance - conservative for testing
 rate_limiter = RateLimiter(max_requests=10, time_window=60)
 
+# POST bodies are pre-serialised with orjson, so declare the type ourselves
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Shared RapidAPI client: keep-alive + HTTP/2 so calls skip the TCP/TLS handshake
+_client: Optional[httpx.AsyncClient] = None
+_client_lock = asyncio.Lock()
+
+
+async def get_client() -> httpx.AsyncClient:
+    """Return the shared RapidAPI client, creating it on first use"""
+    global _client
+    if _client is None or _client.is_closed:
+        async with _client_lock:
+            if _client is None or _client.is_closed:
+                _client = httpx.AsyncClient(
+                    base_url=RAPIDAPI_URL,
+                    headers={
+                        "X-RapidAPI-Key": RAPIDAPI_KEY,
+                        "X-RapidAPI-Host": RAPIDAPI_HOST,
+                    },
+                    http2=True,
+                    timeout=httpx.Timeout(
+                        connect=5.0, read=30.0, write=30.0, pool=10.0
+                    ),
+                    limits=httpx.Limits(
+                        max_connections=HTTPX_MAX_CONNECTIONS,
+                        max_keepalive_connections=HTTPX_MAX_KEEPALIVE_CONNECTIONS,
+                        keepalive_expiry=30,
+                    ),
+                )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared RapidAPI client"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _check_rate_limited(response: httpx.Response, path: str) -> None:
+    """Log the remaining RapidAPI quota and raise RateLimited on a 429"""
+    remaining = response.headers.get("X-RateLimit-Remaining")
+    logger.debug(
+        f"RapidAPI {path}: status={response.status_code} remaining={remaining}"
+    )
+
+    if response.status_code == 429:
+        try:
+            wait = float(orjson.loads(response.content).get("reset", 60))
+        except (ValueError, TypeError, AttributeError):
+            wait = 60.0
+        raise RateLimited(wait)
+
+
+def _json_object(response: httpx.Response) -> Dict:
+    """Decode a JSON response body, treating anything but an object as empty"""
+    data = orjson.loads(response.content)
+    return data if isinstance(data, dict) else {}
+
+
+async def _request(method: str, path: str, **kwargs) -> httpx.Response:
+    """Send a RapidAPI request, retrying transient failures with jittered backoff.
+
+    Connection errors, timeouts and 5xx responses are retried up to
+    REQUEST_MAX_ATTEMPTS times. A 429 raises RateLimited and any other error
+    status raises httpx.HTTPStatusError straight away.
+    """
+    client = await get_client()
+    delay = REQUEST_RETRY_INITIAL_DELAY
+    for attempt in range(1, REQUEST_MAX_ATTEMPTS + 1):
+        await rate_limiter.acquire()
+        try:
+            response = await client.request(method, path, **kwargs)
+        except httpx.TransportError as e:
+            if attempt == REQUEST_MAX_ATTEMPTS:
+                raise
+            logger.warning(f"RapidAPI {path} attempt {attempt} failed: {e!r}")
+        else:
+            _check_rate_limited(response, path)
+            if (
+                response.status_code not in TRANSIENT_STATUS_CODES
+                or attempt == REQUEST_MAX_ATTEMPTS
+            ):
+                response.raise_for_status()
+                return response
+            logger.warning(
+                f"RapidAPI {path} attempt {attempt} returned {response.status_code}"
+            )
+
+        # Full jitter keeps concurrent retries from re-colliding
+        await asyncio.sleep(random.uniform(0, delay))
+        delay = min(delay * 2, REQUEST_RETRY_MAX_DELAY)
+
 
 async def scrape_linkedin_jobs(
     location_filters: List[str], role_filters: List[str], hours_threshold: int = 24
@@ -139,75 +327,34 @@ async def scrape_linkedin_jobs(
         print("RAPIDAPI_KEY not configured, returning empty list")
         return []
 
-    headers = {"X-RapidAPI-Key": RAPIDAPI_KEY, "X-RapidAPI-Host": RAPIDAPI_HOST}
+    # Search for financial services jobs in each location, several at a time;
+    # the rate limiter (not a fixed sleep) paces the requests
+    search_terms = role_filters if role_filters else FINANCIAL_ROLES
+    now = datetime.now(timezone.utc)
+    searches = [
+        (location, term) for location in location_filters for term in search_terms
+    ]
+    # Searches overlap heavily; a posting seen by one is skipped by the rest
+    seen_urns: Set[str] = set()
+    results = await gather_bounded(
+        (
+            _search_one(location, term, hours_threshold, now, seen_urns)
+            for location, term in searches
+        ),
+        limit=SCRAPE_CONCURRENCY,
+        return_exceptions=True,
+    )
 
+    # One broken search shouldn't sink the batch; log it and keep the rest
     all_jobs = []
-
-    # Search for jobs in each location
-    for location in location_filters:
-        # Search for financial services jobs
-        search_terms = role_filters if role_filters else FINANCIAL_ROLES
-
-        for term in search_terms:
-            try:
-                await rate_limiter.acquire()
-
-                # Convert location to geo_code (simplified mapping for Australian cities)
-                geo_code = _get_geo_code_for_location(location)
-
-                # Prepare JSON payload as per API documentation
-                payload = {
-                    "keywords": term,
-                    "geo_code": geo_code,
-                    "date_posted": "Past 24 hours",
-                    "experience_levels": [],
-                    "company_ids": [],
-                    "title_ids": [],
-                    "onsite_remotes": [],
-                    "functions": [],
-                    "industries": ["Financial Services"],
-                    "job_types": [],
-                    "sort_by": "Most relevant",
-                    "easy_apply": "false",
-                    "under_10_applicants": "false",
-                    "start": 0,
-                }
-
-                # Update headers to include Content-Type for JSON
-                json_headers = {**headers, "Content-Type": "application/json"}
-
-                async with httpx.AsyncClient() as client:
-                    response = await client.post(
-                        f"{RAPIDAPI_URL}/search-jobs",
-                        headers=json_headers,
-                        json=payload,
-                        timeout=30.0,
-                    )
-                    response.raise_for_status()
-
-                    data = response.json()
-                    # API returns jobs in 'data' field as a list
-                    jobs = (
-                        data.get("data", [])
-                        if isinstance(data.get("data"), list)
-                        else []
-                    )
-
-                    # Process each job
-                    for job_data in jobs:
-                        processed_job = _process_job_data(job_data)
-                        if (
-                            processed_job
-                            and processed_job.posted_hours_ago <= hours_threshold
-                        ):
-                            all_jobs.append(processed_job)
-
-                # Longer delay between requests to avoid rate limits
-                await asyncio.sleep(5.0)
-
-            except Exception as e:
-                print(f"Error searching jobs for '{term}' in {location}: {str(e)}")
-                continue
+    for (location, term), result in zip(searches, results):
+        if isinstance(result, BaseException):
+            logger.error(
+                f"Search for '{term}' in {location} failed",
+                exc_info=result,
+            )
+            continue
+        all_jobs.extend(result)
 
     # Remove duplicates and apply filtering
     unique_jobs = _remove_duplicates(all_jobs)
@@ -217,6 +364,67 @@ async def scrape_linkedin_jobs(
     return filtered_jobs
 
 
+async def _search_one(
+    location: str,
+    term: str,
+    hours_threshold: int,
+    now: Optional[datetime] = None,
+    seen_urns: Optional[Set[str]] = None,
+) -> List[Job]:
+    """Run one /search-jobs query and return its jobs within hours_threshold
+
+    Results whose job_urn is already in ``seen_urns`` are skipped before
+    processing; new URNs are added to it.
+    """
+    try:
+        # Convert location to geo_code (simplified mapping for Australian cities)
+        geo_code = _get_geo_code_for_location(location)
+
+        # Prepare JSON payload as per API documentation
+        payload = {
+            "keywords": term,
+            "geo_code": geo_code,
+            "date_posted": "Past 24 hours",
+            "experience_levels": [],
+            "company_ids": [],
+            "title_ids": [],
+            "onsite_remotes": [],
+            "functions": [],
+            "industries": ["Financial Services"],
+            "job_types": [],
+            "sort_by": "Most relevant",
+            "easy_apply": "false",
+            "under_10_applicants": "false",
+            "start": 0,
+        }
+
+        response = await _request(
+            "POST", "/search-jobs", content=orjson.dumps(payload), headers=_JSON_HEADERS
+        )
+
+        data = _json_object(response)
+        # API returns jobs in 'data' field as a list
+        jobs = data.get("data") if isinstance(data.get("data"), list) else []
+
+    except (*_REQUEST_ERRORS, RateLimited) as e:
+        logger.error(f"Error searching jobs for '{term}' in {location}: {str(e)}")
+        return []
+
+    # Process each job
+    # Stale postings are dropped before a Job is built for them
+    found = []
+    for job_data in jobs:
+        urn = job_data.get("job_urn")
+        if seen_urns is not None and urn:
+            if urn in seen_urns:
+                continue
+            seen_urns.add(urn)
+        processed_job = _process_job_data(job_data, now, max_hours=hours_threshold)
+        if processed_job:
+            found.append(processed_job)
+    return found
+
+
 async def filter_jobs_by_criteria(
     jobs: List[Job],
     keep_all_melbourne: bool = True,
@@ -226,27 +434,32 @@ async def filter_jobs_by_criteria(
     if specific_roles_other_cities is None:
         specific_roles_other_cities = FINANCIAL_ROLES
 
+    roles = tuple(specific_roles_other_cities)
+    if len(jobs) > FILTER_OFFLOAD_THRESHOLD:
+        return await asyncio.to_thread(_filter_jobs, jobs, keep_all_melbourne, roles)
+    return _filter_jobs(jobs, keep_all_melbourne, roles)
+
+
+def _filter_jobs(
+    jobs: List[Job], keep_all_melbourne: bool, specific_roles: Tuple[str, ...]
+) -> List[Job]:
+    """Synchronous filter core: one case-insensitive regex scan per keyword set"""
+    role_pattern = _keyword_pattern(specific_roles)
     filtered_jobs = []
 
     for job in jobs:
-        location = job.location.lower()
-        job_title = job.job_title.lower()
+        location = job.location
 
         # Check if it's Melbourne - keep all roles
-        is_melbourne = any(keyword in location for keyword in MELBOURNE_KEYWORDS)
-        if is_melbourne and keep_all_melbourne:
+        if keep_all_melbourne and _MELBOURNE_PATTERN.search(location):
             filtered_jobs.append(job)
             continue
 
         # Check if it's other cities - only keep specific roles
-        is_other_city = any(city in location for city in OTHER_CITIES)
-        if is_other_city:
-            is_target_role = any(
-                role.lower() in job_title for role in specific_roles_other_cities
-            )
-            if is_target_role:
-                filtered_jobs.append(job)
-                continue
+        if _OTHER_CITIES_PATTERN.search(location) and role_pattern.search(
+            job.job_title
+        ):
+            filtered_jobs.append(job)
 
     return filtered_jobs
 
@@ -256,49 +469,49 @@ async def get_job_details(job_link: str) -> Dict:
     if not RAPIDAPI_KEY:
         return {}
 
-    headers = {"X-RapidAPI-Key": RAPIDAPI_KEY, "X-RapidAPI-Host": RAPIDAPI_HOST}
-
     try:
-        await rate_limiter.acquire()
-
         params = {"url": job_link}
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{RAPIDAPI_URL}/get-job-details",
-                headers=headers,
-                params=params,
-                timeout=30.0,
-            )
-            response.raise_for_status()
-
-            data = response.json()
-
-            return {
-                "company_name": data.get("company", {}).get("name", ""),
-                "full_description": data.get("description", ""),
-                "requirements": _extract_requirements(data.get("description", "")),
-                "company_size": data.get("company", {}).get("staffCountRange", ""),
-                "company_industry": data.get("company", {}).get("industries", []),
-                "salary_range": data.get("salaryRange", ""),
-                "experience_level": data.get("experienceLevel", ""),
-                "job_function": data.get("jobFunction", []),
-            }
-
-    except Exception as e:
-        print(f"Error fetching job details for {job_link}: {str(e)}")
+        response = await _request("GET", "/get-job-details", params=params)
+
+        data = _json_object(response)
+        company = data.get("company") or {}
+        description = data.get("description") or ""
+
+        return {
+            "company_name": company.get("name", ""),
+            "full_description": description,
+            "requirements": _extract_requirements(description),
+            "company_size": company.get("staffCountRange", ""),
+            "company_industry": company.get("industries", []),
+            "salary_range": data.get("salaryRange", ""),
+            "experience_level": data.get("experienceLevel", ""),
+            "job_function": data.get("jobFunction", []),
+        }
+
+    except (*_REQUEST_ERRORS, RateLimited) as e:
+        logger.error(f"Error fetching job details for {job_link}: {str(e)}")
         return {}
 
 
-def _process_job_data(job_data: Dict) -> Optional[Job]:
-    """Process raw job data from API into Job dataclass"""
+def _process_job_data(
+    job_data: Dict, now: Optional[datetime] = None, max_hours: Optional[int] = None
+) -> Optional[Job]:
+    """Process raw job data from API into Job dataclass
+
+    With ``max_hours``, postings older than that return None before any
+    other field is built.
+    """
     try:
         # Extract posted time and convert to hours ago
         posted_time = job_data.get("posted_time", "")
-        hours_ago = _parse_posted_time_from_timestamp(posted_time)
+        hours_ago = _parse_posted_time_from_timestamp(posted_time, now)
+        if max_hours is not None and hours_ago > max_hours:
+            return None
 
         # Generate company_id from company name
-        company_name = job_data.get("company", "")
+        # Interned: the same few companies and cities repeat across postings
+        company_name = sys.intern(job_data.get("company") or "")
         company_id = _generate_company_id(company_name)
 
         return Job(
@@ -306,10 +519,15 @@ def _process_job_data(job_data: Dict) -> Optional[Job]:
             company_name=company_name,
             job_title=job_data.get("job_title", ""),
             job_link=job_data.get("job_url", ""),
-            location=job_data.get("location", ""),
+            location=sys.intern(job_data.get("location") or ""),
             posted_hours_ago=hours_ago,
             posted_time=posted_time,
-            scraped_at=datetime.now().isoformat(),
+            # Naive local time, like the created_at/updated_at defaults it sits beside
+            scraped_at=(
+                now.astimezone().replace(tzinfo=None).isoformat()
+                if now
+                else datetime.now().isoformat()
+            ),
             job_type=job_data.get("remote", ""),  # Using remote field as job type
             company_logo=job_data.get("company_logo", ""),
             company_url=job_data.get("company_linkedin_url", ""),
@@ -323,38 +541,40 @@ def _process_job_data(job_data: Dict) -> Optional[Job]:
 
 
 def _remove_duplicates(jobs: List[Job]) -> List[Job]:
-    """Remove duplicate jobs based on job_link"""
-    seen_links = set()
-    unique_jobs = []
-
+    """Remove duplicate jobs based on job_link, keeping the first of each"""
+    unique_jobs: Dict[str, Job] = {}
     for job in jobs:
-        if job.job_link and job.job_link not in seen_links:
-            seen_links.add(job.job_link)
-            unique_jobs.append(job)
+        if job.job_link:
+            unique_jobs.setdefault(job.job_link, job)
+    return list(unique_jobs.values())
 
-    return unique_jobs
 
+@lru_cache(maxsize=4096)
+def _parse_ts(posted_time: str) -> datetime:
+    """Parse a timestamp string (e.g., '2025-06-21 06:51:58') to an aware datetime"""
+    posted_dt = datetime.fromisoformat(posted_time.replace(" ", "T"))
 
-def _parse_posted_time_from_timestamp(posted_time: str) -> int:
-    """Parse timestamp format (e.g., '2025-06-21 06:51:58') to hours ago"""
-    if not posted_time:
-        return 999  # Assume very old if no time provided
+    # If posted_dt is naive (no timezone), assume UTC
+    if posted_dt.tzinfo is None:
+        posted_dt = posted_dt.replace(tzinfo=timezone.utc)
+    return posted_dt
 
-    try:
-        from datetime import datetime, timezone
 
-        # Parse the timestamp
-        posted_dt = datetime.fromisoformat(posted_time.replace(" ", "T"))
+def _parse_posted_time_from_timestamp(
+    posted_time: str, now: Optional[datetime] = None
+) -> int:
+    """Parse timestamp format (e.g., '2025-06-21 06:51:58') to hours ago
 
-        # Get current time in UTC
-        current_dt = datetime.now(timezone.utc)
+    Pass ``now`` to measure a whole batch against the same instant.
+    """
+    if not posted_time:
+        return 999  # Assume very old if no time provided
 
-        # If posted_dt is naive (no timezone), assume UTC
-        if posted_dt.tzinfo is None:
-            posted_dt = posted_dt.replace(tzinfo=timezone.utc)
+    try:
+        posted_dt = _parse_ts(posted_time)
 
         # Calculate hours difference
-        time_diff = current_dt - posted_dt
+        time_diff = (now or datetime.now(timezone.utc)) - posted_dt
         hours_ago = int(time_diff.total_seconds() / 3600)
 
         return max(0, hours_ago)  # Don't return negative hours
@@ -364,42 +584,32 @@ def _parse_posted_time_from_timestamp(posted_time: str) -> int:
         return 999  # Default to very old if can't parse
 
 
-def _parse_posted_time(posted_time: str) -> int:
-    """Parse LinkedIn posted time string to hours ago"""
-    if not posted_time:
-        return 999  # Assume very old if no time provided
+# Relative posted times ("2 hours ago", "a day ago"); a missing count means one
+_POSTED_RE = re.compile(r"(?:(\d+)\s*)?(minute|hour|day|week)", re.IGNORECASE)
 
-    posted_time = posted_time.lower()
+# Hours per unit; anything under an hour counts as 0
+_POSTED_UNIT_HOURS = {"minute": 0, "hour": 1, "day": 24, "week": 7 * 24}
 
-    if "hour" in posted_time:
-        # Extract number from "X hours ago"
-        try:
-            hours = int("".join(filter(str.isdigit, posted_time)))
-            return hours
-        except ValueError:
-            return 1  # Default to 1 hour if can't parse
 
-    elif "day" in posted_time:
-        # Extract number from "X days ago"
-        try:
-            days = int("".join(filter(str.isdigit, posted_time)))
-            return days * 24  # Convert to hours
-        except ValueError:
-            return 24  # Default to 1 day
+@lru_cache(maxsize=512)
+def _parse_posted_time(posted_time: str) -> int:
+    """Parse LinkedIn posted time string to hours ago"""
+    match = _POSTED_RE.search(posted_time)
+    if not match:
+        return 999  # Assume very old if empty or unrecognised
 
-    elif "minute" in posted_time:
-        return 0  # Less than 1 hour
+    count, unit = match.groups()
+    return int(count or 1) * _POSTED_UNIT_HOURS[unit.lower()]
 
-    elif "week" in posted_time:
-        try:
-            weeks = int("".join(filter(str.isdigit, posted_time)))
-            return weeks * 7 * 24  # Convert to hours
-        except ValueError:
-            return 7 * 24  # Default to 1 week
 
-    return 999  # Default to very old
+# Common legal suffixes stripped from company names, applied in order
+_COMPANY_SUFFIXES = (" pty ltd", " ltd", " inc", " corp", " llc", " limited")
+
+# Maps every non-alphanumeric ASCII character to an underscore
+_ID_TABLE = str.maketrans({c: "_" for c in map(chr, range(128)) if not c.isalnum()})
 
 
+@lru_cache(maxsize=4096)
 def _generate_company_id(company_name: str) -> str:
     """Generate a consistent company ID from company name"""
     if not company_name:
@@ -408,34 +618,44 @@ def _generate_company_id(company_name: str) -> str:
     # Clean and normalize company name
     clean_name = company_name.lower().strip()
     # Remove common suffixes
-    suffixes = [" pty ltd", " ltd", " inc", " corp", " llc", " limited"]
-    for suffix in suffixes:
-        if clean_name.endswith(suffix):
-            clean_name = clean_name[: -len(suffix)].strip()
+    for suffix in _COMPANY_SUFFIXES:
+        trimmed = clean_name.removesuffix(suffix)
+        if trimmed != clean_name:
+            clean_name = trimmed.strip()
 
     # Replace spaces and special characters with underscores
-    company_id = "".join(c if c.isalnum() else "_" for c in clean_name)
-    return company_id
+    if clean_name.isascii():
+        return clean_name.translate(_ID_TABLE)
+    return "".join(c if c.isalnum() else "_" for c in clean_name)
+
+
+# LinkedIn geo codes for major Australian cities, longest name first so the
+# most specific city wins
+_GEO_CODES: Tuple[Tuple[str, int], ...] = tuple(
+    sorted(
+        {
+            "melbourne": 101452733,  # Melbourne, Australia
+            "sydney": 105072130,  # Sydney, Australia
+            "brisbane": 100446943,  # Brisbane, Australia
+            "perth": 102890883,  # Perth, Australia
+            "adelaide": 101620260,  # Adelaide, Australia
+            "canberra": 101586013,  # Canberra, Australia
+            "darwin": 101586014,  # Darwin, Australia
+            "hobart": 101586015,  # Hobart, Australia
+        }.items(),
+        key=lambda item: len(item[0]),
+        reverse=True,
+    )
+)
 
 
+@lru_cache(maxsize=256)
 def _get_geo_code_for_location(location: str) -> int:
     """Map location string to LinkedIn geo code for Australian cities"""
     location_lower = location.lower()
 
-    # LinkedIn geo codes for major Australian cities
-    geo_codes = {
-        "melbourne": 101452733,  # Melbourne, Australia
-        "sydney": 105072130,  # Sydney, Australia
-        "brisbane": 100446943,  # Brisbane, Australia
-        "perth": 102890883,  # Perth, Australia
-        "adelaide": 101620260,  # Adelaide, Australia
-        "canberra": 101586013,  # Canberra, Australia
-        "darwin": 101586014,  # Darwin, Australia
-        "hobart": 101586015,  # Hobart, Australia
-    }
-
     # Find matching city
-    for city, code in geo_codes.items():
+    for city, code in _GEO_CODES:
         if city in location_lower:
             return code
 
@@ -448,51 +668,84 @@ def _extract_requirements(description: str) -> List[str]:
     if not description:
         return []
 
-    requirements = []
-    description_lower = description.lower()
+    # One pass over the description finds every trigger at once
+    found = {
+        REQUIREMENT_TRIGGERS[match.group().lower()]
+        for match in _REQUIREMENT_PATTERN.finditer(description)
+    }
+    return [label for label in _REQUIREMENT_LABELS if label in found]
 
-    # Look for common financial services requirements
-    if "cfa" in description_lower:
-        requirements.append("CFA certification")
 
-    if "cfp" in description_lower:
-        requirements.append("CFP certification")
+# Additional API functions for the complete workflow
 
-    if any(
-        exp in description_lower for exp in ["years experience", "years of experience"]
-    ):
-        requirements.append("Relevant experience required")
 
-    if "degree" in description_lower or "bachelor" in description_lower:
-        requirements.append("Bachelor's degree")
+# job_url -> (details, monotonic deadline), least recently used first
+_details_cache: "OrderedDict[str, Tuple[Dict, float]]" = OrderedDict()
+_details_inflight: Dict[str, "asyncio.Future[Optional[Dict]]"] = {}
 
-    if "license" in description_lower:
-        requirements.append("Relevant licensing")
 
-    return requirements
+def _details_cache_get(job_url: str) -> Optional[Dict]:
+    entry = _details_cache.get(job_url)
+    if entry is None:
+        return None
+    details, deadline = entry
+    if time.monotonic() >= deadline:
+        del _details_cache[job_url]
+        return None
+    _details_cache.move_to_end(job_url)
+    return details
 
 
-# Additional API functions for the complete workflow
+def _details_cache_put(job_url: str, details: Dict) -> None:
+    _details_cache[job_url] = (details, time.monotonic() + JOB_DETAILS_CACHE_TTL)
+    _details_cache.move_to_end(job_url)
+    while len(_details_cache) > JOB_DETAILS_CACHE_MAX_ENTRIES:
+        _details_cache.popitem(last=False)
 
 
 async def get_job_details_enhanced(job_url: str) -> Optional[Dict]:
     """Get detailed job information from a LinkedIn job URL using the correct API.
 
+    Results are cached per URL for JOB_DETAILS_CACHE_TTL seconds, and
+    concurrent calls for the same URL share a single request.
+
     Args:
         job_url: LinkedIn job URL (e.g., https://www.linkedin.com/jobs/view/3766410207/)
 
     Returns:
         Dict with job details or None if failed
     """
+    cached = _details_cache_get(job_url)
+    if cached is not None:
+        return cached
+
+    future = _details_inflight.get(job_url)
+    if future is not None:
+        return await asyncio.shield(future)
+
+    future = asyncio.get_running_loop().create_future()
+    _details_inflight[job_url] = future
+    try:
+        details = await _fetch_job_details(job_url)
+    except BaseException:
+        # Waiters see a miss rather than inheriting this caller's cancellation
+        future.set_result(None)
+        raise
+    else:
+        if details is not None:
+            _details_cache_put(job_url, details)
+        future.set_result(details)
+        return details
+    finally:
+        del _details_inflight[job_url]
+
+
+async def _fetch_job_details(job_url: str) -> Optional[Dict]:
+    """Call /get-job-details for one URL"""
     if not RAPIDAPI_KEY:
         logger.warning("RAPIDAPI_KEY not configured - cannot fetch job details")
         return None
 
-    headers = {
-        "X-RapidAPI-Key": RAPIDAPI_KEY,
-        "X-RapidAPI-Host": RAPIDAPI_HOST,
-    }
-
     params = {
         "job_url": job_url,
         "include_skills": "false",
@@ -500,28 +753,71 @@ async def get_job_details_enhanced(job_url: str) -> Optional[Dict]:
     }
 
     try:
-        await rate_limiter.acquire()
-
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{RAPIDAPI_URL}/get-job-details",
-                headers=headers,
-                params=params,
-                timeout=30.0,
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await _request("GET", "/get-job-details", params=params)
+        return orjson.loads(response.content)
 
-    except Exception as e:
+    except (*_REQUEST_ERRORS, RateLimited) as e:
         logger.error(f"Error fetching job details for {job_url}: {str(e)}")
         return None
 
 
+async def get_job_details_many(
+    job_urls: List[str], concurrency: int = 8
+) -> Dict[str, Dict]:
+    """Fetch details for many LinkedIn job URLs concurrently.
+
+    Args:
+        job_urls: LinkedIn job URLs
+        concurrency: Maximum requests in flight at once (the rate limiter
+            still paces them)
+
+    Returns:
+        Dict mapping each URL to its job details; failed URLs are omitted
+    """
+    urls = list(dict.fromkeys(job_urls))
+    results = await gather_bounded(
+        (get_job_details_enhanced(url) for url in urls),
+        limit=concurrency,
+        return_exceptions=True,
+    )
+    return {
+        url: details
+        for url, details in zip(urls, results)
+        if details and not isinstance(details, BaseException)
+    }
+
+
+async def _retry_rate_limited(call, deadline: float):
+    """Await call(), sleeping out 429 resets until the monotonic deadline"""
+    while True:
+        try:
+            return await call()
+        except RateLimited as e:
+            if time.monotonic() + e.wait >= deadline:
+                raise
+            logger.warning(f"{e}; waiting before retrying")
+            await asyncio.sleep(e.wait)
+
+
+DECISION_MAKER_TITLES = [
+    "CEO",
+    "Founder",
+    "Co-Founder",
+    "Owner",
+    "CFO",
+    "Managing Director",
+    "Director",
+    "Practice Manager",
+    "General Manager",
+]
+
+
 async def search_decision_makers(
     company_name: str,
     job_title: str = "",
     company_ids: List[int] = None,
     geo_codes: List[int] = None,
+    title_keywords: List[str] = None,
 ) -> Optional[str]:
     """Search for decision makers at a company using the correct API format.
 
@@ -530,9 +826,13 @@ async def search_decision_makers(
         job_title: Optional job title context
         company_ids: Optional list of LinkedIn company IDs
         geo_codes: Optional list of geo codes for location filtering
+        title_keywords: Optional titles to accept (defaults to DECISION_MAKER_TITLES)
 
     Returns:
         Request ID for checking search status, or None if failed
+
+    Raises:
+        RateLimited: RapidAPI returned 429
     """
     if not RAPIDAPI_KEY:
         logger.warning("RAPIDAPI_KEY not configured - cannot search decision makers")
@@ -542,48 +842,56 @@ async def search_decision_makers(
     payload = {
         "company_ids": company_ids
         or [],  # Will need to implement company name to ID lookup
-        "title_keywords": [
-            "CEO",
-            "Founder",
-            "Co-Founder",
-            "Owner",
-            "CFO",
-            "Managing Director",
-            "Director",
-            "Practice Manager",
-            "General Manager",
-        ],
+        "title_keywords": title_keywords or DECISION_MAKER_TITLES,
         "geo_codes": geo_codes or [101452733],  # Default to Melbourne
         "limit": "5",
     }
 
-    headers = {
-        "X-RapidAPI-Key": RAPIDAPI_KEY,
-        "X-RapidAPI-Host": RAPIDAPI_HOST,
-        "Content-Type": "application/json",
-    }
-
     try:
-        await rate_limiter.acquire()
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{RAPIDAPI_URL}/search-decision-makers",
-                headers=headers,
-                json=payload,
-                timeout=30.0,
-            )
-            response.raise_for_status()
-            data = response.json()
+        response = await _request(
+            "POST",
+            "/search-decision-makers",
+            content=orjson.dumps(payload),
+            headers=_JSON_HEADERS,
+        )
+        data = _json_object(response)
 
-            # Return the request_id for status checking
-            return data.get("request_id")
+        # Return the request_id for status checking
+        return data.get("request_id")
 
-    except Exception as e:
+    except _REQUEST_ERRORS as e:
         logger.error(f"Error searching decision makers for {company_name}: {str(e)}")
         return None
 
 
+async def get_company_by_linkedin_url(linkedin_url: str) -> Optional[Dict]:
+    """Look up a company profile, including its numeric company_id.
+
+    Args:
+        linkedin_url: The company's LinkedIn page, e.g. from a job posting
+
+    Returns:
+        Company profile dict, or None if failed or unknown
+
+    Raises:
+        RateLimited: RapidAPI returned 429
+    """
+    if not RAPIDAPI_KEY:
+        logger.warning("RAPIDAPI_KEY not configured - cannot look up companies")
+        return None
+
+    params = {"linkedin_url": linkedin_url}
+
+    try:
+        response = await _request("GET", "/get-company-by-linkedinurl", params=params)
+        company = _json_object(response).get("data")
+        return company if isinstance(company, dict) else None
+
+    except _REQUEST_ERRORS as e:
+        logger.error(f"Error looking up company {linkedin_url}: {str(e)}")
+        return None
+
+
 async def check_search_status(request_id: str) -> Optional[Dict]:
     """Check the status of a decision maker search.
 
@@ -592,32 +900,21 @@ async def check_search_status(request_id: str) -> Optional[Dict]:
 
     Returns:
         Status information or None if failed
+
+    Raises:
+        RateLimited: RapidAPI returned 429
     """
     if not RAPIDAPI_KEY:
         logger.warning("RAPIDAPI_KEY not configured - cannot check search status")
         return None
 
-    headers = {
-        "X-RapidAPI-Key": RAPIDAPI_KEY,
-        "X-RapidAPI-Host": RAPIDAPI_HOST,
-    }
-
     params = {"request_id": request_id}
 
     try:
-        await rate_limiter.acquire()
-
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{RAPIDAPI_URL}/check-search-status",
-                headers=headers,
-                params=params,
-                timeout=30.0,
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await _request("GET", "/check-search-status", params=params)
+        return _json_object(response)
 
-    except Exception as e:
+    except _REQUEST_ERRORS as e:
         logger.error(f"Error checking search status for {request_id}: {str(e)}")
         return None
 
@@ -630,35 +927,25 @@ async def get_search_results(request_id: str) -> Optional[List[Dict]]:
 
     Returns:
         List of decision maker profiles or None if failed
+
+    Raises:
+        RateLimited: RapidAPI returned 429
     """
     if not RAPIDAPI_KEY:
         logger.warning("RAPIDAPI_KEY not configured - cannot get search results")
         return None
 
-    headers = {
-        "X-RapidAPI-Key": RAPIDAPI_KEY,
-        "X-RapidAPI-Host": RAPIDAPI_HOST,
-    }
-
     params = {"request_id": request_id}
 
     try:
-        await rate_limiter.acquire()
+        response = await _request("GET", "/get-search-results", params=params)
+        data = _json_object(response)
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{RAPIDAPI_URL}/get-search-results",
-                headers=headers,
-                params=params,
-                timeout=30.0,
-            )
-            response.raise_for_status()
-            data = response.json()
+        # Return the results list
+        results = data.get("results")
+        return results if isinstance(results, list) else []
 
-            # Return the results list
-            return data.get("results", [])
-
-    except Exception as e:
+    except _REQUEST_ERRORS as e:
         logger.error(f"Error getting search results for {request_id}: {str(e)}")
         return None
 
@@ -675,45 +962,92 @@ async def find_decision_makers_for_job(
     Returns:
         List of decision maker profiles or None if failed/timeout
     """
-    # Start the search
-    request_id = await search_decision_makers(job.company_name, job.job_title)
+    return await find_decision_makers(
+        job.company_name, job.job_title, max_wait_seconds=max_wait_seconds
+    )
 
-    if not request_id:
-        logger.error(f"Failed to start decision maker search for {job.company_name}")
-        return None
 
-    logger.info(
-        f"Started decision maker search for {job.company_name}, request_id: {request_id}"
-    )
+async def find_decision_makers(
+    company_name: str,
+    job_title: str = "",
+    company_ids: List[int] = None,
+    title_keywords: List[str] = None,
+    max_wait_seconds: int = 60,
+) -> Optional[List[Dict]]:
+    """Run a decision maker search to completion: start, poll, fetch results.
 
-    # Poll for completion
-    start_time = time.time()
-    while time.time() - start_time < max_wait_seconds:
-        status = await check_search_status(request_id)
+    Args:
+        company_name: Name of the company (for logging and search context)
+        job_title: Optional job title context
+        company_ids: Optional LinkedIn company IDs to scope the search to
+        title_keywords: Optional titles to accept
+        max_wait_seconds: Maximum time to wait for search completion
 
-        if not status:
-            logger.error(f"Failed to check status for request {request_id}")
+    Returns:
+        List of decision maker profiles or None if failed/timeout
+    """
+    deadline = time.monotonic() + max_wait_seconds
+
+    try:
+        # Start the search
+        request_id = await _retry_rate_limited(
+            lambda: search_decision_makers(
+                company_name,
+                job_title,
+                company_ids=company_ids,
+                title_keywords=title_keywords,
+            ),
+            deadline,
+        )
+
+        if not request_id:
+            logger.error(f"Failed to start decision maker search for {company_name}")
             return None
 
-        status_value = status.get("status", "").lower()
-        logger.info(f"Search status for {job.company_name}: {status_value}")
+        logger.info(
+            f"Started decision maker search for {company_name}, request_id: {request_id}"
+        )
 
-        if status_value == "completed":
-            # Get the results
-            results = await get_search_results(request_id)
-            logger.info(
-                f"Found {len(results) if results else 0} decision makers for {job.company_name}"
+        # Poll for completion, backing off while the search is still running
+        delay = POLL_INITIAL_DELAY
+        while True:
+            status = await _retry_rate_limited(
+                lambda: check_search_status(request_id), deadline
             )
-            return results
 
-        elif status_value == "failed":
-            logger.error(f"Decision maker search failed for {job.company_name}")
-            return None
-
-        # Wait before next check
-        await asyncio.sleep(5)
+            if not status:
+                logger.error(f"Failed to check status for request {request_id}")
+                return None
+
+            status_value = (status.get("status") or "").lower()
+            logger.info(f"Search status for {company_name}: {status_value}")
+
+            if status_value == "completed":
+                # Get the results
+                results = await _retry_rate_limited(
+                    lambda: get_search_results(request_id), deadline
+                )
+                logger.info(
+                    f"Found {len(results) if results else 0} decision makers for {company_name}"
+                )
+                return results
+
+            elif status_value == "failed":
+                logger.error(f"Decision maker search failed for {company_name}")
+                return None
+
+            # Wait before next check
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * 2, POLL_MAX_DELAY)
+
+    except RateLimited as e:
+        logger.warning(f"Decision maker search for {company_name} gave up: {e}")
+        return None
 
-    logger.warning(f"Decision maker search timed out for {job.company_name}")
+    logger.warning(f"Decision maker search timed out for {company_name}")
     return None
 
 
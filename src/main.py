@@ -1,30 +1,52 @@
 """FastAPI Main - Entrypoint + manual endpoints"""
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
 import asyncio
 from contextlib import asynccontextmanager
 
-from .scheduler import RecruitmentScheduler, manual_run_pipeline
-from .jobs_scraper import scrape_linkedin_jobs
-from .contacts import search_decision_maker
-from .vector_matcher import find_best_matches
-from .messaging import MessageBuilder
-from .sheet_writer import write_daily_outreach_sheet
+if TYPE_CHECKING:
+    from .scheduler import RecruitmentScheduler
 
 
-# Global scheduler instance
-scheduler = RecruitmentScheduler()
+# Pipeline modules pull in httpx, numpy, gspread and the database client, so
+# they're imported where they're first needed rather than at app import
+_scheduler: Optional["RecruitmentScheduler"] = None
+
+
+def get_scheduler() -> "RecruitmentScheduler":
+    """Return the global scheduler, creating it on first use"""
+    global _scheduler
+    if _scheduler is None:
+        from .scheduler import RecruitmentScheduler
+
+        _scheduler = RecruitmentScheduler()
+    return _scheduler
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Startup and shutdown events"""
+    from .database import init_db_pool, close_db_pool, ensure_schema
+    from .drive_ingest import shutdown_extract_executor
+    from .jobs_scraper import close_client as close_scraper_client
+    from .messaging import close_anthropic_client
+    from .scheduler import setup_all_scheduled_jobs
+
     # Startup
+    await init_db_pool()
+    await ensure_schema()
+    scheduler = get_scheduler()
+    # Register the daily MYT triggers before starting, or nothing ever fires
+    setup_all_scheduled_jobs(scheduler)
     scheduler.start()
     yield
     # Shutdown
     scheduler.stop()
+    await close_scraper_client()
+    await close_anthropic_client()
+    await close_db_pool()
+    shutdown_extract_executor()
 
 
 app = FastAPI(
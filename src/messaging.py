@@ -1,24 +1,132 @@
 """Message Builder - Template + guard-rails for LinkedIn Recruiter messages"""
 
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+import asyncio
 import random
+import re
+
+import httpx
+from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
+from decouple import config
+
+
+CLAUDE_MODEL = config("CLAUDE_MODEL", default="claude-3-haiku-20240307")
+CLAUDE_MAX_TOKENS = 1024
+
+# Message Batches are polled with backoff: first wait, then doubled up to the cap
+BATCH_POLL_INITIAL_DELAY = 5.0
+BATCH_POLL_MAX_DELAY = 60.0
+
+# A row is "simple" (lite prompt, temperature 0) when its candidate has at most
+# this many bullets, each no longer than SIMPLE_BULLET_MAX_WORDS
+SIMPLE_MAX_BULLETS = 3
+SIMPLE_BULLET_MAX_WORDS = 25
+
+# Longer bullets are cut to this many words
+BULLET_MAX_WORDS = 25
+
+# Rows the batch could not answer are retried directly, this many at a time
+FALLBACK_CONCURRENCY = 5
+
+# Anthropic ignores cache_control on prefixes shorter than this (2048 tokens
+# on Haiku, 1024 on larger models), so shorter prefixes are never warmed
+CACHE_MIN_TOKENS = config("CACHE_MIN_TOKENS", default=2048, cast=int)
+# Rough English chars-per-token ratio, enough to judge whether a prefix is cacheable
+CHARS_PER_TOKEN = 4
+
+# Posting text sent as each job's shared context
+JOB_CONTEXT_CHARS = 8000
+
+MYT = ZoneInfo("Asia/Kuala_Lumpur")
+
+ANTHROPIC_MAX_CONNECTIONS = 50
 
 
 # === Style-guide (v2 — Jeremy Toh) ===
 CHAR_LIMIT = 1200
 SAFE_MARGIN = 20
 
-PROMPT_TEMPLATE = r"""
+_GREETING = re.compile(r"^(?:Hi|Hello|Dear) [^\s,]+,", re.MULTILINE)
+
+# Common American spellings that slip into drafts
+_US_SPELLING = re.compile(
+    r"\b(?:organiz|recogniz|specializ|prioritiz|optimiz|analyz|realiz|"
+    r"centers?\b|colors?\b|favorit|behavior|honor)",
+    re.IGNORECASE,
+)
+
+# Variant pools sampled per message so consecutive sends don't read identically
+SMALL_TALK_VARIANTS: Tuple[str, ...] = (
+    "Hope you're having a great week!",
+    "Hope the week's treating you well.",
+    "Hope you've had a good start to the week.",
+    "Hope things are going well at your end.",
+)
+
+CTA_VARIANTS: Tuple[str, ...] = (
+    "Would love to discuss this opportunity further.",
+    "Happy to share their full CV if it's of interest.",
+    "Would you be open to a quick chat this week?",
+    "Let me know if you'd like to arrange an introduction.",
+)
+
+SNAPSHOT_PHRASES: Tuple[str, ...] = (
+    "a quick snapshot of their background",
+    "a brief overview of their experience",
+)
+
+
+class VariantDeck:
+    """
+    Deal variants round-robin from a shuffled copy of a pool.
+
+    Every variant is used once per pass, and a new pass is reshuffled so it
+    never starts with the variant that ended the last one.
+    """
+
+    def __init__(self, pool: Tuple[str, ...]):
+        self._pool = pool
+        self._deck = random.sample(pool, len(pool))
+        self._index = 0
+
+    def draw(self) -> str:
+        if self._index == len(self._deck):
+            last = self._deck[-1]
+            self._deck = random.sample(self._pool, len(self._pool))
+            if len(self._deck) > 1 and self._deck[0] == last:
+                self._deck[0], self._deck[-1] = self._deck[-1], self._deck[0]
+            self._index = 0
+        variant = self._deck[self._index]
+        self._index += 1
+        return variant
+
+
+# Persona and rules, shared by every message
+SYSTEM_PERSONA = r"""
 You are **Jeremy Toh**. Produce a LinkedIn Recruiter message in first-person that obeys ALL rules above.
+"""
 
+FEW_SHOT_EXAMPLES = r"""
 Few-shot examples
 =================
 (keep the two provided samples verbatim)
 
 END EXAMPLES
 =============
+"""
+
+# Static instructions and few-shot examples, identical for every message. Sent
+# as a cached system block so the batch prefills it once.
+SYSTEM_PREFIX = SYSTEM_PERSONA + FEW_SHOT_EXAMPLES
+
+# Simple rows are a straight template fill and don't need the examples
+SYSTEM_PREFIX_LITE = SYSTEM_PERSONA
 
+# Per-message variables and output skeleton
+USER_TEMPLATE = r"""
 Now write a fresh message with:
 
 {{ day_of_week }}  
@@ -57,6 +165,133 @@ Jeremy Toh
 Director @ Overdrive Recruitment | ⭐️ 60+ Recommendations ⭐️ | {{ sig_tagline }}
 """
 
+PROMPT_TEMPLATE = SYSTEM_PREFIX + USER_TEMPLATE
+
+
+_TEMPLATE_VARIABLE = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+# USER_TEMPLATE parsed once: split() alternates literal text and slot names
+_TEMPLATE_PARTS = _TEMPLATE_VARIABLE.split(USER_TEMPLATE)
+_TEMPLATE_LITERALS = _TEMPLATE_PARTS[0::2]
+_TEMPLATE_SLOTS = _TEMPLATE_PARTS[1::2]
+
+
+def render_prompt(variables: Dict[str, Any]) -> str:
+    """Fill the {{ ... }} slots in USER_TEMPLATE; missing variables render empty"""
+    parts = [_TEMPLATE_LITERALS[0]]
+    for slot, literal in zip(_TEMPLATE_SLOTS, _TEMPLATE_LITERALS[1:]):
+        parts.append(str(variables.get(slot, "")))
+        parts.append(literal)
+    return "".join(parts)
+
+
+_anthropic_client: Optional[AsyncAnthropic] = None
+
+
+def _get_anthropic_client() -> AsyncAnthropic:
+    """One client per process; its HTTP/2 pool multiplexes concurrent calls"""
+    global _anthropic_client
+    if _anthropic_client is None:
+        _anthropic_client = AsyncAnthropic(
+            api_key=config("ANTHROPIC_API_KEY", default=""),
+            http_client=DefaultAsyncHttpxClient(
+                http2=True,
+                timeout=httpx.Timeout(connect=5.0, read=60.0, write=30.0, pool=10.0),
+                limits=httpx.Limits(
+                    max_connections=ANTHROPIC_MAX_CONNECTIONS,
+                    max_keepalive_connections=ANTHROPIC_MAX_CONNECTIONS,
+                ),
+            ),
+        )
+    return _anthropic_client
+
+
+async def close_anthropic_client() -> None:
+    """Close the shared Anthropic client and its connection pool"""
+    global _anthropic_client
+    if _anthropic_client is not None:
+        await _anthropic_client.close()
+        _anthropic_client = None
+
+
+# The shared prefix is marked for prompt caching so only the per-message
+# variables are prefilled on each call
+SYSTEM_BLOCKS = [
+    {"type": "text", "text": SYSTEM_PREFIX, "cache_control": {"type": "ephemeral"}}
+]
+SYSTEM_BLOCKS_LITE = [
+    {
+        "type": "text",
+        "text": SYSTEM_PREFIX_LITE,
+        "cache_control": {"type": "ephemeral"},
+    }
+]
+
+
+def is_simple_message(candidate_bullets: List[str]) -> bool:
+    """True when the bullets fit the template as-is and need no rewriting"""
+    return len(candidate_bullets) <= SIMPLE_MAX_BULLETS and all(
+        len(bullet.split()) <= SIMPLE_BULLET_MAX_WORDS for bullet in candidate_bullets
+    )
+
+
+def _row_is_simple(row: Dict[str, Any]) -> bool:
+    """Use the row's precomputed is_simple flag, else judge its candidate_bullets"""
+    if "is_simple" in row:
+        return bool(row["is_simple"])
+    if "candidate_bullets" in row:
+        return is_simple_message(row["candidate_bullets"])
+    return False
+
+
+def _message_params(
+    prompt: str, simple: bool = False, job_context: str = ""
+) -> Dict[str, Any]:
+    """
+    messages.create arguments for one rendered USER_TEMPLATE prompt.
+
+    job_context, shared by every row for the same job, goes first in the
+    user turn behind its own cache breakpoint so only the per-candidate
+    prompt differs between those rows.
+    """
+    content: Any = prompt
+    if job_context:
+        content = [
+            {
+                "type": "text",
+                "text": job_context,
+                "cache_control": {"type": "ephemeral"},
+            },
+            {"type": "text", "text": prompt},
+        ]
+    params = {
+        "model": CLAUDE_MODEL,
+        "max_tokens": CLAUDE_MAX_TOKENS,
+        "system": SYSTEM_BLOCKS_LITE if simple else SYSTEM_BLOCKS,
+        "messages": [{"role": "user", "content": content}],
+    }
+    if simple:
+        params["temperature"] = 0
+    return params
+
+
+def _cache_prefix(params: Dict[str, Any]) -> str:
+    """The text ahead of the last cache breakpoint: system prompt plus job context"""
+    prefix = "".join(block["text"] for block in params["system"])
+    content = params["messages"][0]["content"]
+    if isinstance(content, list):
+        prefix += content[0]["text"]
+    return prefix
+
+
+def _is_cacheable(prefix: str) -> bool:
+    return len(prefix) // CHARS_PER_TOKEN >= CACHE_MIN_TOKENS
+
+
+def _response_text(content: List[Any]) -> str:
+    """Join the text blocks of a Claude response"""
+    return "".join(block.text for block in content if block.type == "text")
+
 
 def build_message(data: Dict) -> str:
     """
@@ -75,30 +310,63 @@ def build_message(data: Dict) -> str:
 
 
 def generate_message_variants(
-    first_name: str, company: str, job_title: str, candidate_bullets: List[str]
+    first_name: str,
+    company: str,
+    job_title: str,
+    candidate_bullets: List[str],
+    decks: Optional[Dict[str, VariantDeck]] = None,
 ) -> Dict[str, str]:
-    """Generate message components with randomized variants"""
-    pass
+    """
+    Generate message components with randomized variants.
 
+    Pass a MessageBuilder's decks to spread variants evenly across a run;
+    without them each variant is picked independently.
+    """
+    if decks is None:
+        return {
+            "greeting": f"Hi {first_name},",
+            "small_talk": random.choice(SMALL_TALK_VARIANTS),
+            "cta": random.choice(CTA_VARIANTS),
+            "snapshot_phrase": random.choice(SNAPSHOT_PHRASES),
+        }
+    return {
+        "greeting": f"Hi {first_name},",
+        "small_talk": decks["small_talk"].draw(),
+        "cta": decks["cta"].draw(),
+        "snapshot_phrase": decks["snapshot_phrase"].draw(),
+    }
 
-def get_small_talk_variants() -> List[str]:
-    """Return list of light small-talk options"""
-    pass
 
+def get_small_talk_variants() -> Tuple[str, ...]:
+    """Return light small-talk options"""
+    return SMALL_TALK_VARIANTS
 
-def get_cta_variants() -> List[str]:
-    """Return list of call-to-action templates to avoid duplication flags"""
-    pass
 
+def get_cta_variants() -> Tuple[str, ...]:
+    """Return call-to-action templates to avoid duplication flags"""
+    return CTA_VARIANTS
 
-def get_snapshot_phrases() -> List[str]:
+
+def get_snapshot_phrases() -> Tuple[str, ...]:
     """Return two stock snapshot header phrases"""
-    pass
+    return SNAPSHOT_PHRASES
 
 
 def format_bullet_list(achievements: List[str]) -> str:
     """Format candidate achievements as bullet list, each ≤ 25 words"""
-    pass
+    return _format_bullet_list(
+        tuple(achievement.strip() for achievement in achievements)
+    )
+
+
+# The same résumé is matched to several jobs a night, so its bullets repeat
+@lru_cache(maxsize=2048)
+def _format_bullet_list(achievements: Tuple[str, ...]) -> str:
+    return "\n".join(
+        f"• {' '.join(achievement.split()[:BULLET_MAX_WORDS])}"
+        for achievement in achievements
+        if achievement
+    )
 
 
 def validate_message_constraints(message: str) -> bool:
@@ -108,8 +376,24 @@ def validate_message_constraints(message: str) -> bool:
     - Subject line contains en dash "–"; NEVER em dash "—"
     - Body + signature ≤ 1200 chars with 20-char head-room
     - Proper greeting format
+
+    Checks run cheapest first so oversized or em-dashed drafts are rejected
+    before any regex scan.
     """
-    pass
+    if len(message) > CHAR_LIMIT - SAFE_MARGIN:
+        return False
+    if "—" in message:
+        return False
+
+    greeting = _GREETING.search(message)
+    if greeting is None:
+        return False
+    # Anything before the greeting is the subject line
+    subject = message[: greeting.start()].strip()
+    if subject and "–" not in subject:
+        return False
+
+    return _US_SPELLING.search(message) is None
 
 
 class MessageBuilder:
@@ -117,9 +401,148 @@ class MessageBuilder:
 
     def __init__(self, promo_active: bool = False):
         self.promo_active = promo_active
+        self.variant_decks = {
+            "small_talk": VariantDeck(SMALL_TALK_VARIANTS),
+            "cta": VariantDeck(CTA_VARIANTS),
+            "snapshot_phrase": VariantDeck(SNAPSHOT_PHRASES),
+        }
 
     async def create_outreach_message(
         self, candidate_data: Dict, job_data: Dict, decision_maker_data: Dict
     ) -> Dict[str, str]:
         """Create complete outreach message with subject and body"""
         pass
+
+    def template_row(self, match: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        create_outreach_batch row for one stored job match.
+
+        The match's rerank reasons become the bullets, and the posting
+        details become the job_context shared by every match for that job.
+        """
+        company = match.get("company_name") or ""
+        job_title = match.get("job_title") or ""
+        bullets = list(match.get("matching_reasons") or [])
+        first_name = next(iter((match.get("decision_maker_name") or "").split()), "")
+        variants = generate_message_variants(
+            first_name, company, job_title, bullets, decks=self.variant_decks
+        )
+        return {
+            "row_id": str(match["match_id"]),
+            "day_of_week": datetime.now(MYT).strftime("%A"),
+            "first_name": first_name,
+            "company": company,
+            "source_site": "LinkedIn",
+            "role_noun": job_title,
+            "small_talk_variant": variants["small_talk"],
+            "snapshot_phrase": variants["snapshot_phrase"],
+            "bullet_list": format_bullet_list(bullets),
+            "cta_variant": variants["cta"],
+            "candidate_bullets": bullets,
+            "job_context": (
+                f"Job posting: {job_title} at {company}"
+                f" ({match.get('location') or ''})\n\n"
+                f"{(match.get('full_description') or '')[:JOB_CONTEXT_CHARS]}"
+            ),
+        }
+
+    async def _complete(self, params: Dict[str, Any]) -> str:
+        """Generate one outreach message with a direct messages.create call"""
+        response = await _get_anthropic_client().messages.create(**params)
+        return _response_text(response.content)
+
+    async def create_outreach_batch(self, rows: List[Dict]) -> Dict[str, str]:
+        """
+        Generate outreach messages for many rows with one Message Batches job.
+
+        The nightly run has no latency constraint, so every prompt is
+        submitted together (at the batch discount) and collected once the
+        batch has ended. Rows the batch did not answer are retried with
+        direct calls.
+
+        Args:
+            rows: Template variables per message, each with a unique
+                ``row_id`` (letters, digits, "_" or "-", at most 64 chars).
+                An ``is_simple`` flag or the raw ``candidate_bullets`` route
+                the row to the lite prompt. Rows for the same job should
+                carry the same ``job_context`` text (the posting details),
+                which is sent as a shared, cacheable prefix.
+
+        Returns:
+            Dict mapping row_id to the generated message text; rows that
+            still failed are omitted
+        """
+        if not rows:
+            return {}
+
+        client = _get_anthropic_client()
+        # Simple rows take the lite prompt; the rest get the full examples.
+        # Rows for the same job are submitted next to each other.
+        requests = {
+            str(row["row_id"]): _message_params(
+                render_prompt(row), _row_is_simple(row), row.get("job_context") or ""
+            )
+            for row in sorted(rows, key=lambda row: row.get("job_context") or "")
+        }
+
+        batch = await client.messages.batches.create(
+            requests=[
+                {"custom_id": row_id, "params": params}
+                for row_id, params in requests.items()
+            ]
+        )
+
+        delay = BATCH_POLL_INITIAL_DELAY
+        while batch.processing_status != "ended":
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, BATCH_POLL_MAX_DELAY)
+            batch = await client.messages.batches.retrieve(batch.id)
+
+        messages = {}
+        async for entry in await client.messages.batches.results(batch.id):
+            if entry.result.type == "succeeded":
+                messages[entry.custom_id] = _response_text(entry.result.message.content)
+
+        # Errored (or expired) entries fall back to one call per row
+        retry = [row_id for row_id in requests if row_id not in messages]
+        results = await self._complete_warm([requests[row_id] for row_id in retry])
+        for row_id, result in zip(retry, results):
+            if not isinstance(result, BaseException):
+                messages[row_id] = result
+        return messages
+
+    async def _complete_warm(self, requests: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Run direct calls, grouped by the prompt prefix they share.
+
+        A cache entry only becomes readable once the request that creates it
+        has started responding, so when a group's prefix is long enough to
+        be cached its first call runs alone and the rest then read it.
+        Prefixes below CACHE_MIN_TOKENS cannot be cached, so those calls go
+        out at once. Groups run concurrently, and failures are returned in
+        place of results.
+        """
+        groups: Dict[str, List[int]] = {}
+        for index, params in enumerate(requests):
+            groups.setdefault(_cache_prefix(params), []).append(index)
+
+        results: List[Any] = [None] * len(requests)
+        limiter = asyncio.Semaphore(FALLBACK_CONCURRENCY)
+
+        async def complete(index: int) -> None:
+            async with limiter:
+                try:
+                    results[index] = await self._complete(requests[index])
+                except Exception as e:
+                    results[index] = e
+
+        async def run_group(prefix: str, indexes: List[int]) -> None:
+            if len(indexes) > 1 and _is_cacheable(prefix):
+                await complete(indexes[0])
+                indexes = indexes[1:]
+            await asyncio.gather(*(complete(index) for index in indexes))
+
+        await asyncio.gather(
+            *(run_group(prefix, indexes) for prefix, indexes in groups.items())
+        )
+        return results
@@ -1,96 +1,308 @@
 """Scheduler - APScheduler cron jobs for Asia/Kuala_Lumpur timezone"""
 
-from typing import Optional, Callable
+from typing import Dict, List, Optional, Callable
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from dataclasses import asdict
 from datetime import datetime
+from zoneinfo import ZoneInfo
 import asyncio
+import logging
+
+from .async_utils import gather_bounded
+from .contacts import batch_lookup_companies
+from .jobs_scraper import FINANCIAL_ROLES, scrape_linkedin_jobs
+from .messaging import MessageBuilder, validate_message_constraints
+from .sheet_writer import FOLDER_ID, write_daily_outreach_sheet
+from .vector_matcher import (
+    MATCH_THRESHOLD,
+    RERANK_CONCURRENCY,
+    coarse_vector_search_batch,
+    generate_job_embeddings_batch,
+    gpt4o_rerank_candidates,
+)
+
+logger = logging.getLogger(__name__)
+
+# Cities searched by the nightly scrape
+SCRAPE_LOCATIONS = ["Melbourne", "Perth", "Brisbane", "Adelaide"]
+
+MYT = ZoneInfo("Asia/Kuala_Lumpur")
+
+# Postings embedded, searched and re-ranked together by the matcher
+MATCH_PAGE_SIZE = 500
+
+# Posting fields shown to the re-ranker
+RERANK_JOB_FIELDS = (
+    "job_title",
+    "company_name",
+    "location",
+    "requirements",
+    "full_description",
+)
+
+# Daily fire times; the triggers are immutable, so they are built once
+TRIGGERS = {
+    "jobs_scraper": CronTrigger(hour=1, minute=30, timezone=MYT),
+    "contact_enricher": CronTrigger(hour=1, minute=55, timezone=MYT),
+    "matcher": CronTrigger(hour=2, minute=15, timezone=MYT),
+    "message_builder": CronTrigger(hour=5, minute=45, timezone=MYT),
+    "sheet_writer": CronTrigger(hour=5, minute=55, timezone=MYT),
+}
 
 
 class RecruitmentScheduler:
     """Main scheduler for all recruitment automation tasks"""
 
     def __init__(self):
-        self.scheduler = AsyncIOScheduler(timezone="Asia/Kuala_Lumpur")
+        self.scheduler = AsyncIOScheduler(timezone=MYT)
         self.jobs = {}
 
     def start(self) -> None:
         """Start the scheduler"""
-        pass
+        self.scheduler.start()
 
     def stop(self) -> None:
         """Stop the scheduler"""
-        pass
+        self.scheduler.shutdown(wait=False)
+
+    def _schedule(self, name: str, func: Callable) -> str:
+        job = self.scheduler.add_job(
+            func, TRIGGERS[name], id=name, replace_existing=True
+        )
+        self.jobs[name] = job
+        return job.id
 
     def schedule_jobs_scraper(self) -> str:
         """Schedule jobs scraper for 01:30 MYT daily"""
-        pass
+        return self._schedule("jobs_scraper", run_jobs_scraper)
 
     def schedule_contact_enricher(self) -> str:
         """Schedule contact enricher for 01:55 MYT daily"""
-        pass
+        return self._schedule("contact_enricher", run_contact_enricher)
 
     def schedule_matcher(self) -> str:
         """Schedule vector matcher for 02:15 MYT daily"""
-        pass
+        return self._schedule("matcher", run_matcher)
 
     def schedule_message_builder(self) -> str:
         """Schedule message builder for 05:45 MYT daily"""
-        pass
+        return self._schedule("message_builder", run_message_builder)
 
     def schedule_sheet_writer(self) -> str:
         """Schedule sheet writer for 05:55 MYT daily"""
-        pass
+        return self._schedule("sheet_writer", run_sheet_writer)
 
 
-async def run_jobs_scraper() -> None:
+async def run_jobs_scraper() -> int:
     """
     01:30 MYT - Scrape LinkedIn ads posted ≤ 24h.
     Keep all roles (Melbourne) and financial planner, paraplanner,
     client service officer (Perth · Brisbane · Adelaide).
+
+    Returns the number of new postings stored.
     """
-    pass
+    from .database import bulk_insert_job_postings
 
+    # Every (location, role) search runs concurrently inside the scraper
+    jobs = await scrape_linkedin_jobs(SCRAPE_LOCATIONS, FINANCIAL_ROLES)
+    if not jobs:
+        return 0
+    return await bulk_insert_job_postings(asdict(job) for job in jobs)
 
-async def run_contact_enricher() -> None:
+
+async def run_contact_enricher() -> int:
     """
     01:55 MYT - For each new company_id call RapidAPI Fresh LinkedIn
     searchDecisionMaker. Accept titles: CEO, Founder, Co Founder, CFO,
     Managing Director, Director, Practice Manager, General Manager.
     Cache 30d. Abort API call if cache hit.
+
+    Returns the number of companies with a decision maker.
     """
-    pass
+    from .database import fetch_unprocessed_companies
+
+    companies = await fetch_unprocessed_companies()
+    if not companies:
+        return 0
+
+    # Cache hits are answered in bulk; misses are looked up concurrently
+    found = await batch_lookup_companies(list(companies), companies)
+    return len(found)
 
 
-async def run_matcher() -> None:
+def _job_text(posting: Dict) -> str:
+    """Text a posting is embedded on for the coarse search"""
+    requirements = "\n".join(posting.get("requirements") or [])
+    return "\n\n".join(
+        part
+        for part in (
+            f"{posting['job_title']} at {posting['company_name']}",
+            requirements,
+            posting.get("full_description") or "",
+        )
+        if part
+    )
+
+
+async def run_matcher() -> int:
     """
     02:15 MYT - pgvector coarse search → GPT-4o re-rank →
     output match_score 0-100. Retain rows ≥ 85 (MATCH_THRESHOLD).
+
+    Unprocessed postings are streamed from a server-side cursor and matched
+    a page at a time. Returns the number of matches stored.
     """
-    pass
+    from .database import iter_job_postings
+
+    matched = 0
+    page = []
+    async for posting in iter_job_postings(MATCH_PAGE_SIZE, unprocessed=True):
+        page.append(dict(posting))
+        if len(page) == MATCH_PAGE_SIZE:
+            matched += await _match_postings(page)
+            page = []
+    if page:
+        matched += await _match_postings(page)
+    return matched
 
 
-async def run_message_builder() -> None:
+async def _match_postings(postings: List[Dict]) -> int:
+    """Match one page of postings and store the results"""
+    from .database import fetch_resumes, store_job_matches
+
+    texts = [_job_text(posting) for posting in postings]
+    # One embeddings pass and one coarse search round-trip for the whole page
+    embeddings = await generate_job_embeddings_batch(texts)
+    shortlists = await coarse_vector_search_batch(list(embeddings))
+
+    resumes = await fetch_resumes(
+        {candidate["resume_id"] for shortlist in shortlists for candidate in shortlist}
+    )
+    shortlists = [
+        [
+            {
+                **candidate,
+                "candidate_name": resumes[candidate["resume_id"]]["candidate_name"],
+                "resume_text": resumes[candidate["resume_id"]]["text_content"] or "",
+            }
+            for candidate in shortlist
+            if candidate["resume_id"] in resumes
+        ]
+        for shortlist in shortlists
+    ]
+
+    reranked = await gather_bounded(
+        (
+            gpt4o_rerank_candidates(
+                {field: posting.get(field) for field in RERANK_JOB_FIELDS},
+                shortlist,
+                MATCH_THRESHOLD,
+            )
+            for posting, shortlist in zip(postings, shortlists)
+        ),
+        RERANK_CONCURRENCY,
+        return_exceptions=True,
+    )
+
+    # Postings whose re-rank failed stay unprocessed and are retried next run
+    matched_links = []
+    matches = []
+    for posting, result in zip(postings, reranked):
+        if isinstance(result, BaseException):
+            logger.error(f"Re-rank failed for {posting['job_link']}: {result}")
+            continue
+        matched_links.append(posting["job_link"])
+        matches.extend(
+            (
+                posting["job_link"],
+                match.resume_id,
+                match.match_score,
+                match.matching_reasons,
+            )
+            for match in result
+        )
+    return await store_job_matches(matched_links, matches)
+
+
+async def run_message_builder() -> int:
     """
     05:45 MYT - Build personalised outreach message via Claude-3 Haiku
     following the template.
+
+    Returns the number of messages stored.
     """
-    pass
+    from .database import fetch_matches_awaiting_message, store_outreach_messages
+
+    matches = await fetch_matches_awaiting_message()
+    if not matches:
+        return 0
+
+    builder = MessageBuilder()
+    rows = [builder.template_row(dict(match)) for match in matches]
+    messages = await builder.create_outreach_batch(rows)
 
+    # Drafts that break the style guide are left unset and rebuilt next run
+    valid = {}
+    for row_id, message in messages.items():
+        if validate_message_constraints(message):
+            valid[int(row_id)] = message
+        else:
+            logger.warning(f"Outreach message for match {row_id} failed validation")
+    return await store_outreach_messages(valid)
 
-async def run_sheet_writer() -> None:
+
+async def run_sheet_writer() -> int:
     """
     05:55 MYT - Pull rows flagged for outreach, write final sheet,
     overwrite if exists.
+
+    Returns the number of rows written.
     """
-    pass
+    from .database import fetch_outreach_rows, mark_outreach_written
+
+    if not FOLDER_ID:
+        raise ValueError("FOLDER_ID is not configured")
+
+    rows = [dict(row) for row in await fetch_outreach_rows()]
+    url = await write_daily_outreach_sheet(rows, FOLDER_ID)
+    if rows:
+        await mark_outreach_written([row["match_id"] for row in rows])
+    logger.info(f"Wrote {len(rows)} outreach rows to {url}")
+    return len(rows)
 
 
 def setup_all_scheduled_jobs(scheduler: RecruitmentScheduler) -> None:
     """Setup all scheduled jobs with proper MYT timing"""
-    pass
+    scheduler.schedule_jobs_scraper()
+    scheduler.schedule_contact_enricher()
+    scheduler.schedule_matcher()
+    scheduler.schedule_message_builder()
+    scheduler.schedule_sheet_writer()
 
 
 async def manual_run_pipeline() -> Dict:
-    """Manual execution of entire pipeline for testing"""
-    pass
+    """
+    Manual execution of entire pipeline for testing.
+
+    Each stage consumes the previous stage's output, so stages run in order;
+    the I/O inside each stage runs concurrently. The run stops at the first
+    stage that fails.
+    """
+    stages = (
+        ("jobs_scraped", run_jobs_scraper),
+        ("contacts_enriched", run_contact_enricher),
+        ("matches_found", run_matcher),
+        ("messages_built", run_message_builder),
+        ("sheet_written", run_sheet_writer),
+    )
+
+    result: Dict = {"status": "success"}
+    for key, stage in stages:
+        try:
+            result[key] = await stage()
+        except Exception as e:
+            logger.exception(f"Pipeline stage {stage.__name__} failed")
+            result.update(status="error", failed_stage=stage.__name__, error=str(e))
+            break
+    return result
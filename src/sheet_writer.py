@@ -1,8 +1,115 @@
 """Sheet Writer - Google Sheets async writer"""
 
-from typing import List, Dict, Optional
-from datetime import datetime
+from typing import Iterable, List, Dict, Optional
+from array import array
+from dataclasses import dataclass, field
+from datetime import date as Date, datetime
+from functools import lru_cache
+from zoneinfo import ZoneInfo
 import asyncio
+import logging
+
+from decouple import config
+from google.oauth2 import service_account
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_SERVICE_ACCOUNT_FILE = config("GOOGLE_SERVICE_ACCOUNT_FILE", default="")
+# Drive folder the daily outreach sheets are written to
+FOLDER_ID = config("FOLDER_ID", default="")
+# Drive access is needed to find or create the sheet inside the outreach folder
+SHEETS_SCOPES = [
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive",
+]
+SPREADSHEET_MIME_TYPE = "application/vnd.google-apps.spreadsheet"
+SHEET_URL = "https://docs.google.com/spreadsheets/d/{sheet_id}"
+# Sheets are named for the scheduler's (MYT) calendar day, not the host's
+MYT = ZoneInfo("Asia/Kuala_Lumpur")
+
+SHEET_HEADERS = (
+    "company",
+    "job_title",
+    "job_link",
+    "decision_maker_name",
+    "linkedin_url",
+    "match_score",
+    "outreach_message",
+)
+
+
+@dataclass(slots=True)
+class OutreachBatch:
+    """
+    Outreach rows stored column-wise, one list per sheet column.
+
+    Stages append to the columns instead of building a dict per row, and
+    rows() transposes them straight into Sheets values.
+    """
+
+    company: List[str] = field(default_factory=list)
+    job_title: List[str] = field(default_factory=list)
+    job_link: List[str] = field(default_factory=list)
+    decision_maker_name: List[str] = field(default_factory=list)
+    linkedin_url: List[str] = field(default_factory=list)
+    match_score: array = field(default_factory=lambda: array("i"))
+    outreach_message: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict]) -> "OutreachBatch":
+        """
+        Build a batch from outreach dicts keyed by the sheet headers.
+
+        Keys outside SHEET_HEADERS are ignored, missing text fields become
+        "", and match_score is rounded to the int the array column holds.
+        """
+        text_columns = [column for column in SHEET_HEADERS if column != "match_score"]
+        batch = cls()
+        for record in records:
+            batch.append(
+                match_score=int(round(record.get("match_score") or 0)),
+                **{column: record.get(column) or "" for column in text_columns},
+            )
+        return batch
+
+    def append(
+        self,
+        company: str,
+        job_title: str,
+        job_link: str,
+        decision_maker_name: str,
+        linkedin_url: str,
+        match_score: int,
+        outreach_message: str,
+    ) -> None:
+        self.company.append(company)
+        self.job_title.append(job_title)
+        self.job_link.append(job_link)
+        self.decision_maker_name.append(decision_maker_name)
+        self.linkedin_url.append(linkedin_url)
+        self.match_score.append(match_score)
+        self.outreach_message.append(outreach_message)
+
+    def __len__(self) -> int:
+        return len(self.company)
+
+    def rows(self) -> List[List[str]]:
+        """Transpose the columns into spreadsheet rows"""
+        return [
+            list(row)
+            for row in zip(
+                self.company,
+                self.job_title,
+                self.job_link,
+                self.decision_maker_name,
+                self.linkedin_url,
+                map(str, self.match_score),
+                self.outreach_message,
+            )
+        ]
 
 
 async def write_daily_outreach_sheet(
@@ -20,15 +127,25 @@ async def write_daily_outreach_sheet(
     Returns:
         Google Sheets URL of created/updated sheet
     """
-    pass
+    sheet_name = sheet_name or generate_sheet_name()
+    rows = OutreachBatch.from_records(outreach_data).rows()
 
+    sheet_id = await get_or_create_sheet(folder_id, sheet_name)
+    # Writing over stale rows would leave yesterday's tail below today's data
+    if not await clear_sheet_content(sheet_id):
+        raise RuntimeError(f"Failed to clear outreach sheet {sheet_name}")
+    # Headers and every row go out in one request
+    if not await batch_write_rows(sheet_id, create_sheet_headers(), rows):
+        raise RuntimeError(f"Failed to write outreach sheet {sheet_name}")
+    return SHEET_URL.format(sheet_id=sheet_id)
 
-async def create_sheet_headers() -> List[str]:
+
+def create_sheet_headers() -> List[str]:
     """Return standard headers: company, job_title, job_link, decision_maker_name, linkedin_url, match_score, outreach_message"""
-    pass
+    return list(SHEET_HEADERS)
 
 
-async def format_outreach_row(
+def format_outreach_row(
     company: str,
     job_title: str,
     job_link: str,
@@ -38,7 +155,15 @@ async def format_outreach_row(
     outreach_message: str,
 ) -> List[str]:
     """Format single outreach record as spreadsheet row"""
-    pass
+    return [
+        company,
+        job_title,
+        job_link,
+        decision_maker_name,
+        linkedin_url,
+        str(match_score),
+        outreach_message,
+    ]
 
 
 async def authenticate_google_sheets() -> any:
@@ -48,24 +173,113 @@ async def authenticate_google_sheets() -> any:
 
 async def get_or_create_sheet(folder_id: str, sheet_name: str) -> str:
     """Get existing sheet or create new one in specified folder"""
-    pass
+    return await asyncio.to_thread(_sync_get_or_create_sheet, folder_id, sheet_name)
+
+
+def _drive_quote(value: str) -> str:
+    """Escape a value for use inside a single-quoted Drive query string"""
+    return value.replace("\\", "\\\\").replace("'", "\\'")
+
+
+def _sync_get_or_create_sheet(folder_id: str, sheet_name: str) -> str:
+    files = _get_drive_service().files()
+    query = (
+        f"name = '{_drive_quote(sheet_name)}' and '{_drive_quote(folder_id)}' in parents "
+        f"and mimeType = '{SPREADSHEET_MIME_TYPE}' and trashed = false"
+    )
+    existing = files.list(q=query, fields="files(id)", pageSize=1).execute()
+    if existing.get("files"):
+        return existing["files"][0]["id"]
+
+    created = files.create(
+        body={
+            "name": sheet_name,
+            "mimeType": SPREADSHEET_MIME_TYPE,
+            "parents": [folder_id],
+        },
+        fields="id",
+    ).execute()
+    return created["id"]
 
 
 async def clear_sheet_content(sheet_id: str) -> bool:
     """Clear existing content before writing new data"""
-    pass
+    try:
+        await asyncio.to_thread(_sync_clear, sheet_id)
+    except HttpError as e:
+        logger.error(f"Error clearing sheet {sheet_id}: {e}")
+        return False
+    return True
+
+
+def _sync_clear(sheet_id: str) -> Dict:
+    return (
+        _get_sheets_service()
+        .spreadsheets()
+        .values()
+        .clear(spreadsheetId=sheet_id, range="A:Z", body={})
+        .execute()
+    )
 
 
 async def batch_write_rows(
     sheet_id: str, headers: List[str], data_rows: List[List[str]]
 ) -> bool:
-    """Write headers and data rows to sheet in batch operation"""
-    pass
+    """
+    Write headers and data rows to sheet in batch operation.
 
+    Everything goes out in one values.batchUpdate request, run in a worker
+    thread because the Google client is blocking.
+    """
+    body = {
+        "valueInputOption": "RAW",
+        "data": [{"range": "A1", "values": [headers, *data_rows]}],
+    }
+    try:
+        await asyncio.to_thread(_sync_batch_update, sheet_id, body)
+    except HttpError as e:
+        logger.error(f"Error writing {len(data_rows)} rows to sheet {sheet_id}: {e}")
+        return False
+    return True
 
-def generate_sheet_name(date: Optional[datetime] = None) -> str:
-    """Generate sheet name in format Outreach-Daily-YYYY-MM-DD"""
-    pass
+
+@lru_cache(maxsize=1)
+def _get_credentials():
+    return service_account.Credentials.from_service_account_file(
+        GOOGLE_SERVICE_ACCOUNT_FILE, scopes=SHEETS_SCOPES
+    )
+
+
+@lru_cache(maxsize=1)
+def _get_sheets_service():
+    return build("sheets", "v4", credentials=_get_credentials(), cache_discovery=False)
+
+
+@lru_cache(maxsize=1)
+def _get_drive_service():
+    return build("drive", "v3", credentials=_get_credentials(), cache_discovery=False)
+
+
+def _sync_batch_update(sheet_id: str, body: Dict) -> Dict:
+    return (
+        _get_sheets_service()
+        .spreadsheets()
+        .values()
+        .batchUpdate(spreadsheetId=sheet_id, body=body)
+        .execute()
+    )
+
+
+def generate_sheet_name(date: Optional[Date] = None) -> str:
+    """Generate sheet name in format Outreach-Daily-YYYY-MM-DD
+
+    Defaults to today's date in MYT; a datetime is truncated to its date.
+    """
+    if date is None:
+        date = datetime.now(MYT).date()
+    elif isinstance(date, datetime):
+        date = date.date()
+    return f"Outreach-Daily-{date.isoformat()}"
 
 
 class GoogleSheetsClient:
@@ -1,8 +1,87 @@
 """Vector Matcher - pgvector search + GPT-4o rerank"""
 
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Sequence, Union
 from dataclasses import dataclass
 
+import numpy as np
+import orjson
+from decouple import config
+from openai import AsyncOpenAI
+
+from .async_utils import gather_bounded
+
+
+# Must match the model résumés are embedded with in drive_ingest
+EMBEDDING_MODEL = config("EMBEDDING_MODEL", default="text-embedding-3-small")
+
+# The embeddings endpoint takes at most 2048 inputs per request
+EMBEDDING_BATCH_SIZE = 2048
+EMBEDDING_CONCURRENCY = 4
+
+RERANK_MODEL = config("RERANK_MODEL", default="gpt-4o")
+RERANK_SNIPPET_CHARS = 4000
+RESUME_SUMMARY_CHARS = 300
+
+# Candidates whose coarse cosine similarity is below this never clear the
+# rerank threshold, so they are not sent to GPT-4o at all
+RERANK_MIN_SIMILARITY = config("RERANK_MIN_SIMILARITY", default=0.5, cast=float)
+
+# Re-ranked matches scoring below this (0-100) are dropped
+MATCH_THRESHOLD = config("MATCH_THRESHOLD", default=85, cast=int)
+# Jobs re-ranked at once by the nightly matcher
+RERANK_CONCURRENCY = 8
+
+# Instructions stay byte-identical across calls so the provider's prefix
+# cache can reuse them; the job and candidates follow in the user turn
+RERANK_INSTRUCTIONS = """You are an expert financial-services recruiter.
+Score how well each numbered candidate résumé fits the job posting on a
+0-100 scale, where 85+ means a strong fit worth contacting. Score every
+candidate exactly once, referring to it by its number, and give two or
+three short reasons grounded in the résumé."""
+
+RERANK_SCHEMA = {
+    "name": "candidate_scores",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "matches": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "index": {"type": "integer"},
+                        "match_score": {"type": "integer"},
+                        "matching_reasons": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                        },
+                    },
+                    "required": ["index", "match_score", "matching_reasons"],
+                    "additionalProperties": False,
+                },
+            }
+        },
+        "required": ["matches"],
+        "additionalProperties": False,
+    },
+}
+
+
+# Nearest résumés for every query vector in one round-trip: each unnest row
+# drives its own HNSW-ordered LATERAL scan of resume_embeddings
+BATCH_COARSE_SEARCH_SQL = """
+SELECT j.idx, r.resume_id, r.distance
+FROM unnest($1::halfvec[]) WITH ORDINALITY AS j(q, idx)
+CROSS JOIN LATERAL (
+    SELECT e.resume_id, e.embedding <=> j.q AS distance
+    FROM resume_embeddings e
+    ORDER BY e.embedding <=> j.q
+    LIMIT $2
+) r
+ORDER BY j.idx, r.distance
+"""
+
 
 @dataclass
 class MatchResult:
@@ -31,11 +110,106 @@ async def coarse_vector_search(
     pass
 
 
+async def _get_pool():
+    """Shared asyncpg pool (imported lazily; database builds clients at import)"""
+    from .database import get_db_pool
+
+    return await get_db_pool()
+
+
+async def coarse_vector_search_batch(
+    job_embeddings: Sequence[Union[np.ndarray, List[float]]], top_k: int = 20
+) -> List[List[Dict]]:
+    """
+    pgvector coarse search for many jobs in a single query.
+
+    Args:
+        job_embeddings: One embedding per job posting
+        top_k: Number of candidates to retrieve per job
+
+    Returns:
+        One list per job (in input order) of {"resume_id", "similarity"}
+        dicts, most similar first
+    """
+    if not job_embeddings:
+        return []
+
+    pool = await _get_pool()
+    async with pool.acquire() as conn:
+        statement = await conn.prepared(BATCH_COARSE_SEARCH_SQL)
+        rows = await statement.fetch(list(job_embeddings), top_k)
+
+    matches: List[List[Dict]] = [[] for _ in job_embeddings]
+    for row in rows:
+        matches[row["idx"] - 1].append(
+            {"resume_id": row["resume_id"], "similarity": 1 - row["distance"]}
+        )
+    return matches
+
+
 async def gpt4o_rerank_candidates(
     job_data: Dict, candidates: List[Dict], match_threshold: int = 85
 ) -> List[MatchResult]:
-    """Use GPT-4o to re-rank candidates and provide match scores 0-100"""
-    pass
+    """
+    Use GPT-4o to re-rank candidates and provide match scores 0-100.
+
+    All candidates are scored in a single structured-output call.
+
+    Args:
+        job_data: Job posting fields
+        candidates: Dicts with "resume_id" and optionally "candidate_name",
+            "resume_text" and the coarse search "similarity"
+        match_threshold: Minimum match_score to keep
+
+    Returns:
+        Matches scoring at least match_threshold, best first
+    """
+    # Cheap bound first: skip the call when no candidate is close enough
+    candidates = [
+        candidate
+        for candidate in candidates
+        if candidate.get("similarity", 1.0) >= RERANK_MIN_SIMILARITY
+    ]
+    if not candidates:
+        return []
+
+    numbered = "\n\n".join(
+        f"[{i}] {candidate.get('resume_text', '')[:RERANK_SNIPPET_CHARS]}"
+        for i, candidate in enumerate(candidates)
+    )
+    user_prompt = (
+        f"Job posting:\n{orjson.dumps(job_data, default=str).decode()}\n\n"
+        f"Candidates:\n{numbered}"
+    )
+
+    response = await _get_openai_client().chat.completions.create(
+        model=RERANK_MODEL,
+        temperature=0,
+        messages=[
+            {"role": "system", "content": RERANK_INSTRUCTIONS},
+            {"role": "user", "content": user_prompt},
+        ],
+        response_format={"type": "json_schema", "json_schema": RERANK_SCHEMA},
+    )
+    scores = orjson.loads(response.choices[0].message.content)["matches"]
+
+    results: Dict[int, MatchResult] = {}
+    for score in scores:
+        index = score["index"]
+        if not 0 <= index < len(candidates) or index in results:
+            continue
+        if score["match_score"] < match_threshold:
+            continue
+        candidate = candidates[index]
+        results[index] = MatchResult(
+            resume_id=candidate["resume_id"],
+            candidate_name=candidate.get("candidate_name", ""),
+            match_score=score["match_score"],
+            matching_reasons=score["matching_reasons"],
+            resume_summary=candidate.get("resume_text", "")[:RESUME_SUMMARY_CHARS],
+        )
+
+    return sorted(results.values(), key=lambda match: match.match_score, reverse=True)
 
 
 async def extract_job_requirements(job_description: str) -> List[str]:
@@ -48,6 +222,50 @@ async def get_candidate_resume_text(resume_id: str) -> Optional[str]:
     pass
 
 
+_openai_client: Optional[AsyncOpenAI] = None
+
+
+def _get_openai_client() -> AsyncOpenAI:
+    global _openai_client
+    if _openai_client is None:
+        _openai_client = AsyncOpenAI(api_key=config("OPENAI_API_KEY", default=""))
+    return _openai_client
+
+
+async def _embed_chunk(texts: List[str]) -> np.ndarray:
+    response = await _get_openai_client().embeddings.create(
+        model=EMBEDDING_MODEL, input=texts
+    )
+    ordered = sorted(response.data, key=lambda item: item.index)
+    return np.asarray([item.embedding for item in ordered], dtype=np.float32)
+
+
+async def generate_job_embeddings_batch(job_texts: List[str]) -> np.ndarray:
+    """
+    Embed many job postings with as few embeddings requests as possible.
+
+    Texts are sent EMBEDDING_BATCH_SIZE at a time, with a few chunks in
+    flight at once.
+
+    Returns:
+        float32 array of shape (len(job_texts), dim), one L2-normalised row
+        per text in input order
+    """
+    if not job_texts:
+        return np.empty((0, 0), dtype=np.float32)
+
+    chunks = await gather_bounded(
+        (
+            _embed_chunk(job_texts[start : start + EMBEDDING_BATCH_SIZE])
+            for start in range(0, len(job_texts), EMBEDDING_BATCH_SIZE)
+        ),
+        limit=EMBEDDING_CONCURRENCY,
+    )
+    embeddings = np.concatenate(chunks)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-12
+    return embeddings
+
+
 async def generate_job_embedding(job_text: str) -> List[float]:
     """Generate vector embedding for job posting"""
     pass
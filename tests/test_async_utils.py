@@ -0,0 +1,52 @@
+"""Tests for async_utils module"""
+
+import asyncio
+import pytest
+from src.async_utils import gather_bounded
+
+
+@pytest.mark.asyncio
+async def test_gather_bounded_preserves_order():
+    """Test results come back in input order"""
+
+    async def echo(value):
+        await asyncio.sleep(0.01 * (5 - value))
+        return value
+
+    result = await gather_bounded((echo(i) for i in range(5)), limit=3)
+
+    assert result == [0, 1, 2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_gather_bounded_limits_concurrency():
+    """Test no more than `limit` coroutines run at once"""
+    in_flight = 0
+    peak = 0
+
+    async def work():
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+
+    await gather_bounded((work() for _ in range(10)), limit=3)
+
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+async def test_gather_bounded_return_exceptions():
+    """Test exceptions are returned in place when requested"""
+
+    async def fail():
+        raise ValueError("boom")
+
+    async def ok():
+        return "ok"
+
+    result = await gather_bounded([ok(), fail()], limit=2, return_exceptions=True)
+
+    assert result[0] == "ok"
+    assert isinstance(result[1], ValueError)
@@ -1,17 +1,40 @@
 """Tests for contacts module"""
 
+import asyncio
 import pytest
-from unittest.mock import patch, AsyncMock, Mock
-from datetime import datetime, timedelta
+from unittest.mock import patch, AsyncMock, Mock, MagicMock
+from datetime import datetime, timedelta, timezone
+import src.contacts
 from src.contacts import (
     search_decision_maker,
     check_cache,
     cache_decision_maker,
     batch_lookup_companies,
     RateLimiter,
+    RedisTokenBucket,
 )
 
 
+@pytest.fixture(autouse=True)
+def clear_l1_cache():
+    """Start every test with an empty in-process decision maker cache"""
+    src.contacts._mem.clear()
+    yield
+    src.contacts._mem.clear()
+
+
+@pytest.fixture
+def mock_pool():
+    """Mock asyncpg pool whose acquire() yields an AsyncMock connection"""
+    conn = AsyncMock()
+    conn.prepared.return_value = AsyncMock()
+    pool = MagicMock()
+    pool.acquire.return_value.__aenter__.return_value = conn
+    with patch("src.contacts._get_pool", new_callable=AsyncMock) as mock_get_pool:
+        mock_get_pool.return_value = pool
+        yield conn
+
+
 @pytest.mark.asyncio
 async def test_search_decision_maker(mock_decision_maker_response):
     """Test decision maker search with mocked RapidAPI"""
@@ -111,3 +134,372 @@ async def test_rate_limiter():
         await rate_limiter.acquire()
 
         assert mock_acquire.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_allows_burst_up_to_capacity():
+    """Test token bucket lets a burst of max_requests through without waiting"""
+    rate_limiter = RateLimiter(max_requests=5, time_window=60)
+
+    with patch("src.contacts.asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+        for _ in range(5):
+            await rate_limiter.acquire()
+
+        mock_sleep.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_waits_when_empty():
+    """Test acquire sleeps for roughly one token interval once drained"""
+    rate_limiter = RateLimiter(max_requests=2, time_window=60)
+
+    with patch("src.contacts.asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+        await rate_limiter.acquire()
+        await rate_limiter.acquire()
+        await rate_limiter.acquire()
+
+        mock_sleep.assert_called_once()
+        assert mock_sleep.call_args[0][0] == pytest.approx(30, abs=0.5)
+
+
+def test_rate_limiter_try_acquire():
+    """Test non-blocking acquire reports an empty bucket"""
+    rate_limiter = RateLimiter(max_requests=1, time_window=60)
+
+    assert rate_limiter.try_acquire() is True
+    assert rate_limiter.try_acquire() is False
+
+
+@pytest.mark.asyncio
+async def test_check_cache_l1_hit_skips_postgres(mock_pool):
+    """Test a second lookup for the same company is served from memory"""
+    mock_pool.prepared.return_value.fetchrow.return_value = {
+        "decision_maker_name": "John Smith",
+        "linkedin_url": "https://linkedin.com/in/johnsmith",
+        "title": "CEO",
+        "cached_at": datetime.now(),
+        "expires_at": datetime.now(timezone.utc) + timedelta(days=20),
+    }
+
+    first = await check_cache("test_company_1")
+    second = await check_cache("test_company_1")
+
+    assert first["decision_maker_name"] == "John Smith"
+    assert second == first
+    assert "expires_at" not in second
+    mock_pool.prepared.return_value.fetchrow.assert_called_once_with("test_company_1")
+
+
+@pytest.mark.asyncio
+async def test_check_cache_expired_l1_entry_falls_through(mock_pool):
+    """Test expired in-memory entries are evicted and Postgres is queried"""
+    src.contacts._mem["test_company_1"] = ({"decision_maker_name": "Old"}, 0.0)
+    mock_pool.prepared.return_value.fetchrow.return_value = None
+
+    result = await check_cache("test_company_1")
+
+    assert result is None
+    assert "test_company_1" not in src.contacts._mem
+    mock_pool.prepared.return_value.fetchrow.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_cache_decision_maker_populates_l1(
+    mock_pool, mock_decision_maker_response
+):
+    """Test a successful write is visible to check_cache without a query"""
+    result = await cache_decision_maker("test_company_1", mock_decision_maker_response)
+    cached = await check_cache("test_company_1")
+
+    assert result is True
+    assert cached["decision_maker_name"] == "John Smith"
+    mock_pool.execute.assert_called_once()
+    mock_pool.prepared.return_value.fetchrow.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_cache_decision_maker_failure_leaves_l1_empty(mock_pool):
+    """Test a failed Postgres write is not mirrored into memory"""
+    mock_pool.execute.side_effect = Exception("connection lost")
+
+    result = await cache_decision_maker("test_company_1", {"title": "CEO"})
+
+    assert result is False
+    assert "test_company_1" not in src.contacts._mem
+
+
+def test_l1_cache_evicts_least_recently_used():
+    """Test the in-memory cache is bounded"""
+    with patch("src.contacts.L1_CACHE_MAX_ENTRIES", 2):
+        src.contacts._mem_put("a", {}, 3600)
+        src.contacts._mem_put("b", {}, 3600)
+        src.contacts._mem_get("a")
+        src.contacts._mem_put("c", {}, 3600)
+
+        assert list(src.contacts._mem) == ["a", "c"]
+
+
+@pytest.mark.asyncio
+async def test_redis_token_bucket_sleeps_until_granted():
+    """Test the shared bucket retries after the wait the script reports"""
+    redis_client = Mock()
+    script = AsyncMock(side_effect=[1500, 0])
+    redis_client.register_script.return_value = script
+    bucket = RedisTokenBucket(redis_client, max_requests=50, time_window=60)
+
+    with patch("src.contacts.asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+        await bucket.acquire()
+
+        mock_sleep.assert_called_once_with(1.5)
+        assert script.call_count == 2
+        assert script.call_args.kwargs["keys"] == ["tb:rapidapi:searchDM"]
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_delegates_to_backend():
+    """Test RateLimiter uses the distributed backend when one is configured"""
+    backend = Mock()
+    backend.acquire = AsyncMock()
+    rate_limiter = RateLimiter(max_requests=1, time_window=60, backend=backend)
+
+    await rate_limiter.acquire()
+    await rate_limiter.acquire()
+
+    assert backend.acquire.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_batch_lookup_companies_reads_cache_in_one_query(mock_pool):
+    """Test cached companies are fetched with a single ANY($1) query"""
+    mock_pool.prepared.return_value.fetch.return_value = [
+        {
+            "company_id": "company1",
+            "decision_maker_name": "Manager 1",
+            "cached_at": datetime.now(),
+            "expires_at": datetime.now(timezone.utc) + timedelta(days=5),
+        }
+    ]
+    src.contacts._mem_put("company2", {"decision_maker_name": "Manager 2"}, 60)
+
+    with patch(
+        "src.contacts._lookup_misses", new_callable=AsyncMock
+    ) as mock_lookup_misses:
+        mock_lookup_misses.return_value = {}
+
+        result = await batch_lookup_companies(["company1", "company2", "company3"])
+
+        assert result["company1"]["decision_maker_name"] == "Manager 1"
+        assert result["company2"]["decision_maker_name"] == "Manager 2"
+        assert "company3" not in result
+        mock_pool.prepared.return_value.fetch.assert_called_once_with(
+            ["company1", "company3"]
+        )
+        mock_lookup_misses.assert_called_once_with(["company3"], {})
+
+
+SEARCH_PROFILES = [
+    {"full_name": "Pat Analyst", "title": "Senior Analyst"},
+    {
+        "full_name": "John Smith",
+        "title": "Co-Founder & CEO",
+        "linkedin_url": "https://linkedin.com/in/johnsmith",
+    },
+]
+
+
+@pytest.fixture
+def mock_search():
+    """Stand in for the jobs_scraper decision-maker search"""
+    with patch(
+        "src.contacts.find_decision_makers",
+        new_callable=AsyncMock,
+        return_value=SEARCH_PROFILES,
+    ) as mock_find, patch("src.contacts.rate_limiter.acquire", new_callable=AsyncMock):
+        yield mock_find
+
+
+@pytest.mark.asyncio
+async def test_search_decision_maker_cache_hit_skips_api(mock_search):
+    """Test a cached company never reaches RapidAPI"""
+    src.contacts._mem_put("company1", {"decision_maker_name": "Cached"}, 60)
+
+    result = await search_decision_maker("company1", "Company One")
+
+    assert result["decision_maker_name"] == "Cached"
+    mock_search.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_search_decision_maker_calls_api_and_caches(mock_search):
+    """Test a miss runs a company-scoped search and caches the accepted title"""
+    with patch("src.contacts.check_cache", new_callable=AsyncMock) as mock_check, patch(
+        "src.contacts.cache_decision_maker", new_callable=AsyncMock
+    ) as mock_store, patch(
+        "src.contacts.resolve_linkedin_company_ids",
+        new_callable=AsyncMock,
+        return_value=[1234],
+    ):
+        mock_check.return_value = None
+
+        result = await search_decision_maker("company1", "Company One")
+
+        assert result["decision_maker_name"] == "John Smith"
+        assert result["linkedin_url"] == "https://linkedin.com/in/johnsmith"
+        assert mock_search.await_args.kwargs["company_ids"] == [1234]
+        mock_store.assert_called_once_with("company1", result)
+
+
+@pytest.mark.asyncio
+async def test_search_decision_maker_takes_a_shared_rate_limit_token(mock_search):
+    """Test every search waits on the contacts rate limiter before starting"""
+    calls = []
+    mock_search.side_effect = lambda *args, **kwargs: calls.append("search")
+
+    with patch("src.contacts.check_cache", new_callable=AsyncMock) as mock_check, patch(
+        "src.contacts.resolve_linkedin_company_ids",
+        new_callable=AsyncMock,
+        return_value=[1234],
+    ), patch(
+        "src.contacts.rate_limiter.acquire",
+        side_effect=lambda: calls.append("acquire"),
+    ):
+        mock_check.return_value = None
+
+        await search_decision_maker("company1", "Company One")
+
+    assert calls == ["acquire", "search"]
+
+
+@pytest.mark.asyncio
+async def test_search_decision_maker_unresolved_company_is_not_searched(mock_search):
+    """Test a company without a LinkedIn id is neither searched nor cached"""
+    with patch("src.contacts.check_cache", new_callable=AsyncMock) as mock_check, patch(
+        "src.contacts.cache_decision_maker", new_callable=AsyncMock
+    ) as mock_store, patch(
+        "src.contacts.resolve_linkedin_company_ids",
+        new_callable=AsyncMock,
+        return_value=[],
+    ):
+        mock_check.return_value = None
+
+        result = await search_decision_maker("company1", "Company One")
+
+        assert result is None
+        mock_search.assert_not_called()
+        mock_store.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_resolve_linkedin_company_ids_reads_numeric_company_url(mock_pool):
+    """Test a numeric company page yields its id without an API call"""
+    statement = mock_pool.prepared.return_value
+    statement.fetchval.return_value = "https://www.linkedin.com/company/892970/"
+
+    with patch(
+        "src.contacts.get_company_by_linkedin_url", new_callable=AsyncMock
+    ) as mock_lookup:
+        ids = await src.contacts.resolve_linkedin_company_ids("acme", "Acme")
+
+    assert ids == [892970]
+    statement.fetchval.assert_awaited_once_with("acme")
+    mock_lookup.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_resolve_linkedin_company_ids_looks_up_vanity_url(mock_pool):
+    """Test a vanity company page is resolved through RapidAPI"""
+    url = "https://www.linkedin.com/company/acme-wealth"
+    mock_pool.prepared.return_value.fetchval.return_value = url
+
+    with patch(
+        "src.contacts.get_company_by_linkedin_url",
+        new_callable=AsyncMock,
+        return_value={"company_id": "1234", "company_name": "Acme Wealth"},
+    ) as mock_lookup:
+        ids = await src.contacts.resolve_linkedin_company_ids("acme", "Acme")
+
+    assert ids == [1234]
+    mock_lookup.assert_awaited_once_with(url)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("company_url, company", [(None, None), ("acme-url", None)])
+async def test_resolve_linkedin_company_ids_unresolved(
+    mock_pool, caplog, company_url, company
+):
+    """Test companies without a resolvable page warn and return no ids"""
+    mock_pool.prepared.return_value.fetchval.return_value = company_url
+
+    with patch(
+        "src.contacts.get_company_by_linkedin_url",
+        new_callable=AsyncMock,
+        return_value=company,
+    ):
+        ids = await src.contacts.resolve_linkedin_company_ids("acme", "Acme")
+
+    assert ids == []
+    assert "Acme" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_lookup_misses_runs_concurrently():
+    """Test misses are requested together rather than one after another"""
+    in_flight = 0
+    peak = 0
+
+    async def fake_request(company_id, company_name, accepted_titles):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return None if company_id == "c2" else {"decision_maker_name": company_name}
+
+    with patch("src.contacts._request_decision_maker", side_effect=fake_request):
+        result = await src.contacts._lookup_misses(
+            ["c1", "c2", "c3"], {"c1": "Company One"}
+        )
+
+        assert peak == 3
+        assert result == {
+            "c1": {"decision_maker_name": "Company One"},
+            "c3": {"decision_maker_name": "c3"},
+        }
+
+
+@pytest.mark.asyncio
+async def test_lookup_misses_skips_failed_lookups():
+    """Test one lookup raising does not lose the others"""
+
+    async def fake_request(company_id, company_name, accepted_titles):
+        if company_id == "broken":
+            raise RuntimeError("boom")
+        return {"decision_maker_name": company_name}
+
+    with patch("src.contacts._request_decision_maker", side_effect=fake_request):
+        result = await src.contacts._lookup_misses(["ok", "broken"], {})
+
+        assert result == {"ok": {"decision_maker_name": "ok"}}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_lookups_for_same_company_are_coalesced():
+    """Test simultaneous misses for one company trigger a single API search"""
+
+    async def slow_fetch(company_id, company_name, accepted_titles):
+        await asyncio.sleep(0.01)
+        return {"decision_maker_name": "John Smith"}
+
+    with patch(
+        "src.contacts._fetch_decision_maker", side_effect=slow_fetch
+    ) as mock_fetch:
+        results = await asyncio.gather(
+            *(
+                src.contacts._request_decision_maker("company1", "Company One", [])
+                for _ in range(3)
+            )
+        )
+
+        assert all(r == {"decision_maker_name": "John Smith"} for r in results)
+        mock_fetch.assert_called_once()
+        assert src.contacts._inflight == {}
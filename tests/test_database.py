@@ -0,0 +1,133 @@
+"""Tests for database module"""
+
+import os
+
+# database builds its Supabase client at import time
+os.environ.setdefault("SUPABASE_URL", "https://test.supabase.co")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "test_key")
+
+import pytest
+from datetime import datetime
+from unittest.mock import patch, AsyncMock, MagicMock
+from src.database import (
+    JOB_POSTING_COLUMNS,
+    _to_records,
+    UPSERT_JOB_MATCH_SQL,
+    bulk_insert_job_postings,
+    bulk_insert_resumes,
+    store_job_matches,
+    store_resume_embeddings_bulk,
+)
+
+
+@pytest.fixture
+def mock_connection():
+    """Mock pooled asyncpg connection"""
+    connection = AsyncMock()
+    connection.transaction = MagicMock()
+    pool = MagicMock()
+    pool.acquire.return_value.__aenter__.return_value = connection
+    with patch("src.database.get_db_pool", new_callable=AsyncMock) as mock_get_pool:
+        mock_get_pool.return_value = pool
+        yield connection
+
+
+def test_to_records_orders_columns_and_fills_defaults():
+    """Test row dicts become tuples in declared column order"""
+    rows = [
+        {
+            "company_id": "test_company",
+            "job_link": "https://linkedin.com/jobs/123",
+            "scraped_at": "2025-01-01T12:00:00",
+            "requirements": ["CFA certification"],
+        }
+    ]
+
+    (record,) = list(_to_records(rows, JOB_POSTING_COLUMNS))
+    values = dict(zip(JOB_POSTING_COLUMNS, record))
+
+    assert len(record) == len(JOB_POSTING_COLUMNS)
+    assert values["job_link"] == "https://linkedin.com/jobs/123"
+    assert values["scraped_at"] == datetime(2025, 1, 1, 12, 0)
+    assert values["requirements"] == ["CFA certification"]
+    assert values["processed"] is False
+    assert isinstance(values["created_at"], datetime)
+
+
+@pytest.mark.asyncio
+async def test_bulk_insert_job_postings_pages_copy(mock_connection):
+    """Test rows are COPY'd page by page and merged with ON CONFLICT"""
+    rows = [
+        {"company_id": "c", "job_link": f"https://linkedin.com/jobs/{i}"}
+        for i in range(5)
+    ]
+
+    written = await bulk_insert_job_postings(rows, page_size=2)
+
+    assert written == 5
+    assert mock_connection.copy_records_to_table.call_count == 3
+    (stage,) = mock_connection.copy_records_to_table.call_args_list[0].args
+    assert stage == "job_postings_stage"
+    merge_sql = mock_connection.execute.call_args_list[1].args[0]
+    assert "ON CONFLICT (job_link) DO NOTHING" in merge_sql
+
+
+@pytest.mark.asyncio
+async def test_store_resume_embeddings_bulk_upserts(mock_connection):
+    """Test embeddings keep the single-row upsert semantics"""
+    written = await store_resume_embeddings_bulk([("resume_1", [0.1, 0.2])])
+
+    assert written == 1
+    merge_sql = mock_connection.execute.call_args_list[1].args[0]
+    assert "DO UPDATE SET embedding = EXCLUDED.embedding" in merge_sql
+
+
+@pytest.mark.asyncio
+async def test_copy_upsert_keeps_last_duplicate_in_page(mock_connection):
+    """Test a key repeated within a page is merged once, with its last values"""
+    written = await store_resume_embeddings_bulk(
+        [("resume_1", [0.1]), ("resume_2", [0.2]), ("resume_1", [0.3])]
+    )
+
+    assert written == 2
+    records = mock_connection.copy_records_to_table.call_args.kwargs["records"]
+    assert records == [("resume_1", [0.3]), ("resume_2", [0.2])]
+
+
+@pytest.mark.asyncio
+async def test_bulk_insert_empty_is_noop(mock_connection):
+    """Test an empty batch issues no statements"""
+    assert await bulk_insert_job_postings([]) == 0
+    mock_connection.execute.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_store_job_matches_marks_postings_processed(mock_connection):
+    """Test matches are upserted and their postings flagged in one transaction"""
+    matches = [("https://linkedin.com/jobs/1", "r1", 91, ["Writes SOAs"])]
+
+    stored = await store_job_matches(
+        ["https://linkedin.com/jobs/1", "https://linkedin.com/jobs/2"], matches
+    )
+
+    assert stored == 1
+    mock_connection.transaction.assert_called_once()
+    mock_connection.executemany.assert_awaited_once_with(UPSERT_JOB_MATCH_SQL, matches)
+    sql, links = mock_connection.execute.await_args.args
+    assert "processed = TRUE" in sql
+    assert links == ["https://linkedin.com/jobs/1", "https://linkedin.com/jobs/2"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_insert_resumes_keeps_stored_fields_missing_from_row(
+    mock_connection,
+):
+    """Test a re-ingested résumé only overwrites the columns it carries"""
+    rows = [{"resume_id": "r1", "file_name": "cv.pdf", "text_content": "CFP"}]
+
+    assert await bulk_insert_resumes(rows) == 1
+
+    merge_sql = mock_connection.execute.await_args_list[-1].args[0]
+    assert "ON CONFLICT (resume_id) DO UPDATE" in merge_sql
+    assert "skills = COALESCE(EXCLUDED.skills, resumes.skills)" in merge_sql
+    assert "processed =" not in merge_sql
@@ -1,14 +1,24 @@
 """Tests for drive_ingest module"""
 
+import io
+import os
+
+# database builds its Supabase client at import time
+os.environ.setdefault("SUPABASE_URL", "https://test.supabase.co")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "test_key")
+
+import numpy as np
 import pytest
-from unittest.mock import patch, AsyncMock, mock_open
+from unittest.mock import patch, AsyncMock, Mock, mock_open
 from src.drive_ingest import (
     extract_text_from_pdf,
     extract_text_from_docx,
     generate_embeddings,
     store_resume_in_postgres,
     handle_drive_webhook,
-    download_file_from_drive,
+    handle_drive_folder,
+    download_to_buffer,
+    shutdown_extract_executor,
 )
 
 
@@ -46,6 +56,25 @@ async def test_extract_text_from_docx():
         mock_extract.assert_called_once_with("test_resume.docx")
 
 
+@pytest.mark.asyncio
+async def test_extract_text_from_docx_in_worker_process():
+    """Test DOCX parsing runs through the process pool and returns paragraph text"""
+    from docx import Document
+
+    buffer = io.BytesIO()
+    document = Document()
+    document.add_paragraph("Jane Smith")
+    document.add_paragraph("Financial Planner")
+    document.save(buffer)
+
+    try:
+        result = await extract_text_from_docx(buffer.getvalue())
+    finally:
+        shutdown_extract_executor()
+
+    assert result == "Jane Smith\nFinancial Planner"
+
+
 @pytest.mark.asyncio
 async def test_generate_embeddings():
     """Test embedding generation"""
@@ -64,6 +93,22 @@ async def test_generate_embeddings():
         mock_embed.assert_called_once_with(test_text)
 
 
+@pytest.mark.asyncio
+async def test_generate_embeddings_normalises_with_numpy():
+    """Test the API embedding comes back as a unit-length float32 array"""
+    client = Mock()
+    client.embeddings.create = AsyncMock(
+        return_value=Mock(data=[Mock(embedding=[3.0, 4.0])])
+    )
+
+    with patch("src.drive_ingest._get_openai_client", return_value=client):
+        result = await generate_embeddings("Experienced financial planner")
+
+    assert result.dtype == np.float32
+    np.testing.assert_allclose(result, [0.6, 0.8], rtol=1e-6)
+    client.embeddings.create.assert_called_once()
+
+
 @pytest.mark.asyncio
 async def test_store_resume_in_postgres(mock_resume_data):
     """Test storing résumé in Postgres"""
@@ -106,17 +151,126 @@ async def test_handle_drive_webhook():
 
 
 @pytest.mark.asyncio
-async def test_download_file_from_drive():
-    """Test file download from Google Drive"""
+async def test_handle_drive_folder():
+    """Test folder ingest keeps order and writes rows and embeddings in bulk"""
+    files = [
+        {"id": f"file_{i}", "name": f"resume_{i}.pdf", "mimeType": "application/pdf"}
+        for i in range(5)
+    ]
+    files[3]["mimeType"] = "text/plain"
+
+    async def fake_extract(content):
+        if content == b"file_1":
+            raise ValueError("corrupt PDF")
+        return f"text of {content.decode()}"
+
+    with (
+        patch(
+            "src.drive_ingest.download_to_buffer",
+            side_effect=lambda file_id: file_id.encode(),
+        ),
+        patch("src.drive_ingest.extract_text_from_pdf", side_effect=fake_extract),
+        patch(
+            "src.drive_ingest.generate_embeddings",
+            AsyncMock(return_value=np.zeros(3, dtype=np.float32)),
+        ),
+        patch("src.database.bulk_insert_resumes", new_callable=AsyncMock) as mock_rows,
+        patch(
+            "src.database.store_resume_embeddings_bulk", new_callable=AsyncMock
+        ) as mock_bulk,
+        patch(
+            "src.database.store_resume_embedding", new_callable=AsyncMock
+        ) as mock_single,
+    ):
+        results = await handle_drive_folder(files, limit=2)
+
+    assert [r["status"] for r in results] == [
+        "success",
+        "error",
+        "success",
+        "skipped",
+        "success",
+    ]
+    mock_rows.assert_awaited_once()
+    (records,) = mock_rows.call_args.args
+    assert [record["resume_id"] for record in records] == [
+        "file_0",
+        "file_2",
+        "file_4",
+    ]
+    mock_bulk.assert_awaited_once()
+    (pairs,) = mock_bulk.call_args.args
+    assert [resume_id for resume_id, _ in pairs] == ["file_0", "file_2", "file_4"]
+    mock_single.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_download_to_buffer():
+    """Test Drive download returns file bytes without touching disk"""
+    with patch("src.drive_ingest._sync_download") as mock_download:
+        mock_download.return_value = b"%PDF-1.4 test"
+
+        result = await download_to_buffer("file123")
+
+        assert result == b"%PDF-1.4 test"
+        mock_download.assert_called_once_with("file123")
+
+
+def test_drive_service_is_built_per_thread():
+    """Test download threads never share a Drive service (httplib2 is not thread-safe)"""
+    import threading
+    from src.drive_ingest import _get_drive_service
+
+    with patch("src.drive_ingest._get_drive_credentials"), patch(
+        "src.drive_ingest.build", side_effect=lambda *a, **k: Mock()
+    ) as mock_build:
+        services = []
+        for _ in range(2):
+            worker = threading.Thread(
+                target=lambda: services.extend([_get_drive_service()] * 2)
+            )
+            worker.start()
+            worker.join()
+
+        assert services[0] is services[1]
+        assert services[0] is not services[2]
+        assert mock_build.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_handle_drive_webhook_streams_buffer_to_extractor():
+    """Test the downloaded bytes go straight to the extractor"""
     with patch(
-        "src.drive_ingest.download_file_from_drive", new_callable=AsyncMock
-    ) as mock_download:
-        mock_download.return_value = True
+        "src.drive_ingest.download_to_buffer", new_callable=AsyncMock
+    ) as mock_download, patch(
+        "src.drive_ingest.extract_text_from_pdf", new_callable=AsyncMock
+    ) as mock_extract, patch(
+        "src.drive_ingest.generate_embeddings", new_callable=AsyncMock
+    ) as mock_embed, patch(
+        "src.drive_ingest.store_resume_in_postgres", new_callable=AsyncMock
+    ) as mock_store:
+        mock_download.return_value = b"%PDF-1.4 test"
+        mock_extract.return_value = "Jane Doe\nFinancial Planner"
+        mock_embed.return_value = np.zeros(3, dtype=np.float32)
+        mock_store.return_value = "file123"
+
+        result = await handle_drive_webhook("file123", "jane.pdf", "application/pdf")
+
+        assert result["status"] == "success"
+        assert result["resume_id"] == "file123"
+        mock_extract.assert_called_once_with(b"%PDF-1.4 test")
 
-        result = await download_file_from_drive("file123", "/tmp/resume.pdf")
 
-        assert result is True
-        mock_download.assert_called_once_with("file123", "/tmp/resume.pdf")
+@pytest.mark.asyncio
+async def test_handle_drive_webhook_skips_unsupported_type():
+    """Test non PDF/DOCX uploads are ignored"""
+    with patch(
+        "src.drive_ingest.download_to_buffer", new_callable=AsyncMock
+    ) as mock_download:
+        result = await handle_drive_webhook("file123", "notes.txt", "text/plain")
+
+        assert result["status"] == "skipped"
+        mock_download.assert_not_called()
 
 
 def test_setup_drive_webhook():
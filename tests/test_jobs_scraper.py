@@ -1,18 +1,35 @@
 """Tests for jobs_scraper module"""
 
+import asyncio
+import dataclasses
 import pytest
+import httpx
+import orjson
 from unittest.mock import patch, AsyncMock, Mock
-from datetime import datetime
+from datetime import datetime, timezone
 from src.jobs_scraper import (
     scrape_linkedin_jobs,
     filter_jobs_by_criteria,
+    get_company_by_linkedin_url,
     get_job_details,
+    get_job_details_many,
+    get_job_details_enhanced,
     Job,
     RateLimiter,
+    get_client,
+    close_client,
     _process_job_data,
+    _parse_posted_time_from_timestamp,
+    _get_geo_code_for_location,
     _parse_posted_time,
     _generate_company_id,
     _extract_requirements,
+    _remove_duplicates,
+    _request,
+    _details_cache,
+    RateLimited,
+    check_search_status,
+    find_decision_makers_for_job,
 )
 
 
@@ -84,6 +101,14 @@ def sample_jobs_list():
     ]
 
 
+@pytest.fixture(autouse=True)
+def clear_details_cache():
+    """Start every test with an empty in-process job details cache"""
+    _details_cache.clear()
+    yield
+    _details_cache.clear()
+
+
 class TestJobDataclass:
     """Test the Job dataclass"""
 
@@ -105,6 +130,32 @@ class TestJobDataclass:
         assert job.job_title == "Test Role"
         assert job.posted_hours_ago == 2
 
+    def test_job_is_frozen_and_slotted(self, sample_jobs_list):
+        """Test Job instances are immutable and carry no __dict__"""
+        job = sample_jobs_list[0]
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            job.job_title = "Changed"
+        assert not hasattr(job, "__dict__")
+
+        updated = dataclasses.replace(job, full_description="Details")
+        assert updated.full_description == "Details"
+        assert job.full_description is None
+
+
+class TestRemoveDuplicates:
+    """Test job de-duplication"""
+
+    def test_keeps_first_job_per_link(self, sample_jobs_list):
+        """Test duplicates collapse to the first job and order is preserved"""
+        first, second = sample_jobs_list[:2]
+        repeat = dataclasses.replace(first, job_title="Repost")
+        unlinked = dataclasses.replace(second, job_link="")
+
+        result = _remove_duplicates([first, second, repeat, unlinked])
+
+        assert result == [first, second]
+
 
 class TestRateLimiter:
     """Test the RateLimiter class"""
@@ -134,6 +185,116 @@ class TestRateLimiter:
             await limiter.acquire()
             mock_sleep.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_rate_limiter_expires_requests_after_window(self):
+        """Test requests older than the window no longer count"""
+        limiter = RateLimiter(max_requests=2, time_window=60)
+
+        with (
+            patch("src.jobs_scraper.time.monotonic", side_effect=[0.0, 1.0, 60.5]),
+            patch("asyncio.sleep", new_callable=AsyncMock) as mock_sleep,
+        ):
+            await limiter.acquire()
+            await limiter.acquire()
+            await limiter.acquire()
+
+            mock_sleep.assert_not_called()
+            assert list(limiter.requests) == [1.0, 60.5]
+
+
+class TestSharedClient:
+    """Test the shared RapidAPI client"""
+
+    @pytest.mark.asyncio
+    async def test_get_client_is_reused_until_closed(self):
+        """Test every call gets the same pooled client until it is closed"""
+        first = await get_client()
+        second = await get_client()
+        assert first is second
+
+        await close_client()
+        assert first.is_closed
+
+        third = await get_client()
+        assert third is not first
+        await close_client()
+
+
+class TestRequestRetries:
+    """Test retrying and isolation of RapidAPI failures"""
+
+    @staticmethod
+    def _client_for(handler):
+        return httpx.AsyncClient(
+            base_url="https://rapidapi.test", transport=httpx.MockTransport(handler)
+        )
+
+    @pytest.mark.asyncio
+    async def test_retries_transient_failures_then_succeeds(self):
+        """Test 5xx responses and connection errors are retried with backoff"""
+        outcomes = iter(["503", "connect", "200"])
+
+        def handler(request):
+            outcome = next(outcomes)
+            if outcome == "connect":
+                raise httpx.ConnectError("reset", request=request)
+            return httpx.Response(int(outcome), json={"ok": outcome == "200"})
+
+        client = self._client_for(handler)
+        with (
+            patch("src.jobs_scraper.get_client", AsyncMock(return_value=client)),
+            patch("src.jobs_scraper.rate_limiter.acquire", new_callable=AsyncMock),
+            patch("src.jobs_scraper.asyncio.sleep", new_callable=AsyncMock) as sleep,
+        ):
+            response = await _request("GET", "/check-search-status")
+
+        assert response.status_code == 200
+        assert sleep.await_count == 2
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_client_errors_are_not_retried(self):
+        """Test a 4xx response raises immediately"""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(403)
+
+        client = self._client_for(handler)
+        with (
+            patch("src.jobs_scraper.get_client", AsyncMock(return_value=client)),
+            patch("src.jobs_scraper.rate_limiter.acquire", new_callable=AsyncMock),
+            patch("src.jobs_scraper.asyncio.sleep", new_callable=AsyncMock) as sleep,
+        ):
+            with pytest.raises(httpx.HTTPStatusError):
+                await _request("GET", "/get-job-details")
+
+        assert len(calls) == 1
+        sleep.assert_not_awaited()
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_scrape_keeps_results_when_one_search_crashes(self):
+        """Test an unexpected error in one search only drops that search"""
+        job = Mock(job_link="https://example.com/1", location="Melbourne")
+
+        async def fake_search(location, term, hours_threshold, now, seen_urns):
+            if location == "Perth":
+                raise KeyError("unexpected payload")
+            return [job]
+
+        with (
+            patch("src.jobs_scraper.RAPIDAPI_KEY", "test-key"),
+            patch("src.jobs_scraper._search_one", side_effect=fake_search),
+            patch("src.jobs_scraper._filter_jobs", side_effect=lambda jobs, *_: jobs),
+        ):
+            result = await scrape_linkedin_jobs(
+                location_filters=["Melbourne", "Perth"], role_filters=["Paraplanner"]
+            )
+
+        assert result == [job]
+
 
 class TestScrapeLinkedInJobs:
     """Test the main scraping function"""
@@ -154,16 +315,16 @@ class TestScrapeLinkedInJobs:
 
         with (
             patch("src.jobs_scraper.RAPIDAPI_KEY", "test-key"),
-            patch("httpx.AsyncClient") as mock_client,
+            patch(
+                "src.jobs_scraper.get_client", new_callable=AsyncMock
+            ) as mock_get_client,
         ):
             # Mock the HTTP response
             mock_response = Mock()
-            mock_response.json.return_value = mock_response_data
+            mock_response.content = orjson.dumps(mock_response_data)
             mock_response.raise_for_status.return_value = None
 
-            mock_client.return_value.__aenter__.return_value.post.return_value = (
-                mock_response
-            )
+            mock_get_client.return_value.request = AsyncMock(return_value=mock_response)
 
             # Mock rate limiter
             with patch("src.jobs_scraper.rate_limiter.acquire", new_callable=AsyncMock):
@@ -175,16 +336,70 @@ class TestScrapeLinkedInJobs:
             assert len(result) >= 0  # Should return a list
             assert isinstance(result, list)
 
+    @pytest.mark.asyncio
+    async def test_scrape_linkedin_jobs_dedups_by_urn(self, sample_job_data):
+        """Test a posting returned by several searches is processed once"""
+        mock_response = Mock()
+        mock_response.content = orjson.dumps({"data": [sample_job_data]})
+        mock_response.raise_for_status.return_value = None
+
+        with (
+            patch("src.jobs_scraper.RAPIDAPI_KEY", "test-key"),
+            patch(
+                "src.jobs_scraper.get_client", new_callable=AsyncMock
+            ) as mock_get_client,
+            patch("src.jobs_scraper.rate_limiter.acquire", new_callable=AsyncMock),
+            patch(
+                "src.jobs_scraper._process_job_data", wraps=_process_job_data
+            ) as mock_process,
+        ):
+            mock_get_client.return_value.request = AsyncMock(return_value=mock_response)
+            await scrape_linkedin_jobs(
+                location_filters=["Melbourne, Australia"],
+                role_filters=["Financial Planner", "Paraplanner"],
+            )
+
+        assert mock_get_client.return_value.request.await_count == 2
+        mock_process.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_scrape_linkedin_jobs_searches_every_location_term_pair(self):
+        """Test each (location, term) pair is searched and results are merged"""
+        searched = []
+
+        async def fake_search(location, term, hours_threshold, now, seen_urns):
+            searched.append((location, term))
+            return []
+
+        with (
+            patch("src.jobs_scraper.RAPIDAPI_KEY", "test-key"),
+            patch("src.jobs_scraper._search_one", side_effect=fake_search),
+        ):
+            result = await scrape_linkedin_jobs(
+                location_filters=["Melbourne", "Perth"],
+                role_filters=["Financial Planner", "Paraplanner"],
+            )
+
+        assert result == []
+        assert sorted(searched) == [
+            ("Melbourne", "Financial Planner"),
+            ("Melbourne", "Paraplanner"),
+            ("Perth", "Financial Planner"),
+            ("Perth", "Paraplanner"),
+        ]
+
     @pytest.mark.asyncio
     async def test_scrape_linkedin_jobs_api_error(self):
         """Test handling of API errors"""
         with (
             patch("src.jobs_scraper.RAPIDAPI_KEY", "test-key"),
-            patch("httpx.AsyncClient") as mock_client,
+            patch(
+                "src.jobs_scraper.get_client", new_callable=AsyncMock
+            ) as mock_get_client,
         ):
             # Mock HTTP error
-            mock_client.return_value.__aenter__.return_value.post.side_effect = (
-                Exception("API Error")
+            mock_get_client.return_value.request = AsyncMock(
+                side_effect=Exception("API Error")
             )
 
             with patch("src.jobs_scraper.rate_limiter.acquire", new_callable=AsyncMock):
@@ -223,6 +438,65 @@ class TestFilterJobsByCriteria:
         brisbane_jobs = [job for job in result if "brisbane" in job.location.lower()]
         assert len(brisbane_jobs) == 0  # Software Engineer should be filtered out
 
+    @pytest.mark.asyncio
+    async def test_filter_ignores_case_without_lowercasing(self, sample_jobs_list):
+        """Test mixed-case locations and titles match without lower() copies"""
+        paraplanner = sample_jobs_list[2]
+        jobs = [
+            dataclasses.replace(paraplanner, location="MELBOURNE, VIC"),
+            dataclasses.replace(
+                paraplanner, location="perth, wa", job_title="PARAPLANNER"
+            ),
+        ]
+
+        result = await filter_jobs_by_criteria(
+            jobs, specific_roles_other_cities=["Paraplanner"]
+        )
+
+        assert result == jobs
+
+    @pytest.mark.asyncio
+    async def test_filter_matches_city_codes_as_whole_words(self, sample_jobs_list):
+        """Test short state codes don't match inside other place names"""
+        paraplanner = sample_jobs_list[2]
+        jobs = [
+            dataclasses.replace(paraplanner, location="Warrnambool, Victoria"),
+            dataclasses.replace(paraplanner, location="Gold Coast, Queensland"),
+            dataclasses.replace(paraplanner, location="Newcastle, NSW"),
+            dataclasses.replace(paraplanner, location="Hawthorn East, SA"),
+        ]
+
+        result = await filter_jobs_by_criteria(jobs, keep_all_melbourne=False)
+
+        assert [job.location for job in result] == [
+            "Gold Coast, Queensland",
+            "Hawthorn East, SA",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_filter_large_batches_run_off_the_event_loop(self, sample_jobs_list):
+        """Test batches over the threshold are filtered on a worker thread"""
+        with (
+            patch("src.jobs_scraper.FILTER_OFFLOAD_THRESHOLD", 3),
+            patch(
+                "src.jobs_scraper.asyncio.to_thread", wraps=asyncio.to_thread
+            ) as to_thread,
+        ):
+            small = await filter_jobs_by_criteria(sample_jobs_list[:3])
+            large = await filter_jobs_by_criteria(sample_jobs_list)
+
+        to_thread.assert_called_once()
+        assert small == large == sample_jobs_list[:3]
+
+    @pytest.mark.asyncio
+    async def test_filter_melbourne_not_kept_when_disabled(self, sample_jobs_list):
+        """Test Melbourne jobs are dropped when keep_all_melbourne is off"""
+        result = await filter_jobs_by_criteria(
+            sample_jobs_list, keep_all_melbourne=False
+        )
+
+        assert [job.job_title for job in result] == ["Paraplanner"]
+
 
 class TestGetJobDetails:
     """Test job details extraction"""
@@ -245,15 +519,15 @@ class TestGetJobDetails:
 
         with (
             patch("src.jobs_scraper.RAPIDAPI_KEY", "test-key"),
-            patch("httpx.AsyncClient") as mock_client,
+            patch(
+                "src.jobs_scraper.get_client", new_callable=AsyncMock
+            ) as mock_get_client,
         ):
             mock_response = Mock()
-            mock_response.json.return_value = mock_response_data
+            mock_response.content = orjson.dumps(mock_response_data)
             mock_response.raise_for_status.return_value = None
 
-            mock_client.return_value.__aenter__.return_value.get.return_value = (
-                mock_response
-            )
+            mock_get_client.return_value.request = AsyncMock(return_value=mock_response)
 
             with patch("src.jobs_scraper.rate_limiter.acquire", new_callable=AsyncMock):
                 result = await get_job_details("https://example.com/job")
@@ -261,6 +535,223 @@ class TestGetJobDetails:
             assert result["company_name"] == "Test Company"
             assert "CFA certification" in result["requirements"]
 
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "body", [{"company": None, "description": None}, ["unexpected"]]
+    )
+    async def test_get_job_details_tolerates_null_fields(self, body):
+        """Test null company objects and non-object bodies yield empty details"""
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, json=body))
+        client = httpx.AsyncClient(
+            base_url="https://rapidapi.test", transport=transport
+        )
+
+        with (
+            patch("src.jobs_scraper.RAPIDAPI_KEY", "test-key"),
+            patch(
+                "src.jobs_scraper.get_client",
+                new_callable=AsyncMock,
+                return_value=client,
+            ),
+            patch("src.jobs_scraper.rate_limiter.acquire", new_callable=AsyncMock),
+        ):
+            result = await get_job_details("https://example.com/job")
+
+        assert result["company_name"] == ""
+        assert result["company_industry"] == []
+        assert result["requirements"] == []
+        await client.aclose()
+
+
+class TestGetJobDetailsMany:
+    """Test batched job details fetching"""
+
+    @pytest.mark.asyncio
+    async def test_fetches_concurrently_and_drops_failures(self):
+        """Test URLs are fetched in parallel and failed ones are omitted"""
+        in_flight = 0
+        peak = 0
+
+        async def fake_details(url):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+            if url.endswith("bad"):
+                raise RuntimeError("boom")
+            if url.endswith("none"):
+                return None
+            return {"data": {"job_url": url}}
+
+        urls = [f"https://example.com/{i}" for i in range(6)]
+        urls += ["https://example.com/bad", "https://example.com/none", urls[0]]
+
+        with patch(
+            "src.jobs_scraper.get_job_details_enhanced", side_effect=fake_details
+        ) as mock_details:
+            result = await get_job_details_many(urls, concurrency=3)
+
+        assert list(result) == urls[:6]
+        assert result[urls[1]] == {"data": {"job_url": urls[1]}}
+        assert mock_details.call_count == 8
+        assert peak == 3
+
+
+class TestJobDetailsCache:
+    """Test the job details TTL cache"""
+
+    @pytest.mark.asyncio
+    async def test_repeat_and_concurrent_calls_fetch_once(self):
+        """Test one API call serves concurrent and later calls for a URL"""
+        details = {"data": {"job_title": "Paraplanner"}}
+
+        async def slow_fetch(url):
+            await asyncio.sleep(0)
+            return details
+
+        with patch(
+            "src.jobs_scraper._fetch_job_details", side_effect=slow_fetch
+        ) as mock_fetch:
+            first, second = await asyncio.gather(
+                get_job_details_enhanced("https://example.com/1"),
+                get_job_details_enhanced("https://example.com/1"),
+            )
+            third = await get_job_details_enhanced("https://example.com/1")
+
+        assert first == second == third == details
+        mock_fetch.assert_awaited_once_with("https://example.com/1")
+
+    @pytest.mark.asyncio
+    async def test_failures_and_expired_entries_are_refetched(self):
+        """Test misses are not cached and entries expire after the TTL"""
+        with (
+            patch(
+                "src.jobs_scraper._fetch_job_details",
+                new_callable=AsyncMock,
+                side_effect=[None, {"data": {}}, {"data": {"fresh": True}}],
+            ) as mock_fetch,
+            patch("src.jobs_scraper.time.monotonic", side_effect=[0, 4000, 4000]),
+        ):
+            assert await get_job_details_enhanced("https://example.com/2") is None
+            assert await get_job_details_enhanced("https://example.com/2") == {
+                "data": {}
+            }
+            assert await get_job_details_enhanced("https://example.com/2") == {
+                "data": {"fresh": True}
+            }
+
+        assert mock_fetch.await_count == 3
+
+
+class TestFindDecisionMakers:
+    """Test decision maker search polling"""
+
+    @pytest.mark.asyncio
+    async def test_polls_with_exponential_backoff(self, sample_jobs_list):
+        """Test waits between status checks double until the cap"""
+        statuses = [{"status": "running"}] * 5 + [{"status": "completed"}]
+
+        with (
+            patch(
+                "src.jobs_scraper.search_decision_makers",
+                new_callable=AsyncMock,
+                return_value="req-1",
+            ),
+            patch(
+                "src.jobs_scraper.check_search_status",
+                new_callable=AsyncMock,
+                side_effect=statuses,
+            ),
+            patch(
+                "src.jobs_scraper.get_search_results",
+                new_callable=AsyncMock,
+                return_value=[{"name": "Jane"}],
+            ),
+            patch("src.jobs_scraper.asyncio.sleep", new_callable=AsyncMock) as sleep,
+        ):
+            result = await find_decision_makers_for_job(sample_jobs_list[0])
+
+        assert result == [{"name": "Jane"}]
+        assert [c.args[0] for c in sleep.await_args_list] == [1, 2, 4, 8, 10]
+
+    @pytest.mark.asyncio
+    async def test_waits_out_rate_limit_reset(self, sample_jobs_list):
+        """Test a 429 on a status check sleeps for the reset then retries"""
+        with (
+            patch(
+                "src.jobs_scraper.search_decision_makers",
+                new_callable=AsyncMock,
+                return_value="req-1",
+            ),
+            patch(
+                "src.jobs_scraper.check_search_status",
+                new_callable=AsyncMock,
+                side_effect=[RateLimited(3), {"status": "failed"}],
+            ),
+            patch("src.jobs_scraper.asyncio.sleep", new_callable=AsyncMock) as sleep,
+        ):
+            result = await find_decision_makers_for_job(sample_jobs_list[0])
+
+        assert result is None
+        sleep.assert_awaited_once_with(3)
+
+    @pytest.mark.asyncio
+    async def test_check_search_status_raises_on_429(self):
+        """Test a 429 response surfaces the reset from the body"""
+        transport = httpx.MockTransport(
+            lambda request: httpx.Response(429, json={"reset": 7})
+        )
+        client = httpx.AsyncClient(
+            base_url="https://rapidapi.test", transport=transport
+        )
+
+        with (
+            patch("src.jobs_scraper.RAPIDAPI_KEY", "test-key"),
+            patch(
+                "src.jobs_scraper.get_client",
+                new_callable=AsyncMock,
+                return_value=client,
+            ),
+            patch("src.jobs_scraper.rate_limiter.acquire", new_callable=AsyncMock),
+        ):
+            with pytest.raises(RateLimited) as excinfo:
+                await check_search_status("req-1")
+
+        assert excinfo.value.wait == 7
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_get_company_by_linkedin_url(self):
+        """Test the company lookup sends the page URL and returns its profile"""
+        seen = []
+
+        def handler(request):
+            seen.append(request.url)
+            return httpx.Response(200, json={"data": {"company_id": "892970"}})
+
+        client = httpx.AsyncClient(
+            base_url="https://rapidapi.test", transport=httpx.MockTransport(handler)
+        )
+
+        with (
+            patch("src.jobs_scraper.RAPIDAPI_KEY", "test-key"),
+            patch(
+                "src.jobs_scraper.get_client",
+                new_callable=AsyncMock,
+                return_value=client,
+            ),
+            patch("src.jobs_scraper.rate_limiter.acquire", new_callable=AsyncMock),
+        ):
+            company = await get_company_by_linkedin_url(
+                "https://www.linkedin.com/company/acme"
+            )
+
+        assert company == {"company_id": "892970"}
+        assert seen[0].path == "/get-company-by-linkedinurl"
+        assert seen[0].params["linkedin_url"] == "https://www.linkedin.com/company/acme"
+        await client.aclose()
+
 
 class TestHelperFunctions:
     """Test helper functions"""
@@ -274,6 +765,16 @@ class TestHelperFunctions:
         assert result.job_title == "Senior Financial Planner"
         assert result.company_id == "wealth_management"
 
+    def test_process_job_data_shares_run_timestamp(self, sample_job_data):
+        """Test jobs processed with the same now get the same scraped_at"""
+        now = datetime.now(timezone.utc)
+
+        first = _process_job_data(sample_job_data, now)
+        second = _process_job_data(dict(sample_job_data, job_url="other"), now)
+
+        assert first.scraped_at == second.scraped_at
+        assert datetime.fromisoformat(first.scraped_at).tzinfo is None
+
     def test_process_job_data_old_posting(self):
         """Test that old job postings are filtered out"""
         old_job_data = {
@@ -287,6 +788,38 @@ class TestHelperFunctions:
         result = _process_job_data(old_job_data)
         assert result is not None  # Should still process, filtering happens elsewhere
 
+    def test_process_job_data_interns_repeated_strings(self, sample_job_data):
+        """Test equal location and company strings share one object across jobs"""
+        first = _process_job_data(
+            dict(sample_job_data, location="".join(["Melb", "ourne, VIC"]))
+        )
+        second = _process_job_data(
+            dict(sample_job_data, location="".join(["Melbourne", ", VIC"]))
+        )
+
+        assert first.location is second.location
+        assert first.company_name is second.company_name
+
+    def test_process_job_data_null_company_and_location(self, sample_job_data):
+        """Test null company and location fields become empty strings"""
+        job = _process_job_data(dict(sample_job_data, company=None, location=None))
+
+        assert job is not None
+        assert job.company_name == ""
+        assert job.location == ""
+
+    def test_process_job_data_max_hours_skips_stale_posting(self, sample_job_data):
+        """Test postings past max_hours are dropped before the Job is built"""
+        stale = dict(sample_job_data, posted_time="2023-01-01 12:00:00")
+
+        with patch("src.jobs_scraper._generate_company_id") as mock_company_id:
+            assert _process_job_data(stale, max_hours=24) is None
+        mock_company_id.assert_not_called()
+
+        fresh = dict(sample_job_data, posted_time="2023-01-01 12:00:00")
+        now = datetime(2023, 1, 1, 20, 0, tzinfo=timezone.utc)
+        assert _process_job_data(fresh, now, max_hours=24).posted_hours_ago == 8
+
     def test_parse_posted_time_hours(self):
         """Test parsing posted time in hours"""
         assert _parse_posted_time("2 hours ago") == 2
@@ -308,17 +841,40 @@ class TestHelperFunctions:
         assert _parse_posted_time("1 week ago") == 168  # 7 * 24
         assert _parse_posted_time("2 weeks ago") == 336  # 14 * 24
 
+    def test_parse_posted_time_without_count(self):
+        """Test posted times with no number default to one unit"""
+        assert _parse_posted_time("an hour ago") == 1
+        assert _parse_posted_time("A day ago") == 24
+        assert _parse_posted_time("a week ago") == 168
+
     def test_parse_posted_time_invalid(self):
         """Test parsing invalid posted time"""
         assert _parse_posted_time("") == 999
         assert _parse_posted_time("invalid") == 999
 
+    def test_parse_posted_time_from_timestamp_uses_given_now(self):
+        """Test timestamp ages are measured against the supplied instant"""
+        now = datetime(2025, 6, 21, 12, 0, tzinfo=timezone.utc)
+
+        assert _parse_posted_time_from_timestamp("2025-06-21 06:51:58", now) == 5
+        assert _parse_posted_time_from_timestamp("2025-06-22 06:00:00", now) == 0
+        assert _parse_posted_time_from_timestamp("", now) == 999
+        assert _parse_posted_time_from_timestamp("not a date", now) == 999
+
+    def test_get_geo_code_for_location(self):
+        """Test location strings map to LinkedIn geo codes"""
+        assert _get_geo_code_for_location("Perth, WA") == 102890883
+        assert _get_geo_code_for_location("Greater Sydney Area") == 105072130
+        assert _get_geo_code_for_location("Remote") == 101452733
+
     def test_generate_company_id(self):
         """Test company ID generation"""
         assert _generate_company_id("Wealth Management Pty Ltd") == "wealth_management"
         assert _generate_company_id("ABC Corp") == "abc"
         assert _generate_company_id("Test Company Inc") == "test_company"
         assert _generate_company_id("") == ""
+        assert _generate_company_id("Smith & Co. Limited") == "smith___co_"
+        assert _generate_company_id("Café – Advisers") == "café___advisers"
 
     def test_extract_requirements(self):
         """Test requirements extraction from job description"""
@@ -336,6 +892,24 @@ class TestHelperFunctions:
         assert "Relevant experience required" in requirements
         assert "Relevant licensing" in requirements
 
+    def test_extract_requirements_keeps_canonical_order(self):
+        """Test labels come back in a fixed order regardless of text order"""
+        description = "Senior adviser. Bachelor degree. 3 years of experience. CFP."
+
+        assert _extract_requirements(description) == [
+            "CFP certification",
+            "Relevant experience required",
+            "Bachelor's degree",
+        ]
+
+    @pytest.mark.parametrize(
+        "description",
+        ["LİCENSE required", "Licenſe required", "10 yearſ experience"],
+    )
+    def test_extract_requirements_unicode_case_folds(self, description):
+        """Test Unicode look-alikes of a trigger never break the label lookup"""
+        assert _extract_requirements(description) == []
+
     def test_extract_requirements_empty(self):
         """Test requirements extraction from empty description"""
         assert _extract_requirements("") == []
@@ -353,15 +927,15 @@ class TestIntegration:
 
         with (
             patch("src.jobs_scraper.RAPIDAPI_KEY", "test-key"),
-            patch("httpx.AsyncClient") as mock_client,
+            patch(
+                "src.jobs_scraper.get_client", new_callable=AsyncMock
+            ) as mock_get_client,
         ):
             mock_response = Mock()
-            mock_response.json.return_value = mock_response_data
+            mock_response.content = orjson.dumps(mock_response_data)
             mock_response.raise_for_status.return_value = None
 
-            mock_client.return_value.__aenter__.return_value.post.return_value = (
-                mock_response
-            )
+            mock_get_client.return_value.request = AsyncMock(return_value=mock_response)
 
             with patch("src.jobs_scraper.rate_limiter.acquire", new_callable=AsyncMock):
                 jobs = await scrape_linkedin_jobs(
@@ -1 +1,37 @@
- 
\ No newline at end of file
+"""Tests for main module"""
+
+import os
+
+# database builds its Supabase client at import time
+os.environ.setdefault("SUPABASE_URL", "https://test.supabase.co")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "test_key")
+
+import pytest
+from unittest.mock import patch, AsyncMock, Mock
+from src.main import app, lifespan
+
+
+@pytest.mark.asyncio
+async def test_lifespan_registers_jobs_before_starting_scheduler():
+    """Test every daily job is scheduled before the scheduler starts"""
+    calls = []
+    scheduler = Mock()
+    scheduler.start.side_effect = lambda: calls.append("start")
+
+    with (
+        patch("src.database.init_db_pool", new_callable=AsyncMock),
+        patch("src.database.ensure_schema", new_callable=AsyncMock),
+        patch("src.database.close_db_pool", new_callable=AsyncMock),
+        patch("src.jobs_scraper.close_client", new_callable=AsyncMock),
+        patch("src.messaging.close_anthropic_client", new_callable=AsyncMock),
+        patch("src.drive_ingest.shutdown_extract_executor"),
+        patch("src.main.get_scheduler", return_value=scheduler),
+        patch(
+            "src.scheduler.setup_all_scheduled_jobs",
+            side_effect=lambda s: calls.append(("setup", s)),
+        ),
+    ):
+        async with lifespan(app):
+            assert calls == [("setup", scheduler), "start"]
+
+    scheduler.stop.assert_called_once()
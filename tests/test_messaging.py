@@ -1,16 +1,58 @@
 """Tests for messaging module"""
 
+import asyncio
 import pytest
-from unittest.mock import patch, AsyncMock
+from types import SimpleNamespace
+from unittest.mock import patch, AsyncMock, Mock
 from src.messaging import (
     build_message,
     generate_message_variants,
+    format_bullet_list,
     validate_message_constraints,
+    render_prompt,
     MessageBuilder,
     CHAR_LIMIT,
+    SYSTEM_PREFIX,
+    SYSTEM_PREFIX_LITE,
+    is_simple_message,
+    CTA_VARIANTS,
+    SMALL_TALK_VARIANTS,
+    SNAPSHOT_PHRASES,
+    VariantDeck,
+    _message_params,
 )
 
 
+def _text_message(text):
+    """Claude response content with a single text block"""
+    return SimpleNamespace(content=[SimpleNamespace(type="text", text=text)])
+
+
+def _batch_entry(custom_id, text=None):
+    """Message Batches result line; text=None means the request errored"""
+    if text is None:
+        result = SimpleNamespace(type="errored")
+    else:
+        result = SimpleNamespace(type="succeeded", message=_text_message(text))
+    return SimpleNamespace(custom_id=custom_id, result=result)
+
+
+class _AsyncLines:
+    """Async iterator standing in for the batch results JSONL stream"""
+
+    def __init__(self, entries):
+        self._entries = iter(entries)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._entries)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
 def test_build_message(mock_outreach_message):
     """Test message building with template"""
     test_data = {
@@ -65,6 +107,48 @@ def test_validate_message_length_check():
         assert result is False
 
 
+@pytest.mark.parametrize(
+    "message, expected",
+    [
+        ("Quick intro – CFA analyst\n\nHi John,\n\nHope you're well.", True),
+        ("Hi John,\n\nI hope you're having a great week.", True),
+        ("Quick intro - CFA analyst\n\nHi John,\n\nHope you're well.", False),
+        ("Hi John — I saw your opening...", False),
+        ("Hi John,\n\n" + "A" * CHAR_LIMIT, False),
+        ("Hey John, no proper greeting here", False),
+        ("Hi John,\n\nShe helped the team prioritize and organize.", False),
+    ],
+)
+def test_validate_message_constraints_rules(message, expected):
+    """Test length, em dash, greeting, subject dash and spelling rules"""
+    assert validate_message_constraints(message) is expected
+
+
+def test_validate_message_constraints_length_skips_regex():
+    """Test oversized drafts are rejected before any regex runs"""
+    with patch("src.messaging._GREETING") as mock_greeting:
+        assert validate_message_constraints("A" * (CHAR_LIMIT + 1)) is False
+    mock_greeting.search.assert_not_called()
+
+
+def test_format_bullet_list_truncates_and_reuses_output():
+    """Test bullets are cut to 25 words and repeated lists hit the cache"""
+    from src.messaging import _format_bullet_list
+
+    long_bullet = " ".join(f"w{i}" for i in range(30))
+    _format_bullet_list.cache_clear()
+
+    first = format_bullet_list(["  CFA certified ", long_bullet, ""])
+    second = format_bullet_list(["CFA certified", long_bullet, " "])
+
+    assert first == second
+    assert first.splitlines() == [
+        "• CFA certified",
+        "• " + " ".join(f"w{i}" for i in range(25)),
+    ]
+    assert _format_bullet_list.cache_info().hits == 1
+
+
 def test_generate_message_variants():
     """Test message variant generation"""
     expected_variants = {
@@ -89,6 +173,47 @@ def test_generate_message_variants():
         mock_variants.assert_called_once()
 
 
+def test_generate_message_variants_samples_constant_pools():
+    """Test variants are drawn from the module-level pools"""
+    result = generate_message_variants(
+        first_name="John",
+        company="Test Company",
+        job_title="Financial Planner",
+        candidate_bullets=["CFA certified"],
+    )
+
+    assert result["greeting"] == "Hi John,"
+    assert result["small_talk"] in SMALL_TALK_VARIANTS
+    assert result["cta"] in CTA_VARIANTS
+    assert result["snapshot_phrase"] in SNAPSHOT_PHRASES
+
+
+def test_variant_deck_deals_every_variant_once_per_pass():
+    """Test each pass uses every variant once and never repeats across passes"""
+    deck = VariantDeck(CTA_VARIANTS)
+    draws = [deck.draw() for _ in range(len(CTA_VARIANTS) * 5)]
+
+    for start in range(0, len(draws), len(CTA_VARIANTS)):
+        assert sorted(draws[start : start + len(CTA_VARIANTS)]) == sorted(CTA_VARIANTS)
+    assert all(a != b for a, b in zip(draws, draws[1:]))
+
+
+def test_generate_message_variants_uses_builder_decks():
+    """Test a builder's decks are consulted instead of random.choice"""
+    builder = MessageBuilder()
+
+    with patch("src.messaging.random.choice") as mock_choice:
+        ctas = [
+            generate_message_variants(
+                "John", "Test Co", "Analyst", [], decks=builder.variant_decks
+            )["cta"]
+            for _ in CTA_VARIANTS
+        ]
+
+    mock_choice.assert_not_called()
+    assert sorted(ctas) == sorted(CTA_VARIANTS)
+
+
 @pytest.mark.asyncio
 async def test_message_builder_create_outreach_message():
     """Test MessageBuilder class"""
@@ -116,3 +241,170 @@ async def test_message_builder_create_outreach_message():
         assert "body" in result
         assert "–" in result["subject"]  # en dash required
         mock_create.assert_called_once()
+
+
+def test_render_prompt_fills_template_variables():
+    """Test {{ ... }} slots are filled and unknown ones render empty"""
+    prompt = render_prompt({"first_name": "John", "company": "Test Co"})
+
+    assert "John" in prompt
+    assert "Test Co" in prompt
+    assert "{{" not in prompt
+
+
+def test_render_prompt_matches_regex_substitution():
+    """Test the pre-split template renders exactly like a per-call substitution"""
+    from src.messaging import USER_TEMPLATE, _TEMPLATE_VARIABLE
+
+    variables = {"first_name": "John", "bullet_list": "• CFA", "promo_block": 3}
+    expected = _TEMPLATE_VARIABLE.sub(
+        lambda match: str(variables.get(match.group(1), "")), USER_TEMPLATE
+    )
+
+    assert render_prompt(variables) == expected
+
+
+@pytest.mark.asyncio
+async def test_create_outreach_batch_submits_one_batch():
+    """Test every row goes into one batch and errored rows are retried directly"""
+    client = Mock()
+    client.messages.batches.create = AsyncMock(
+        return_value=SimpleNamespace(id="batch-1", processing_status="in_progress")
+    )
+    client.messages.batches.retrieve = AsyncMock(
+        return_value=SimpleNamespace(id="batch-1", processing_status="ended")
+    )
+    client.messages.batches.results = AsyncMock(
+        return_value=_AsyncLines(
+            [_batch_entry("row-1", "Hi John"), _batch_entry("row-2")]
+        )
+    )
+    client.messages.create = AsyncMock(return_value=_text_message("Hi Mary"))
+
+    rows = [
+        {"row_id": "row-1", "first_name": "John"},
+        {"row_id": "row-2", "first_name": "Mary"},
+    ]
+
+    with (
+        patch("src.messaging._get_anthropic_client", return_value=client),
+        patch("src.messaging.asyncio.sleep", new_callable=AsyncMock),
+    ):
+        result = await MessageBuilder().create_outreach_batch(rows)
+
+    assert result == {"row-1": "Hi John", "row-2": "Hi Mary"}
+    requests = client.messages.batches.create.await_args.kwargs["requests"]
+    assert [request["custom_id"] for request in requests] == ["row-1", "row-2"]
+    system = requests[0]["params"]["system"][0]
+    assert system["cache_control"] == {"type": "ephemeral"}
+    assert system["text"] == SYSTEM_PREFIX
+    assert SYSTEM_PREFIX not in requests[0]["params"]["messages"][0]["content"]
+    client.messages.create.assert_awaited_once()
+    assert "Mary" in client.messages.create.await_args.kwargs["messages"][0]["content"]
+
+
+def test_is_simple_message():
+    """Test short bullet lists count as simple and long ones do not"""
+    assert is_simple_message(["CFA certified", "5 years experience"])
+    assert not is_simple_message(["a", "b", "c", "d"])
+    assert not is_simple_message(["word " * 26])
+
+
+@pytest.mark.asyncio
+async def test_create_outreach_batch_routes_simple_rows_to_lite_prompt():
+    """Test simple rows get the lite system prompt at temperature 0"""
+    client = Mock()
+    client.messages.batches.create = AsyncMock(
+        return_value=SimpleNamespace(id="batch-1", processing_status="ended")
+    )
+    client.messages.batches.results = AsyncMock(
+        return_value=_AsyncLines(
+            [_batch_entry("simple", "Hi"), _batch_entry("full", "Hello")]
+        )
+    )
+
+    rows = [
+        {"row_id": "simple", "candidate_bullets": ["CFA certified"]},
+        {"row_id": "full", "candidate_bullets": ["CFA"] * 5},
+    ]
+
+    with patch("src.messaging._get_anthropic_client", return_value=client):
+        await MessageBuilder().create_outreach_batch(rows)
+
+    simple, full = (
+        request["params"]
+        for request in client.messages.batches.create.await_args.kwargs["requests"]
+    )
+    assert simple["system"][0]["text"] == SYSTEM_PREFIX_LITE
+    assert simple["temperature"] == 0
+    assert full["system"][0]["text"] == SYSTEM_PREFIX
+    assert "temperature" not in full
+
+
+async def _run_fallback(requests, fail=()):
+    """Run _complete_warm with a fake _complete, recording call start/end order"""
+    builder = MessageBuilder()
+    events = []
+
+    async def fake_complete(params):
+        name = params["messages"][0]["content"]
+        if isinstance(name, list):
+            name = name[-1]["text"]
+        events.append(("start", name))
+        await asyncio.sleep(0)
+        events.append(("end", name))
+        if name in fail:
+            raise RuntimeError("boom")
+        return f"message {name}"
+
+    with patch.object(builder, "_complete", side_effect=fake_complete):
+        results = await builder._complete_warm(requests)
+    return events, results
+
+
+@pytest.mark.asyncio
+async def test_complete_warm_skips_warm_up_for_short_prefix():
+    """Test an uncacheable prefix is not warmed: every call starts at once"""
+    requests = [_message_params(f"p{i}") for i in range(3)]
+
+    events, results = await _run_fallback(requests, fail={"p1"})
+
+    assert [event for event, _ in events[:3]] == ["start"] * 3
+    assert results[0] == "message p0"
+    assert isinstance(results[1], RuntimeError)
+
+
+@pytest.mark.asyncio
+async def test_complete_warm_warms_each_cacheable_job_once():
+    """Test a long shared job prefix is written by one call before the rest read it"""
+    job_a = "Job A posting. " * 1000
+    job_b = "Job B posting. " * 1000
+    requests = [
+        _message_params("a0", job_context=job_a),
+        _message_params("b0", job_context=job_b),
+        _message_params("a1", job_context=job_a),
+        _message_params("a2", job_context=job_a),
+    ]
+
+    events, results = await _run_fallback(requests)
+
+    a_events = [event for event in events if event[1].startswith("a")]
+    assert a_events[:2] == [("start", "a0"), ("end", "a0")]
+    assert results == ["message a0", "message b0", "message a1", "message a2"]
+    assert requests[0]["messages"][0]["content"][0]["cache_control"] == {
+        "type": "ephemeral"
+    }
+
+
+@pytest.mark.asyncio
+async def test_anthropic_client_is_shared_and_closable():
+    """Test one pooled client is reused until it is closed"""
+    from src.messaging import _get_anthropic_client, close_anthropic_client
+
+    await close_anthropic_client()
+    client = _get_anthropic_client()
+
+    assert _get_anthropic_client() is client
+    await close_anthropic_client()
+    assert _get_anthropic_client() is not client
+    await close_anthropic_client()
@@ -1,5 +1,12 @@
 """Tests for scheduler module"""
 
+import os
+
+# database builds its Supabase client at import time
+os.environ.setdefault("SUPABASE_URL", "https://test.supabase.co")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "test_key")
+
+import numpy as np
 import pytest
 from unittest.mock import patch, AsyncMock, Mock
 from src.scheduler import (
@@ -10,7 +17,27 @@ from src.scheduler import (
     run_message_builder,
     run_sheet_writer,
     manual_run_pipeline,
+    setup_all_scheduled_jobs,
+    MYT,
+    TRIGGERS,
 )
+from src.vector_matcher import MatchResult
+
+
+def _stream(rows):
+    """Stand-in for iter_job_postings that records how it was called"""
+
+    def iterate(*args, **kwargs):
+        iterate.calls.append((args, kwargs))
+
+        async def generate():
+            for row in rows:
+                yield row
+
+        return generate()
+
+    iterate.calls = []
+    return iterate
 
 
 def test_recruitment_scheduler_init():
@@ -19,7 +46,7 @@ def test_recruitment_scheduler_init():
         scheduler = RecruitmentScheduler()
 
         assert scheduler is not None
-        mock_scheduler.assert_called_once_with(timezone="Asia/Kuala_Lumpur")
+        mock_scheduler.assert_called_once_with(timezone=MYT)
 
 
 def test_scheduler_start_stop():
@@ -52,52 +79,296 @@ def test_schedule_all_jobs():
         assert hasattr(scheduler, "schedule_sheet_writer")
 
 
+def test_setup_all_scheduled_jobs_uses_prebuilt_triggers():
+    """Test every stage is scheduled on its module-level MYT trigger"""
+    with patch("src.scheduler.AsyncIOScheduler") as mock_scheduler:
+        mock_instance = Mock()
+        mock_instance.add_job.side_effect = lambda func, trigger, id, **kw: Mock(id=id)
+        mock_scheduler.return_value = mock_instance
+
+        scheduler = RecruitmentScheduler()
+        setup_all_scheduled_jobs(scheduler)
+
+    assert set(scheduler.jobs) == set(TRIGGERS)
+    for call in mock_instance.add_job.call_args_list:
+        assert call.args[1] is TRIGGERS[call.kwargs["id"]]
+    assert str(TRIGGERS["jobs_scraper"].timezone) == "Asia/Kuala_Lumpur"
+
+
 @pytest.mark.asyncio
 async def test_run_jobs_scraper():
-    """Test jobs scraper execution"""
-    with patch("src.scheduler.run_jobs_scraper", new_callable=AsyncMock) as mock_run:
-        await run_jobs_scraper()
-        mock_run.assert_called_once()
+    """Test an empty scrape stores nothing and skips the database"""
+    with (
+        patch("src.scheduler.scrape_linkedin_jobs", AsyncMock(return_value=[])),
+        patch("src.database.bulk_insert_job_postings", AsyncMock()) as mock_insert,
+    ):
+        assert await run_jobs_scraper() == 0
+
+    mock_insert.assert_not_called()
 
 
 @pytest.mark.asyncio
 async def test_run_contact_enricher():
-    """Test contact enricher execution"""
-    with patch(
-        "src.scheduler.run_contact_enricher", new_callable=AsyncMock
-    ) as mock_run:
-        await run_contact_enricher()
-        mock_run.assert_called_once()
+    """Test no unprocessed companies means no lookups"""
+    with (
+        patch("src.database.fetch_unprocessed_companies", AsyncMock(return_value={})),
+        patch("src.scheduler.batch_lookup_companies", AsyncMock()) as mock_lookup,
+    ):
+        assert await run_contact_enricher() == 0
+
+    mock_lookup.assert_not_called()
 
 
 @pytest.mark.asyncio
-async def test_run_matcher():
-    """Test matcher execution"""
-    with patch("src.scheduler.run_matcher", new_callable=AsyncMock) as mock_run:
-        await run_matcher()
-        mock_run.assert_called_once()
+async def test_manual_run_pipeline():
+    """Test a night with nothing new runs every stage and writes an empty sheet"""
+    with (
+        patch("src.scheduler.scrape_linkedin_jobs", AsyncMock(return_value=[])),
+        patch("src.database.fetch_unprocessed_companies", AsyncMock(return_value={})),
+        patch("src.database.iter_job_postings", _stream([])),
+        patch(
+            "src.database.fetch_matches_awaiting_message", AsyncMock(return_value=[])
+        ),
+        patch("src.database.fetch_outreach_rows", AsyncMock(return_value=[])),
+        patch("src.database.mark_outreach_written", AsyncMock()) as mock_mark,
+        patch("src.scheduler.FOLDER_ID", "folder"),
+        patch(
+            "src.scheduler.write_daily_outreach_sheet",
+            AsyncMock(return_value="https://docs.google.com/spreadsheets/d/s"),
+        ) as mock_write,
+    ):
+        result = await manual_run_pipeline()
+
+    assert result == {
+        "status": "success",
+        "jobs_scraped": 0,
+        "contacts_enriched": 0,
+        "matches_found": 0,
+        "messages_built": 0,
+        "sheet_written": 0,
+    }
+    mock_write.assert_awaited_once_with([], "folder")
+    mock_mark.assert_not_called()
 
 
 @pytest.mark.asyncio
-async def test_run_message_builder():
-    """Test message builder execution"""
-    with patch("src.scheduler.run_message_builder", new_callable=AsyncMock) as mock_run:
-        await run_message_builder()
-        mock_run.assert_called_once()
+async def test_run_matcher_reranks_each_posting_and_stores_matches():
+    """Test shortlists are re-ranked per posting and failed postings are retried"""
+    postings = [
+        {
+            "company_name": "Acme",
+            "job_title": "Paraplanner",
+            "job_link": "https://linkedin.com/jobs/1",
+            "location": "Perth",
+            "full_description": "Prepare SOAs",
+            "requirements": ["RG146"],
+        },
+        {
+            "company_name": "Globex",
+            "job_title": "Financial Planner",
+            "job_link": "https://linkedin.com/jobs/2",
+            "location": "Adelaide",
+            "full_description": "Advise clients",
+            "requirements": [],
+        },
+    ]
+    shortlists = [
+        [
+            {"resume_id": "r1", "similarity": 0.8},
+            {"resume_id": "deleted", "similarity": 0.7},
+        ],
+        [{"resume_id": "r2", "similarity": 0.9}],
+    ]
+    resumes = {
+        "r1": {"resume_id": "r1", "candidate_name": "Sam", "text_content": "SOA"},
+        "r2": {"resume_id": "r2", "candidate_name": "Lee", "text_content": "CFP"},
+    }
+    match = MatchResult("r1", "Sam", 91, ["Writes SOAs"], "SOA")
+
+    with (
+        patch("src.database.iter_job_postings", _stream(postings)),
+        patch(
+            "src.scheduler.generate_job_embeddings_batch",
+            AsyncMock(return_value=np.zeros((2, 3), dtype=np.float32)),
+        ) as mock_embed,
+        patch(
+            "src.scheduler.coarse_vector_search_batch",
+            AsyncMock(return_value=shortlists),
+        ),
+        patch("src.database.fetch_resumes", AsyncMock(return_value=resumes)),
+        patch(
+            "src.scheduler.gpt4o_rerank_candidates",
+            AsyncMock(side_effect=[[match], RuntimeError("rate limited")]),
+        ) as mock_rerank,
+        patch(
+            "src.database.store_job_matches", AsyncMock(return_value=1)
+        ) as mock_store,
+    ):
+        assert await run_matcher() == 1
+
+    texts = mock_embed.await_args.args[0]
+    assert texts[0] == "Paraplanner at Acme\n\nRG146\n\nPrepare SOAs"
+    job_data, candidates, threshold = mock_rerank.await_args_list[0].args
+    assert job_data["job_title"] == "Paraplanner"
+    assert candidates == [
+        {
+            "resume_id": "r1",
+            "similarity": 0.8,
+            "candidate_name": "Sam",
+            "resume_text": "SOA",
+        }
+    ]
+    assert threshold == 85
+    mock_store.assert_awaited_once_with(
+        ["https://linkedin.com/jobs/1"],
+        [("https://linkedin.com/jobs/1", "r1", 91, ["Writes SOAs"])],
+    )
 
 
 @pytest.mark.asyncio
-async def test_run_sheet_writer():
-    """Test sheet writer execution"""
-    with patch("src.scheduler.run_sheet_writer", new_callable=AsyncMock) as mock_run:
-        await run_sheet_writer()
-        mock_run.assert_called_once()
+async def test_run_matcher_matches_streamed_postings_page_by_page():
+    """Test unprocessed postings are streamed and matched in fixed-size pages"""
+    postings = [{"job_link": f"https://linkedin.com/jobs/{i}"} for i in range(5)]
+    stream = _stream(postings)
+
+    with (
+        patch("src.database.iter_job_postings", stream),
+        patch("src.scheduler.MATCH_PAGE_SIZE", 2),
+        patch("src.scheduler._match_postings", AsyncMock(return_value=1)) as mock_page,
+    ):
+        assert await run_matcher() == 3
+
+    assert [len(call.args[0]) for call in mock_page.await_args_list] == [2, 2, 1]
+    assert stream.calls == [((2,), {"unprocessed": True})]
 
 
 @pytest.mark.asyncio
-async def test_manual_run_pipeline():
-    """Test manual pipeline execution"""
-    expected_result = {
+async def test_run_matcher_without_postings():
+    """Test no unprocessed postings means no embedding or re-rank calls"""
+    with (
+        patch("src.database.iter_job_postings", _stream([])),
+        patch("src.scheduler.generate_job_embeddings_batch", AsyncMock()) as mock_embed,
+    ):
+        assert await run_matcher() == 0
+
+    mock_embed.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_run_message_builder_stores_only_valid_messages():
+    """Test every match goes into one batch and invalid drafts are not stored"""
+    matches = [
+        {
+            "match_id": match_id,
+            "match_score": 90,
+            "matching_reasons": ["Ten years in advice"],
+            "company_name": "Acme",
+            "job_title": "Paraplanner",
+            "job_link": "https://linkedin.com/jobs/1",
+            "location": "Perth",
+            "full_description": "Prepare SOAs",
+            "requirements": [],
+            "candidate_name": "Sam",
+            "decision_maker_name": "Jane Citizen",
+            "linkedin_url": "https://linkedin.com/in/jane",
+        }
+        for match_id in (1, 2)
+    ]
+    messages = {
+        "1": "Paraplanner – Acme\n\nHi Jane,\n\nI noticed the opening at Acme.",
+        "2": "Paraplanner — Acme\n\nHi Jane,\n\nI noticed the opening at Acme.",
+    }
+
+    with (
+        patch(
+            "src.database.fetch_matches_awaiting_message",
+            AsyncMock(return_value=matches),
+        ),
+        patch(
+            "src.scheduler.MessageBuilder.create_outreach_batch",
+            AsyncMock(return_value=messages),
+        ) as mock_batch,
+        patch(
+            "src.database.store_outreach_messages", AsyncMock(return_value=1)
+        ) as mock_store,
+    ):
+        assert await run_message_builder() == 1
+
+    rows = mock_batch.await_args.args[0]
+    assert [row["row_id"] for row in rows] == ["1", "2"]
+    assert rows[0]["first_name"] == "Jane"
+    assert rows[0]["bullet_list"] == "• Ten years in advice"
+    assert rows[0]["job_context"] == rows[1]["job_context"]
+    mock_store.assert_awaited_once_with({1: messages["1"]})
+
+
+@pytest.mark.asyncio
+async def test_run_sheet_writer_marks_written_rows():
+    """Test the daily sheet gets every pending row and they are marked written"""
+    rows = [
+        {
+            "match_id": 7,
+            "company": "Acme",
+            "job_title": "Paraplanner",
+            "job_link": "https://linkedin.com/jobs/1",
+            "decision_maker_name": "Jane Citizen",
+            "linkedin_url": "https://linkedin.com/in/jane",
+            "match_score": 91,
+            "outreach_message": "Hi Jane,",
+        }
+    ]
+
+    with (
+        patch("src.database.fetch_outreach_rows", AsyncMock(return_value=rows)),
+        patch("src.database.mark_outreach_written", AsyncMock()) as mock_mark,
+        patch("src.scheduler.FOLDER_ID", "folder"),
+        patch(
+            "src.scheduler.write_daily_outreach_sheet",
+            AsyncMock(return_value="https://docs.google.com/spreadsheets/d/s"),
+        ) as mock_write,
+    ):
+        assert await run_sheet_writer() == 1
+
+    mock_write.assert_awaited_once_with(rows, "folder")
+    mock_mark.assert_awaited_once_with([7])
+
+
+@pytest.mark.asyncio
+async def test_run_sheet_writer_requires_folder_id():
+    """Test a missing FOLDER_ID fails loudly instead of writing nowhere"""
+    with (
+        patch("src.scheduler.FOLDER_ID", ""),
+        patch("src.scheduler.write_daily_outreach_sheet", AsyncMock()) as mock_write,
+    ):
+        with pytest.raises(ValueError):
+            await run_sheet_writer()
+
+    mock_write.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_manual_run_pipeline_runs_stages_in_order():
+    """Test stages run in dependency order and their counts are reported"""
+    calls = []
+
+    def stage(name, value):
+        async def run():
+            calls.append(name)
+            return value
+
+        return run
+
+    with (
+        patch("src.scheduler.run_jobs_scraper", stage("scrape", 15)),
+        patch("src.scheduler.run_contact_enricher", stage("enrich", 12)),
+        patch("src.scheduler.run_matcher", stage("match", 8)),
+        patch("src.scheduler.run_message_builder", stage("message", 8)),
+        patch("src.scheduler.run_sheet_writer", stage("sheet", True)),
+    ):
+        result = await manual_run_pipeline()
+
+    assert calls == ["scrape", "enrich", "match", "message", "sheet"]
+    assert result == {
         "status": "success",
         "jobs_scraped": 15,
         "contacts_enriched": 12,
@@ -106,13 +377,42 @@ async def test_manual_run_pipeline():
         "sheet_written": True,
     }
 
-    with patch(
-        "src.scheduler.manual_run_pipeline", new_callable=AsyncMock
-    ) as mock_pipeline:
-        mock_pipeline.return_value = expected_result
 
+@pytest.mark.asyncio
+async def test_manual_run_pipeline_stops_at_failed_stage():
+    """Test a failing stage ends the run and is reported"""
+    with (
+        patch("src.scheduler.run_jobs_scraper", AsyncMock(return_value=3)),
+        patch(
+            "src.scheduler.run_contact_enricher",
+            AsyncMock(side_effect=RuntimeError("boom")),
+        ),
+        patch("src.scheduler.run_matcher", new_callable=AsyncMock) as mock_matcher,
+    ):
         result = await manual_run_pipeline()
 
-        assert result["status"] == "success"
-        assert "jobs_scraped" in result
-        mock_pipeline.assert_called_once()
+    assert result["status"] == "error"
+    assert result["jobs_scraped"] == 3
+    assert result["error"] == "boom"
+    mock_matcher.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_run_contact_enricher_looks_up_unprocessed_companies():
+    """Test every company with unprocessed postings goes into one batch lookup"""
+    companies = {"acme": "Acme Pty Ltd", "globex": "Globex"}
+
+    with (
+        patch(
+            "src.database.fetch_unprocessed_companies",
+            AsyncMock(return_value=companies),
+        ),
+        patch(
+            "src.scheduler.batch_lookup_companies",
+            AsyncMock(return_value={"acme": {"decision_maker_name": "Jane"}}),
+        ) as mock_lookup,
+    ):
+        enriched = await run_contact_enricher()
+
+    assert enriched == 1
+    mock_lookup.assert_awaited_once_with(["acme", "globex"], companies)
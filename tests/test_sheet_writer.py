@@ -1,14 +1,17 @@
 """Tests for sheet_writer module"""
 
 import pytest
-from unittest.mock import patch, AsyncMock
-from datetime import datetime
+from unittest.mock import patch, AsyncMock, MagicMock, Mock
+from datetime import date, datetime, timezone
+from googleapiclient.errors import HttpError
 from src.sheet_writer import (
+    batch_write_rows,
     write_daily_outreach_sheet,
     create_sheet_headers,
     format_outreach_row,
     generate_sheet_name,
     GoogleSheetsClient,
+    OutreachBatch,
 )
 
 
@@ -17,21 +20,96 @@ async def test_write_daily_outreach_sheet(sample_outreach_data):
     """Test writing outreach data to Google Sheets"""
     expected_url = "https://docs.google.com/spreadsheets/d/test123"
 
-    with patch(
-        "src.sheet_writer.write_daily_outreach_sheet", new_callable=AsyncMock
-    ) as mock_write:
-        mock_write.return_value = expected_url
-
+    with (
+        patch(
+            "src.sheet_writer.get_or_create_sheet",
+            new_callable=AsyncMock,
+            return_value="test123",
+        ) as mock_get_sheet,
+        patch("src.sheet_writer.clear_sheet_content", new_callable=AsyncMock),
+        patch(
+            "src.sheet_writer.batch_write_rows",
+            new_callable=AsyncMock,
+            return_value=True,
+        ) as mock_write,
+    ):
         result = await write_daily_outreach_sheet(
-            outreach_data=sample_outreach_data, folder_id="test_folder_123"
+            outreach_data=sample_outreach_data,
+            folder_id="test_folder_123",
+            sheet_name="Outreach-Daily-2024-01-15",
         )
 
-        assert result == expected_url
-        mock_write.assert_called_once()
+    assert result == expected_url
+    mock_get_sheet.assert_awaited_once_with(
+        "test_folder_123", "Outreach-Daily-2024-01-15"
+    )
+    mock_write.assert_awaited_once_with(
+        "test123",
+        create_sheet_headers(),
+        [format_outreach_row(**sample_outreach_data[0])],
+    )
 
 
 @pytest.mark.asyncio
-async def test_create_sheet_headers():
+async def test_write_daily_outreach_sheet_write_failure(sample_outreach_data):
+    """Test a failed batch write is raised rather than returning a URL"""
+    with (
+        patch(
+            "src.sheet_writer.get_or_create_sheet",
+            new_callable=AsyncMock,
+            return_value="test123",
+        ),
+        patch("src.sheet_writer.clear_sheet_content", new_callable=AsyncMock),
+        patch(
+            "src.sheet_writer.batch_write_rows",
+            new_callable=AsyncMock,
+            return_value=False,
+        ),
+    ):
+        with pytest.raises(RuntimeError):
+            await write_daily_outreach_sheet(sample_outreach_data, "test_folder_123")
+
+
+@pytest.mark.asyncio
+async def test_write_daily_outreach_sheet_clear_failure(sample_outreach_data):
+    """Test a failed clear aborts before stale rows are overwritten"""
+    with (
+        patch(
+            "src.sheet_writer.get_or_create_sheet",
+            new_callable=AsyncMock,
+            return_value="test123",
+        ),
+        patch(
+            "src.sheet_writer.clear_sheet_content",
+            new_callable=AsyncMock,
+            return_value=False,
+        ),
+        patch(
+            "src.sheet_writer.batch_write_rows", new_callable=AsyncMock
+        ) as mock_write,
+    ):
+        with pytest.raises(RuntimeError):
+            await write_daily_outreach_sheet(sample_outreach_data, "test_folder_123")
+
+    mock_write.assert_not_awaited()
+
+
+def test_get_or_create_sheet_escapes_quotes_in_query():
+    """Test quotes in the sheet name cannot break out of the Drive query"""
+    from src.sheet_writer import _sync_get_or_create_sheet
+
+    service = MagicMock()
+    files = service.files.return_value
+    files.list.return_value.execute.return_value = {"files": [{"id": "sheet123"}]}
+
+    with patch("src.sheet_writer._get_drive_service", return_value=service):
+        assert _sync_get_or_create_sheet("folder1", "Bob's sheet") == "sheet123"
+
+    query = files.list.call_args.kwargs["q"]
+    assert "name = 'Bob\\'s sheet'" in query
+
+
+def test_create_sheet_headers():
     """Test sheet headers creation"""
     expected_headers = [
         "company",
@@ -43,51 +121,103 @@ async def test_create_sheet_headers():
         "outreach_message",
     ]
 
-    with patch(
-        "src.sheet_writer.create_sheet_headers", new_callable=AsyncMock
-    ) as mock_headers:
-        mock_headers.return_value = expected_headers
-
-        result = await create_sheet_headers()
+    result = create_sheet_headers()
 
-        assert len(result) == 7
-        assert "company" in result
-        assert "outreach_message" in result
-        mock_headers.assert_called_once()
+    assert result == expected_headers
 
 
-@pytest.mark.asyncio
-async def test_format_outreach_row():
+def test_format_outreach_row():
     """Test formatting single outreach row"""
-    expected_row = [
-        "Test Company",
-        "Financial Planner",
-        "https://linkedin.com/jobs/123",
-        "John Smith",
-        "https://linkedin.com/in/johnsmith",
-        "92",
-        "Hi John, I hope you're having a great week...",
+    result = format_outreach_row(
+        company="Test Company",
+        job_title="Financial Planner",
+        job_link="https://linkedin.com/jobs/123",
+        decision_maker_name="John Smith",
+        linkedin_url="https://linkedin.com/in/johnsmith",
+        match_score=92,
+        outreach_message="Hi John, I hope you're having a great week...",
+    )
+
+    assert len(result) == 7
+    assert result[0] == "Test Company"
+    assert result[5] == "92"
+
+
+def test_outreach_batch_rows_match_format_outreach_row(sample_outreach_data):
+    """Test the columnar batch transposes into the same rows as per-record formatting"""
+    batch = OutreachBatch.from_records(sample_outreach_data * 3)
+
+    assert len(batch) == 3
+    assert batch.rows() == [format_outreach_row(**sample_outreach_data[0])] * 3
+
+
+def test_outreach_batch_from_pipeline_record():
+    """Test a matcher/message row with extra keys and a float score still writes"""
+    record = {
+        "match_id": 7,
+        "company": "Meridian Financial Planning",
+        "job_title": "Senior Financial Planner",
+        "job_link": "https://www.linkedin.com/jobs/view/3789123456",
+        "company_id": "meridian",
+        "resume_id": "resume_1",
+        "candidate_name": "Alex Chen",
+        "decision_maker_name": "Sarah Mitchell",
+        "linkedin_url": "https://www.linkedin.com/in/sarah-mitchell-cfp",
+        "match_score": 91.6,
+        "matching_reasons": ["CFP qualified"],
+        "outreach_message": "Hi Sarah,",
+    }
+
+    assert OutreachBatch.from_records([record]).rows() == [
+        [
+            "Meridian Financial Planning",
+            "Senior Financial Planner",
+            "https://www.linkedin.com/jobs/view/3789123456",
+            "Sarah Mitchell",
+            "https://www.linkedin.com/in/sarah-mitchell-cfp",
+            "92",
+            "Hi Sarah,",
+        ]
     ]
 
-    with patch(
-        "src.sheet_writer.format_outreach_row", new_callable=AsyncMock
-    ) as mock_format:
-        mock_format.return_value = expected_row
-
-        result = await format_outreach_row(
-            company="Test Company",
-            job_title="Financial Planner",
-            job_link="https://linkedin.com/jobs/123",
-            decision_maker_name="John Smith",
-            linkedin_url="https://linkedin.com/in/johnsmith",
-            match_score=92,
-            outreach_message="Hi John, I hope you're having a great week...",
-        )
 
-        assert len(result) == 7
-        assert result[0] == "Test Company"
-        assert result[5] == "92"
-        mock_format.assert_called_once()
+def test_outreach_batch_empty():
+    """Test an empty batch has no rows"""
+    batch = OutreachBatch()
+
+    assert len(batch) == 0
+    assert batch.rows() == []
+
+
+@pytest.mark.asyncio
+async def test_batch_write_rows_single_request():
+    """Test headers and every row go out in one values.batchUpdate call"""
+    headers = ["company", "job_title"]
+    rows = [["A Co", "Planner"], ["B Co", "Analyst"]]
+    service = MagicMock()
+
+    with patch("src.sheet_writer._get_sheets_service", return_value=service):
+        assert await batch_write_rows("sheet123", headers, rows) is True
+
+    batch_update = service.spreadsheets.return_value.values.return_value.batchUpdate
+    batch_update.assert_called_once()
+    body = batch_update.call_args.kwargs["body"]
+    assert batch_update.call_args.kwargs["spreadsheetId"] == "sheet123"
+    assert body["valueInputOption"] == "RAW"
+    assert body["data"] == [{"range": "A1", "values": [headers, *rows]}]
+
+
+@pytest.mark.asyncio
+async def test_batch_write_rows_api_error():
+    """Test a Sheets API error is reported as a failed write"""
+    service = MagicMock()
+    batch_update = service.spreadsheets.return_value.values.return_value.batchUpdate
+    batch_update.return_value.execute.side_effect = HttpError(
+        Mock(status=500, reason="error"), b"boom"
+    )
+
+    with patch("src.sheet_writer._get_sheets_service", return_value=service):
+        assert await batch_write_rows("sheet123", ["company"], []) is False
 
 
 def test_generate_sheet_name():
@@ -105,6 +235,30 @@ def test_generate_sheet_name():
         mock_name.assert_called_once_with(test_date)
 
 
+def test_generate_sheet_name_formats_date():
+    """Test the sheet name uses the ISO date of the given datetime"""
+    assert (
+        generate_sheet_name(datetime(2024, 1, 5, 23, 59)) == "Outreach-Daily-2024-01-05"
+    )
+
+
+def test_generate_sheet_name_accepts_date():
+    """Test a plain date is formatted without calling .date() on it"""
+    assert generate_sheet_name(date(2024, 1, 5)) == "Outreach-Daily-2024-01-05"
+    assert generate_sheet_name(date=date(2024, 1, 5)) == "Outreach-Daily-2024-01-05"
+
+
+def test_generate_sheet_name_defaults_to_myt_day():
+    """Test the default name uses the MYT calendar day, not the host's"""
+    # 17:30 UTC on Jan 5 is already Jan 6 in Kuala Lumpur
+    utc_evening = datetime(2024, 1, 5, 17, 30, tzinfo=timezone.utc)
+
+    with patch("src.sheet_writer.datetime") as mock_datetime:
+        mock_datetime.now.side_effect = lambda tz: utc_evening.astimezone(tz)
+
+        assert generate_sheet_name() == "Outreach-Daily-2024-01-06"
+
+
 def test_generate_sheet_name_default():
     """Test sheet name generation with default (today's) date"""
     with patch("src.sheet_writer.generate_sheet_name") as mock_name:
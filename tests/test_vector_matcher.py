@@ -1 +1,167 @@
- 
\ No newline at end of file
+"""Tests for vector_matcher module"""
+
+import numpy as np
+import orjson
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch, AsyncMock, MagicMock, Mock
+from src.vector_matcher import (
+    coarse_vector_search_batch,
+    generate_job_embeddings_batch,
+    gpt4o_rerank_candidates,
+)
+
+
+@pytest.fixture
+def mock_pool():
+    """Mock asyncpg pool whose acquire() yields an AsyncMock connection"""
+    conn = AsyncMock()
+    conn.prepared.return_value = AsyncMock()
+    pool = MagicMock()
+    pool.acquire.return_value.__aenter__.return_value = conn
+    with patch("src.vector_matcher._get_pool", new_callable=AsyncMock) as mock_get_pool:
+        mock_get_pool.return_value = pool
+        yield conn
+
+
+@pytest.mark.asyncio
+async def test_coarse_vector_search_batch_groups_rows_per_job(mock_pool):
+    """Test one query serves every job and rows are grouped by job index"""
+    statement = mock_pool.prepared.return_value
+    statement.fetch.return_value = [
+        {"idx": 1, "resume_id": "r1", "distance": 0.1},
+        {"idx": 1, "resume_id": "r2", "distance": 0.25},
+        {"idx": 3, "resume_id": "r3", "distance": 0.5},
+    ]
+    embeddings = [[0.1, 0.2], [0.3, 0.4], [0.5, 0.6]]
+
+    result = await coarse_vector_search_batch(embeddings, top_k=2)
+
+    assert result == [
+        [
+            {"resume_id": "r1", "similarity": pytest.approx(0.9)},
+            {"resume_id": "r2", "similarity": pytest.approx(0.75)},
+        ],
+        [],
+        [{"resume_id": "r3", "similarity": pytest.approx(0.5)}],
+    ]
+    statement.fetch.assert_awaited_once_with(embeddings, 2)
+
+
+@pytest.mark.asyncio
+async def test_coarse_vector_search_batch_empty_skips_database(mock_pool):
+    """Test an empty batch does not touch Postgres"""
+    assert await coarse_vector_search_batch([]) == []
+    mock_pool.prepared.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_generate_job_embeddings_batch_chunks_requests():
+    """Test texts are embedded in as few requests as the batch size allows"""
+
+    async def fake_create(model, input):
+        # Return items out of order to check they are re-sorted by index
+        data = [
+            SimpleNamespace(index=i, embedding=[float(len(text)), 0.0])
+            for i, text in enumerate(input)
+        ]
+        return SimpleNamespace(data=list(reversed(data)))
+
+    client = Mock()
+    client.embeddings.create = AsyncMock(side_effect=fake_create)
+    texts = ["a", "bb", "ccc", "dddd", "eeeee"]
+
+    with (
+        patch("src.vector_matcher._get_openai_client", return_value=client),
+        patch("src.vector_matcher.EMBEDDING_BATCH_SIZE", 2),
+    ):
+        result = await generate_job_embeddings_batch(texts)
+
+    assert client.embeddings.create.await_count == 3
+    assert result.shape == (5, 2)
+    assert result.dtype == np.float32
+    np.testing.assert_allclose(result, [[1.0, 0.0]] * 5)
+    sent = [call.kwargs["input"] for call in client.embeddings.create.await_args_list]
+    assert sent == [["a", "bb"], ["ccc", "dddd"], ["eeeee"]]
+
+
+def _chat_response(payload):
+    message = SimpleNamespace(content=orjson.dumps(payload).decode())
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+@pytest.mark.asyncio
+async def test_gpt4o_rerank_scores_all_candidates_in_one_call():
+    """Test every candidate is scored in a single structured-output call"""
+    candidates = [
+        {"resume_id": f"r{i}", "candidate_name": f"C{i}", "resume_text": f"cv {i}"}
+        for i in range(3)
+    ]
+    client = Mock()
+    client.chat.completions.create = AsyncMock(
+        return_value=_chat_response(
+            {
+                "matches": [
+                    {"index": 0, "match_score": 70, "matching_reasons": ["a"]},
+                    {"index": 1, "match_score": 88, "matching_reasons": ["b"]},
+                    {"index": 2, "match_score": 95, "matching_reasons": ["c"]},
+                    {"index": 7, "match_score": 99, "matching_reasons": ["d"]},
+                ]
+            }
+        )
+    )
+
+    with patch("src.vector_matcher._get_openai_client", return_value=client):
+        results = await gpt4o_rerank_candidates({"title": "Analyst"}, candidates)
+
+    client.chat.completions.create.assert_awaited_once()
+    kwargs = client.chat.completions.create.await_args.kwargs
+    assert kwargs["response_format"]["type"] == "json_schema"
+    assert "[2] cv 2" in kwargs["messages"][1]["content"]
+    assert [r.resume_id for r in results] == ["r2", "r1"]
+    assert results[0].candidate_name == "C2"
+    assert results[0].matching_reasons == ["c"]
+
+
+@pytest.mark.asyncio
+async def test_gpt4o_rerank_no_candidates_skips_call():
+    """Test an empty candidate list makes no API call"""
+    with patch("src.vector_matcher._get_openai_client") as mock_client:
+        assert await gpt4o_rerank_candidates({"title": "Analyst"}, []) == []
+    mock_client.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_gpt4o_rerank_skips_call_when_all_candidates_distant():
+    """Test no GPT-4o call is made when every coarse hit is below the floor"""
+    candidates = [
+        {"resume_id": "r0", "resume_text": "cv 0", "similarity": 0.31},
+        {"resume_id": "r1", "resume_text": "cv 1", "similarity": 0.42},
+    ]
+
+    with patch("src.vector_matcher._get_openai_client") as mock_client:
+        assert await gpt4o_rerank_candidates({"title": "Analyst"}, candidates) == []
+    mock_client.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_gpt4o_rerank_drops_distant_candidates_from_prompt():
+    """Test only candidates above the similarity floor are sent and numbered"""
+    candidates = [
+        {"resume_id": "r0", "resume_text": "far cv", "similarity": 0.2},
+        {"resume_id": "r1", "resume_text": "near cv", "similarity": 0.8},
+    ]
+    client = Mock()
+    client.chat.completions.create = AsyncMock(
+        return_value=_chat_response(
+            {"matches": [{"index": 0, "match_score": 90, "matching_reasons": []}]}
+        )
+    )
+
+    with patch("src.vector_matcher._get_openai_client", return_value=client):
+        results = await gpt4o_rerank_candidates({"title": "Analyst"}, candidates)
+
+    prompt = client.chat.completions.create.await_args.kwargs["messages"][1]["content"]
+    assert "far cv" not in prompt
+    assert "[0] near cv" in prompt
+    assert [r.resume_id for r in results] == ["r1"]